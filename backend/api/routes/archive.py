@@ -0,0 +1,43 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse
+from typing import Optional
+from services.archive_service import archive_service, ARCHIVE_TABLES
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("/files")
+async def list_archive_files(
+    table: Optional[str] = Query(None, description="表名筛选: " + ", ".join(ARCHIVE_TABLES))
+):
+    """列出 Parquet 归档文件"""
+    if table and table not in ARCHIVE_TABLES:
+        raise HTTPException(status_code=400, detail=f"不支持的归档表: {table}")
+    try:
+        files = archive_service.list_files(table)
+        return {
+            "success": True,
+            "data": {
+                "files": files,
+                "total": len(files),
+                "enabled": archive_service.enabled
+            }
+        }
+    except Exception as e:
+        logger.error(f"获取归档文件列表失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"获取归档文件列表失败: {str(e)}")
+
+@router.get("/files/{table}/{date}/{file_name}")
+async def download_archive_file(table: str, date: str, file_name: str):
+    """下载单个归档文件"""
+    try:
+        path = archive_service.resolve_file(table, date, file_name)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return FileResponse(
+        path,
+        media_type="application/vnd.apache.parquet",
+        filename=f"{table}_{date}_{file_name}"
+    )
@@ -4,6 +4,7 @@ from sqlalchemy import select
 from typing import List, Optional
 from pydantic import BaseModel
 from core.database import get_db, UserConfig
+from core.cache import cached_response, response_cache, CONFIG_SCOPE
 import logging
 
 logger = logging.getLogger(__name__)
@@ -52,6 +53,8 @@ async def set_keywords(
             db.add(user_config)
         
         await db.commit()
+        await response_cache.invalidate_config()
+        
         await db.refresh(user_config)
         
         return {
@@ -70,6 +73,7 @@ async def set_keywords(
         raise HTTPException(status_code=500, detail=f"设置关键词配置失败: {str(e)}")
 
 @router.get("/keywords")
+@cached_response("config-keywords", scopes=[CONFIG_SCOPE], cache=False)
 async def get_keywords(db: AsyncSession = Depends(get_db)):
     """获取监测关键词配置"""
     try:
@@ -145,6 +149,8 @@ async def update_schedule(
             db.add(user_config)
         
         await db.commit()
+        await response_cache.invalidate_config()
+        
         await db.refresh(user_config)
         
         return {
@@ -162,6 +168,7 @@ async def update_schedule(
         raise HTTPException(status_code=500, detail=f"更新采集计划失败: {str(e)}")
 
 @router.get("/status")
+@cached_response("config-status", scopes=[CONFIG_SCOPE], cache=False)
 async def get_config_status(db: AsyncSession = Depends(get_db)):
     """获取配置状态"""
     try:
@@ -218,6 +225,7 @@ async def remove_keyword(
         if keyword in user_config.keywords:
             user_config.keywords.remove(keyword)
             await db.commit()
+            await response_cache.invalidate_config()
             
             return {
                 "success": True,
@@ -249,6 +257,7 @@ async def add_keyword(
             if keyword not in user_config.keywords:
                 user_config.keywords.append(keyword)
                 await db.commit()
+                await response_cache.invalidate_config()
                 
                 return {
                     "success": True,
@@ -267,6 +276,7 @@ async def add_keyword(
             )
             db.add(user_config)
             await db.commit()
+            await response_cache.invalidate_config()
             
             return {
                 "success": True,
@@ -1,113 +1,118 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, and_
 from typing import List, Optional
 from datetime import datetime, timedelta
-from core.database import get_db, KeywordTrend, HotPost, WordCloudData, SentimentAnalysis
-from services.analysis_service import analysis_service
+from core.database import get_read_db, SentimentAnalysis
+from services.analysis_service import analysis_service, SENTIMENT_COLUMNS
+from services.emerging_terms_service import emerging_terms_service
+from services.stats_service import stats_service
+from services.search_service import search_service
+from services.sentiment_refresh_service import sentiment_refresh_service
+from core.cache import cached_response, CONFIG_SCOPE, ALL_KEYWORDS
+from core.serialization import ndjson_response
+from services.dashboard_service import dashboard_service, DASHBOARD_PANELS
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+@router.get("/trends")
+@cached_response("trends")
+async def get_multi_keyword_trends(
+    keywords: List[str] = Query(..., description="关键词列表"),
+    days: int = Query(7, ge=1, le=365, description="天数范围"),
+    granularity: str = Query("day", description="时间粒度: hour, day, week"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """批量获取多个关键词的趋势数据"""
+    try:
+        keywords = list(dict.fromkeys(keywords))
+        trend_data = await analysis_service.calculate_multi_trend_data(keywords, days, granularity, db)
+        
+        return {
+            "success": True,
+            "data": trend_data,
+            "keywords": keywords,
+            "days": days,
+            "granularity": granularity
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"获取趋势数据失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"获取趋势数据失败: {str(e)}")
+
 @router.get("/trends/{keyword}")
+@cached_response("keyword-trends")
 async def get_keyword_trends(
     keyword: str,
-    days: int = Query(7, ge=1, le=30, description="天数范围"),
-    db: AsyncSession = Depends(get_db)
+    days: int = Query(7, ge=1, le=365, description="天数范围"),
+    granularity: str = Query("day", description="时间粒度: hour, day, week"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取关键词趋势数据"""
     try:
-        trend_data = await analysis_service.calculate_trend_data(keyword, days, db)
+        trend_data = await analysis_service.calculate_trend_data(keyword, days, db, granularity)
         
         return {
             "success": True,
             "data": trend_data,
             "keyword": keyword,
             "days": days,
+            "granularity": granularity,
             "total_points": len(trend_data)
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"获取趋势数据失败: {str(e)}")
         raise HTTPException(status_code=500, detail=f"获取趋势数据失败: {str(e)}")
 
 @router.get("/hot-posts")
+@cached_response("hot-posts")
 async def get_hot_posts(
     keyword: Optional[str] = Query(None, description="关键词筛选"),
     limit: int = Query(10, ge=1, le=50, description="返回数量"),
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的 next_cursor）"),
+    include_content: bool = Query(False, description="是否返回帖子正文"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取热帖排行榜"""
     try:
-        hot_posts = await analysis_service.rank_hot_posts(keyword, limit, db)
+        hot_posts, next_cursor = await analysis_service.page_hot_posts(keyword, limit, cursor, db, include_content)
         
         return {
             "success": True,
             "data": hot_posts,
             "keyword": keyword,
-            "total": len(hot_posts)
+            "total": len(hot_posts),
+            "next_cursor": next_cursor
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"获取热帖数据失败: {str(e)}")
         raise HTTPException(status_code=500, detail=f"获取热帖数据失败: {str(e)}")
 
+@router.get("/hot-posts/export")
+async def export_hot_posts(
+    keyword: Optional[str] = Query(None, description="关键词筛选")
+):
+    """以 NDJSON 流式导出全部热帖（每行一条，含正文），边查询边输出"""
+    return ndjson_response(analysis_service.stream_hot_posts(keyword), filename="hot_posts.ndjson")
+
 @router.get("/word-cloud")
+@cached_response("word-cloud")
 async def get_word_cloud(
     keyword: Optional[str] = Query(None, description="关键词筛选"),
     hours: int = Query(24, ge=1, le=168, description="时间范围（小时）"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取词云数据"""
     try:
-        # 计算时间范围
-        start_time = datetime.utcnow() - timedelta(hours=hours)
-        
-        if keyword:
-            # 查询特定关键词的词云数据
-            result = await db.execute(
-                select(WordCloudData.word, WordCloudData.weight)
-                .where(
-                    and_(
-                        WordCloudData.keyword == keyword,
-                        WordCloudData.date >= start_time
-                    )
-                )
-                .order_by(WordCloudData.weight.desc())
-                .limit(50)
-            )
-            word_data = result.fetchall()
-            
-            words = [
-                {
-                    "word": word.word,
-                    "weight": float(word.weight),
-                    "size": int(word.weight * 100)
-                }
-                for word in word_data
-            ]
-        else:
-            # 如果没有指定关键词，获取所有关键词的词云数据
-            result = await db.execute(
-                select(
-                    WordCloudData.word,
-                    func.avg(WordCloudData.weight).label('avg_weight')
-                )
-                .where(WordCloudData.date >= start_time)
-                .group_by(WordCloudData.word)
-                .order_by(func.avg(WordCloudData.weight).desc())
-                .limit(50)
-            )
-            word_data = result.fetchall()
-            
-            words = [
-                {
-                    "word": word.word,
-                    "weight": float(word.avg_weight),
-                    "size": int(word.avg_weight * 100)
-                }
-                for word in word_data
-            ]
+        words = await analysis_service.get_word_cloud(keyword, hours, db)
         
         return {
             "success": True,
@@ -124,20 +129,112 @@ async def get_word_cloud(
         logger.error(f"获取词云数据失败: {str(e)}")
         raise HTTPException(status_code=500, detail=f"获取词云数据失败: {str(e)}")
 
+def _dashboard_scopes(params: dict) -> List[str]:
+    """统计面板带有全局汇总（overall），任一关键词的数据变化都会影响它"""
+    return [ALL_KEYWORDS] if "stats" in (params.get("fields") or DASHBOARD_PANELS) else []
+
+@router.get("/dashboard")
+@cached_response("dashboard", extra_scopes=[CONFIG_SCOPE], params_scopes=_dashboard_scopes)
+async def get_dashboard(
+    keywords: Optional[List[str]] = Query(None, description="关键词列表，缺省为配置的监测关键词"),
+    fields: Optional[List[str]] = Query(None, description="返回的面板: " + ", ".join(DASHBOARD_PANELS)),
+    days: int = Query(7, ge=1, le=365, description="趋势天数范围（情绪分析最多 30 天）"),
+    granularity: str = Query("day", description="趋势时间粒度: hour, day, week"),
+    hot_limit: int = Query(10, ge=1, le=50, description="每个关键词的热帖数量"),
+    hours: int = Query(24, ge=1, le=168, description="词云时间范围（小时）")
+):
+    """一次返回看板所需的全部面板数据，各面板并发查询"""
+    try:
+        dashboard = await dashboard_service.build(keywords, fields, days, granularity, hot_limit, hours)
+        
+        return {
+            "success": True,
+            "data": dashboard,
+            "generated_at": datetime.utcnow().isoformat()
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"获取看板数据失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"获取看板数据失败: {str(e)}")
+
+@router.get("/emerging-terms")
+@cached_response("emerging-terms")
+async def get_emerging_terms(
+    keyword: str = Query(..., description="关键词"),
+    hours: int = Query(6, ge=1, le=72, description="当前窗口（小时）"),
+    baseline_hours: int = Query(72, ge=1, le=720, description="基线窗口（小时）"),
+    min_count: int = Query(3, ge=1, description="当前窗口最少出现次数"),
+    limit: int = Query(20, ge=1, le=100, description="返回数量"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """获取关键词下新兴上升的词语"""
+    try:
+        terms = await emerging_terms_service.detect_emerging_terms(
+            keyword, db, hours, baseline_hours, min_count, limit
+        )
+        
+        return {
+            "success": True,
+            "data": {
+                "terms": terms,
+                "keyword": keyword,
+                "hours": hours,
+                "baseline_hours": baseline_hours,
+                "generated_at": datetime.utcnow().isoformat()
+            }
+        }
+        
+    except Exception as e:
+        logger.error(f"获取新兴词失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"获取新兴词失败: {str(e)}")
+
+@router.get("/search")
+@cached_response("search")
+async def search_posts(
+    q: str = Query(..., min_length=1, max_length=100, description="搜索词"),
+    keyword: Optional[str] = Query(None, description="关键词筛选"),
+    start_time: Optional[datetime] = Query(None, description="采集时间起"),
+    end_time: Optional[datetime] = Query(None, description="采集时间止"),
+    limit: int = Query(20, ge=1, le=100, description="返回数量"),
+    offset: int = Query(0, ge=0, le=1000, description="偏移量"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """全文检索已采集的帖子"""
+    try:
+        posts = await search_service.search(q, db, keyword, start_time, end_time, limit, offset)
+        
+        return {
+            "success": True,
+            "data": posts,
+            "query": q,
+            "keyword": keyword,
+            "total": len(posts)
+        }
+        
+    except Exception as e:
+        logger.error(f"搜索帖子失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"搜索帖子失败: {str(e)}")
+
 @router.get("/sentiment/{keyword}")
+@cached_response("sentiment", cache=False, before=sentiment_refresh_service.check)
 async def get_sentiment_analysis(
     keyword: str,
     days: int = Query(7, ge=1, le=30, description="天数范围"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """获取情绪分析数据"""
+    """获取情绪分析数据
+
+    只做 ETag 不缓存响应体：age_seconds/refreshing 每次返回 200 时重新计算；过期时的后台刷新在 ETag
+    比较之前触发（sentiment_refresh_service.check），304 不会跳过。刷新完成后关键词版本更新，ETag 随之变化。
+    """
     try:
         # 计算时间范围
         start_time = datetime.utcnow() - timedelta(days=days)
         
         # 查询情绪分析数据
         result = await db.execute(
-            select(SentimentAnalysis)
+            select(*SENTIMENT_COLUMNS)
             .where(
                 and_(
                     SentimentAnalysis.keyword == keyword,
@@ -147,61 +244,32 @@ async def get_sentiment_analysis(
             .order_by(SentimentAnalysis.date.desc())
         )
         
-        sentiment_data = result.scalars().all()
+        sentiment_data = result.all()
         
         if not sentiment_data:
-            # 如果没有历史数据，尝试实时分析
-            await analysis_service.update_sentiment_analysis(keyword, db)
-            
-            # 重新查询
+            # 时间范围内没有数据时返回最近一次的结果
             result = await db.execute(
-                select(SentimentAnalysis)
-                .where(
-                    and_(
-                        SentimentAnalysis.keyword == keyword,
-                        SentimentAnalysis.date >= start_time
-                    )
-                )
+                select(*SENTIMENT_COLUMNS)
+                .where(SentimentAnalysis.keyword == keyword)
                 .order_by(SentimentAnalysis.date.desc())
+                .limit(1)
             )
-            sentiment_data = result.scalars().all()
-        
-        # 格式化数据
-        sentiment_trends = []
-        total_positive = 0
-        total_negative = 0
-        total_neutral = 0
-        total_posts = 0
+            sentiment_data = result.all()
         
-        for data in sentiment_data:
-            sentiment_trends.append({
-                "date": data.date.strftime("%m/%d"),
-                "positive": data.positive_score,
-                "negative": data.negative_score,
-                "neutral": data.neutral_score,
-                "total_posts": data.total_posts
-            })
-            
-            total_positive += data.positive_score * data.total_posts
-            total_negative += data.negative_score * data.total_posts
-            total_neutral += data.neutral_score * data.total_posts
-            total_posts += data.total_posts
+        last_updated = sentiment_data[0].date if sentiment_data else None
         
-        # 计算总体情绪
-        overall_sentiment = {
-            "positive": round(total_positive / total_posts, 3) if total_posts > 0 else 0,
-            "negative": round(total_negative / total_posts, 3) if total_posts > 0 else 0,
-            "neutral": round(total_neutral / total_posts, 3) if total_posts > 0 else 0
-        }
+        summary = analysis_service.summarize_sentiment(sentiment_data)
         
         return {
             "success": True,
             "data": {
-                "trends": sentiment_trends,
-                "overall": overall_sentiment,
-                "total_analyzed": total_posts,
+                **summary,
                 "keyword": keyword,
-                "days": days
+                "days": days,
+                "stale": sentiment_refresh_service.is_stale(last_updated),
+                "refreshing": sentiment_refresh_service.is_refreshing(keyword),
+                "last_updated": last_updated.isoformat() if last_updated else None,
+                "age_seconds": sentiment_refresh_service.age_seconds(last_updated)
             }
         }
         
@@ -210,76 +278,15 @@ async def get_sentiment_analysis(
         raise HTTPException(status_code=500, detail=f"获取情绪分析数据失败: {str(e)}")
 
 @router.get("/stats")
+@cached_response("stats")
 async def get_stats(
     keyword: Optional[str] = Query(None, description="关键词筛选"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取统计数据"""
     try:
-        stats = {}
-        
-        if keyword:
-            # 特定关键词的统计
-            # 监测关键词数
-            stats["monitored_keywords"] = 1
-            
-            # 热帖数量
-            hot_posts_result = await db.execute(
-                select(func.count(HotPost.id))
-                .where(HotPost.keyword == keyword)
-            )
-            stats["hot_posts"] = hot_posts_result.scalar() or 0
-            
-            # 总互动数
-            interactions_result = await db.execute(
-                select(
-                    func.sum(HotPost.likes_count + HotPost.comments_count)
-                )
-                .where(HotPost.keyword == keyword)
-            )
-            stats["total_interactions"] = interactions_result.scalar() or 0
-            
-            # 情绪指数
-            recent_sentiment = await db.execute(
-                select(SentimentAnalysis)
-                .where(SentimentAnalysis.keyword == keyword)
-                .order_by(SentimentAnalysis.date.desc())
-                .limit(1)
-            )
-            sentiment = recent_sentiment.scalar_one_or_none()
-            if sentiment:
-                stats["sentiment_index"] = round(sentiment.positive_score * 100, 1)
-            else:
-                stats["sentiment_index"] = 50.0
-            
-        else:
-            # 全局统计
-            # 监测关键词数
-            keywords_result = await db.execute(
-                select(func.count(func.distinct(HotPost.keyword)))
-            )
-            stats["monitored_keywords"] = keywords_result.scalar() or 0
-            
-            # 热帖数量
-            hot_posts_result = await db.execute(
-                select(func.count(HotPost.id))
-            )
-            stats["hot_posts"] = hot_posts_result.scalar() or 0
-            
-            # 总互动数
-            interactions_result = await db.execute(
-                select(
-                    func.sum(HotPost.likes_count + HotPost.comments_count)
-                )
-            )
-            stats["total_interactions"] = interactions_result.scalar() or 0
-            
-            # 平均情绪指数
-            avg_sentiment_result = await db.execute(
-                select(func.avg(SentimentAnalysis.positive_score))
-            )
-            avg_sentiment = avg_sentiment_result.scalar()
-            stats["sentiment_index"] = round(avg_sentiment * 100, 1) if avg_sentiment else 50.0
+        # 读取增量维护的统计表，无需扫描热帖和情绪分析表
+        stats = await stats_service.get_stats(keyword, db)
         
         return {
             "success": True,
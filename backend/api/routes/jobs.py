@@ -0,0 +1,87 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from services.job_service import job_service
+from services.collection_coordinator import CollectionBusyError
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("")
+async def list_jobs(
+    status: Optional[str] = Query(None, description="状态筛选: queued, running, success, failed, cancelled"),
+    job_type: Optional[str] = Query(None, description="任务类型筛选: collect, monitor"),
+    limit: int = Query(20, ge=1, le=100, description="返回数量"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的 next_cursor）")
+):
+    """获取后台任务列表（按创建时间倒序）"""
+    try:
+        jobs, next_cursor = await job_service.list_jobs(status, job_type, limit, cursor)
+
+        return {
+            "success": True,
+            "data": jobs,
+            "total": len(jobs),
+            "next_cursor": next_cursor
+        }
+
+    except (ValueError, KeyError):
+        raise HTTPException(status_code=400, detail="无效的分页游标")
+    except Exception as e:
+        logger.error(f"获取后台任务列表失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"获取后台任务列表失败: {str(e)}")
+
+@router.get("/{job_id}")
+async def get_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=600, description="等待任务结束的最长秒数")
+):
+    """获取后台任务状态和进度"""
+    try:
+        job = await job_service.wait(job_id, timeout=wait) if wait else await job_service.get(job_id)
+    except Exception as e:
+        logger.error(f"获取后台任务失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"获取后台任务失败: {str(e)}")
+    if job is None:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    return {
+        "success": True,
+        "data": job
+    }
+
+@router.post("/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """取消后台任务，正在进行的采集随之停止（其他请求仍在等待的采集除外）"""
+    try:
+        job = await job_service.cancel(job_id)
+    except Exception as e:
+        logger.error(f"取消后台任务失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"取消后台任务失败: {str(e)}")
+    if job is None:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    return {
+        "success": True,
+        "message": "任务已取消" if job["status"] == "cancelled" else f"任务已结束（{job['status']}）",
+        "data": job
+    }
+
+@router.post("/{job_id}/retry")
+async def retry_job(job_id: str):
+    """按原参数重新执行失败或已取消的任务"""
+    try:
+        job = await job_service.retry(job_id)
+    except CollectionBusyError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"重试后台任务失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"重试后台任务失败: {str(e)}")
+    if job is None:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    return {
+        "success": True,
+        "message": "任务已重新提交",
+        "data": job
+    }
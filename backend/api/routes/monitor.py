@@ -1,12 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import Dict, Any
-from core.database import get_db, UserConfig
+from typing import Dict, Any, Optional
+from datetime import datetime
+from core.database import get_db, AsyncSessionLocal, UserConfig
+from core.cache import response_cache
+from core.metrics import SCRAPER_KEYWORDS, START_TIME
+from core.slow_query import slow_query_log
+from core.profiling import list_profiles, resolve_profile, check_profile_token, PROFILING_MODE, PROFILE_JOBS
 from services.websocket_manager import manager
-from services.scraper_service import scraper_service
 from services.analysis_service import analysis_service
+from services.collection_coordinator import collection_coordinator, CollectionBusyError
+from services.job_service import job_service, JobContext
 import asyncio
+import time
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,15 +26,15 @@ monitoring_status: Dict[str, Any] = {
     "is_running": False,
     "current_keywords": [],
     "last_update": None,
-    "error_count": 0
+    "error_count": 0,
+    "job_id": None
 }
 
 @router.post("/start")
 async def start_monitoring(
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
-    """启动实时监测"""
+    """启动实时监测（作为可在 /api/jobs 查询和取消的后台任务运行）"""
     try:
         # 获取配置的关键词
         result = await db.execute(
@@ -38,7 +46,7 @@ async def start_monitoring(
             raise HTTPException(status_code=404, detail="未配置关键词，请先配置监测关键词")
         
         # 检查是否已在运行
-        if monitoring_status["is_running"]:
+        if job_service.is_active(monitoring_status["job_id"]):
             return {
                 "success": True,
                 "message": "监测已在运行中",
@@ -50,13 +58,11 @@ async def start_monitoring(
         monitoring_status["current_keywords"] = user_config.keywords
         monitoring_status["error_count"] = 0
         
-        # 添加后台监测任务
-        background_tasks.add_task(
-            _background_monitoring,
-            user_config.keywords,
-            user_config.collection_frequency,
-            db
-        )
+        job = await job_service.create("monitor", {
+            "keywords": user_config.keywords,
+            "frequency": user_config.collection_frequency
+        })
+        monitoring_status["job_id"] = job["id"]
         
         # 通知所有连接的客户端
         await manager.broadcast({
@@ -70,6 +76,8 @@ async def start_monitoring(
             "data": monitoring_status
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"启动监测失败: {str(e)}")
         monitoring_status["is_running"] = False
@@ -77,8 +85,10 @@ async def start_monitoring(
 
 @router.post("/stop")
 async def stop_monitoring():
-    """停止实时监测"""
+    """停止实时监测：取消监测任务，正在进行的采集随之停止"""
     try:
+        if monitoring_status["job_id"]:
+            await job_service.cancel(monitoring_status["job_id"])
         monitoring_status["is_running"] = False
         monitoring_status["current_keywords"] = []
         
@@ -111,32 +121,39 @@ async def get_monitoring_status():
         logger.error(f"获取监测状态失败: {str(e)}")
         raise HTTPException(status_code=500, detail=f"获取监测状态失败: {str(e)}")
 
-async def _background_monitoring(keywords: list, frequency: str, db: AsyncSession):
-    """后台监测任务"""
+async def monitor_job(ctx: JobContext):
+    """实时监测任务：按采集频率循环采集、分析并检查热帖提醒，直到被取消"""
+    keywords = ctx.params["keywords"]
+    # 根据频率设置监测间隔
+    interval_map = {
+        "realtime": 300,  # 5分钟
+        "hourly": 3600,   # 1小时
+        "daily": 86400    # 24小时
+    }
+    interval = interval_map.get(ctx.params.get("frequency"), 3600)
+    monitoring_status["is_running"] = True
+    monitoring_status["current_keywords"] = keywords
+    monitoring_status["job_id"] = ctx.job_id
+    cycles = 0
+    
     try:
-        # 根据频率设置监测间隔
-        interval_map = {
-            "realtime": 300,  # 5分钟
-            "hourly": 3600,   # 1小时
-            "daily": 86400    # 24小时
-        }
-        interval = interval_map.get(frequency, 3600)
-        
-        while monitoring_status["is_running"]:
+        while True:
             try:
                 logger.info(f"开始监测循环，关键词: {keywords}")
                 
-                # 执行数据采集
-                results = await scraper_service.batch_collect_data(keywords, db)
-                
-                # 更新分析数据
-                for keyword in keywords:
-                    await analysis_service.update_word_cloud_data(keyword, db)
-                    await analysis_service.update_sentiment_analysis(keyword, db)
+                # 经采集协调器执行采集和分析，与手动触发、定时任务的同关键词采集合并
+                runs = collection_coordinator.submit(keywords)
+                try:
+                    await collection_coordinator.wait(runs)
+                except asyncio.CancelledError:
+                    collection_coordinator.release(runs)
+                    raise
+                results = {run.keyword: run.result or {"error": run.error} for run in runs}
                 
                 # 更新监测状态
-                from datetime import datetime
                 monitoring_status["last_update"] = datetime.utcnow().isoformat()
+                cycles += 1
+                await ctx.progress(cycles, None, f"已完成 {cycles} 轮监测，最近一轮 {monitoring_status['last_update']}")
                 
                 # 推送更新通知
                 await manager.broadcast({
@@ -149,20 +166,23 @@ async def _background_monitoring(keywords: list, frequency: str, db: AsyncSessio
                 })
                 
                 # 检查热帖提醒
-                await _check_hot_posts_alert(keywords, db)
+                async with AsyncSessionLocal() as db:
+                    await _check_hot_posts_alert(keywords, db)
                 
                 logger.info(f"监测循环完成，等待 {interval} 秒")
                 
                 # 等待下一次监测
                 await asyncio.sleep(interval)
                 
+            except CollectionBusyError as e:
+                logger.warning(f"采集队列已满，本轮监测跳过，{e.retry_after} 秒后重试")
+                await asyncio.sleep(e.retry_after)
             except Exception as e:
                 logger.error(f"监测循环出错: {str(e)}")
                 monitoring_status["error_count"] += 1
                 
                 # 如果错误太多，停止监测
                 if monitoring_status["error_count"] > 5:
-                    monitoring_status["is_running"] = False
                     await manager.broadcast({
                         "type": "monitoring_error",
                         "data": {
@@ -170,16 +190,16 @@ async def _background_monitoring(keywords: list, frequency: str, db: AsyncSessio
                             "error_count": monitoring_status["error_count"]
                         }
                     })
-                    break
+                    raise RuntimeError(f"监测连续出错 {monitoring_status['error_count']} 次，已自动停止")
                 
                 # 等待后重试
                 await asyncio.sleep(60)
-        
+    finally:
         logger.info("监测任务结束")
-        
-    except Exception as e:
-        logger.error(f"后台监测任务失败: {str(e)}")
-        monitoring_status["is_running"] = False
+        if monitoring_status["job_id"] == ctx.job_id:
+            monitoring_status["is_running"] = False
+
+job_service.register("monitor", monitor_job)
 
 async def _check_hot_posts_alert(keywords: list, db: AsyncSession):
     """检查热帖提醒"""
@@ -242,6 +262,7 @@ async def update_monitoring_frequency(
         if user_config:
             user_config.collection_frequency = frequency
             await db.commit()
+            await response_cache.invalidate_config()
         
         return {
             "success": True,
@@ -258,15 +279,20 @@ async def update_monitoring_frequency(
 
 @router.get("/metrics")
 async def get_monitoring_metrics():
-    """获取监测指标"""
+    """获取监测指标（Prometheus 格式的完整指标见 /metrics）"""
     try:
+        succeeded = SCRAPER_KEYWORDS.get(status="success")
+        attempted = succeeded + SCRAPER_KEYWORDS.get(status="failed")
         metrics = {
             "is_running": monitoring_status["is_running"],
             "keywords_count": len(monitoring_status["current_keywords"]),
             "last_update": monitoring_status["last_update"],
             "error_count": monitoring_status["error_count"],
-            "uptime": None,  # 可以添加运行时间计算
-            "success_rate": None  # 可以添加成功率计算
+            "uptime": round(time.time() - START_TIME),
+            "success_rate": round(succeeded / attempted, 3) if attempted else None,
+            "response_cache": response_cache.stats(),
+            "collection": collection_coordinator.stats(),
+            "slow_queries": slow_query_log.stats()
         }
         
         return {
@@ -276,4 +302,70 @@ async def get_monitoring_metrics():
         
     except Exception as e:
         logger.error(f"获取监测指标失败: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"获取监测指标失败: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"获取监测指标失败: {str(e)}")
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(50, ge=1, le=500, description="返回数量"),
+    min_ms: float = Query(0, ge=0, description="最短耗时（毫秒）"),
+    engine: Optional[str] = Query(None, description="引擎筛选: primary, read")
+):
+    """获取最近的慢查询（含参数和调用位置，新的在前）"""
+    try:
+        entries = slow_query_log.recent(limit, min_ms, engine)
+        return {
+            "success": True,
+            "data": {
+                "queries": entries,
+                "total": len(entries),
+                **slow_query_log.stats()
+            }
+        }
+    except Exception as e:
+        logger.error(f"获取慢查询日志失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"获取慢查询日志失败: {str(e)}")
+
+@router.delete("/slow-queries")
+async def clear_slow_queries():
+    """清空慢查询日志"""
+    slow_query_log.clear()
+    return {
+        "success": True,
+        "message": "慢查询日志已清空"
+    }
+
+async def require_profile_token(x_profile_token: Optional[str] = Header(None)):
+    """剖析结果含调用栈和代码位置，凭 PROFILE_TOKEN 访问"""
+    if not check_profile_token(x_profile_token):
+        raise HTTPException(status_code=403, detail="缺少或无效的剖析令牌")
+
+@router.get("/profiles", dependencies=[Depends(require_profile_token)])
+async def get_profiles():
+    """列出采样剖析结果（请求响应头 X-Profile-Id 即对应的 id）"""
+    try:
+        profiles = list_profiles()
+        return {
+            "success": True,
+            "data": {
+                "profiles": profiles,
+                "total": len(profiles),
+                "mode": PROFILING_MODE,
+                "profile_jobs": PROFILE_JOBS
+            }
+        }
+    except Exception as e:
+        logger.error(f"获取剖析结果列表失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"获取剖析结果列表失败: {str(e)}")
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_profile_token)])
+async def download_profile(profile_id: str):
+    """下载单个剖析结果（folded 格式，可用 flamegraph.pl 或 speedscope 查看）"""
+    try:
+        path = resolve_profile(profile_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return FileResponse(
+        path,
+        media_type="text/plain; charset=utf-8",
+        filename=f"{profile_id}.folded"
+    )
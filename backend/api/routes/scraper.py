@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, tuple_
 from typing import List, Optional
+from datetime import datetime
 from pydantic import BaseModel
-from core.database import get_db, ScrapingLog, UserConfig
+from core.database import get_db, get_read_db, read_session, ScrapingLog, UserConfig
+from core.pagination import encode_cursor, decode_cursor
+from core.serialization import ndjson_response, EXPORT_BATCH_SIZE
 from services.scraper_service import scraper_service
-from services.analysis_service import analysis_service
+from services.collection_coordinator import collection_coordinator, CollectionBusyError
+from services.job_service import job_service
 import logging
 
 logger = logging.getLogger(__name__)
@@ -34,21 +38,19 @@ async def login():
         logger.error(f"登录失败: {str(e)}")
         raise HTTPException(status_code=500, detail=f"登录失败: {str(e)}")
 
+def _busy_response(e: CollectionBusyError) -> HTTPException:
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
 @router.post("/search")
 async def manual_search(
     request: SearchRequest,
-    background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db)
+    wait: float = Query(0, ge=0, le=600, description="等待采集完成的最长秒数，0 表示立即返回"),
 ):
-    """手动触发搜索"""
+    """手动触发搜索，创建采集任务（进度见 /api/jobs/{job_id}）；关键词已在采集中时合并到进行中的采集"""
     try:
-        # 添加后台任务进行数据采集
-        background_tasks.add_task(
-            _background_collect,
-            request.keywords,
-            request.limit,
-            db
-        )
+        job = await job_service.create("collect", {"keywords": request.keywords, "analyze": True})
+        if wait:
+            job = await job_service.wait(job["id"], timeout=wait)
         
         return {
             "success": True,
@@ -56,29 +58,44 @@ async def manual_search(
             "data": {
                 "keywords": request.keywords,
                 "limit": request.limit,
-                "status": "started"
+                "status": job["status"],
+                "job_id": job["id"],
+                "job": job
             }
         }
         
+    except CollectionBusyError as e:
+        raise _busy_response(e)
     except Exception as e:
         logger.error(f"启动搜索任务失败: {str(e)}")
         raise HTTPException(status_code=500, detail=f"启动搜索任务失败: {str(e)}")
 
-async def _background_collect(keywords: List[str], limit: int, db: AsyncSession):
-    """后台采集任务"""
-    try:
-        # 执行批量采集
-        results = await scraper_service.batch_collect_data(keywords, db)
-        
-        # 更新词云和情绪分析数据
-        for keyword in keywords:
-            await analysis_service.update_word_cloud_data(keyword, db)
-            await analysis_service.update_sentiment_analysis(keyword, db)
-        
-        logger.info(f"后台采集完成: {results}")
-        
-    except Exception as e:
-        logger.error(f"后台采集失败: {str(e)}")
+@router.get("/runs")
+async def list_collection_runs(
+    active: bool = Query(False, description="只返回排队或执行中的任务")
+):
+    """获取采集任务列表及协调器状态"""
+    return {
+        "success": True,
+        "data": [run.to_dict() for run in collection_coordinator.list_runs(active)],
+        "stats": collection_coordinator.stats()
+    }
+
+@router.get("/runs/{run_id}")
+async def get_collection_run(
+    run_id: str,
+    wait: float = Query(0, ge=0, le=600, description="等待任务完成的最长秒数")
+):
+    """查询采集任务状态"""
+    run = collection_coordinator.get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="采集任务不存在或已过期")
+    if wait:
+        await collection_coordinator.wait([run], timeout=wait)
+    return {
+        "success": True,
+        "data": run.to_dict()
+    }
 
 @router.post("/analyze")
 async def analyze_note(
@@ -98,8 +115,9 @@ async def analyze_note(
         await db.commit()
         
         try:
-            # 获取笔记内容
-            content = await scraper_service.get_note_content(request.url)
+            # 获取笔记内容（与采集任务共用浏览器页面，需占用采集名额）
+            async with collection_coordinator.slot():
+                content = await scraper_service.get_note_content(request.url)
             
             # 更新日志
             log.status = "success"
@@ -124,48 +142,102 @@ async def analyze_note(
         logger.error(f"分析笔记失败: {str(e)}")
         raise HTTPException(status_code=500, detail=f"分析笔记失败: {str(e)}")
 
+# 采集日志列表投影的列
+LOG_COLUMNS = (
+    ScrapingLog.id, ScrapingLog.task_type, ScrapingLog.keyword, ScrapingLog.status,
+    ScrapingLog.message, ScrapingLog.data_count, ScrapingLog.started_at, ScrapingLog.completed_at
+)
+
+def _format_log(log) -> dict:
+    return {
+        "id": log.id,
+        "task_type": log.task_type,
+        "keyword": log.keyword,
+        "status": log.status,
+        "message": log.message,
+        "data_count": log.data_count,
+        "started_at": log.started_at.isoformat(),
+        "completed_at": log.completed_at.isoformat() if log.completed_at else None
+    }
+
 @router.get("/logs")
 async def get_scraping_logs(
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=100, description="返回数量"),
     task_type: Optional[str] = None,
-    db: AsyncSession = Depends(get_db)
+    status: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的 next_cursor）"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取采集日志"""
     try:
-        query = select(ScrapingLog).order_by(desc(ScrapingLog.started_at)).limit(limit)
+        # 按 (started_at, id) 倒序做游标分页，新日志写入不会打乱已翻过的页
+        query = (
+            select(*LOG_COLUMNS)
+            .order_by(desc(ScrapingLog.started_at), desc(ScrapingLog.id))
+            .limit(limit + 1)
+        )
         
         if task_type:
             query = query.where(ScrapingLog.task_type == task_type)
+        if status:
+            query = query.where(ScrapingLog.status == status)
+        if cursor:
+            position = decode_cursor(cursor)
+            query = query.where(
+                tuple_(ScrapingLog.started_at, ScrapingLog.id)
+                < tuple_(datetime.fromisoformat(position["started_at"]), position["id"])
+            )
         
         result = await db.execute(query)
-        logs = result.scalars().all()
-        
-        log_data = []
-        for log in logs:
-            log_data.append({
-                "id": log.id,
-                "task_type": log.task_type,
-                "keyword": log.keyword,
-                "status": log.status,
-                "message": log.message,
-                "data_count": log.data_count,
-                "started_at": log.started_at.isoformat(),
-                "completed_at": log.completed_at.isoformat() if log.completed_at else None
-            })
+        logs = result.all()
+        has_more = len(logs) > limit
+        logs = logs[:limit]
+        
+        log_data = [_format_log(log) for log in logs]
+        
+        next_cursor = None
+        if has_more:
+            next_cursor = encode_cursor({"started_at": logs[-1].started_at.isoformat(), "id": logs[-1].id})
         
         return {
             "success": True,
             "data": log_data,
-            "total": len(log_data)
+            "total": len(log_data),
+            "next_cursor": next_cursor
         }
         
+    except (ValueError, KeyError):
+        raise HTTPException(status_code=400, detail="无效的分页游标")
     except Exception as e:
         logger.error(f"获取采集日志失败: {str(e)}")
         raise HTTPException(status_code=500, detail=f"获取采集日志失败: {str(e)}")
 
+@router.get("/logs/export")
+async def export_scraping_logs(
+    task_type: Optional[str] = None,
+    status: Optional[str] = None
+):
+    """以 NDJSON 流式导出全部采集日志（按开始时间倒序）"""
+    query = (
+        select(*LOG_COLUMNS)
+        .order_by(desc(ScrapingLog.started_at), desc(ScrapingLog.id))
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    if task_type:
+        query = query.where(ScrapingLog.task_type == task_type)
+    if status:
+        query = query.where(ScrapingLog.status == status)
+
+    async def rows():
+        async with read_session() as db:
+            result = await db.stream(query)
+            async for log in result:
+                yield _format_log(log)
+
+    return ndjson_response(rows(), filename="scraping_logs.ndjson")
+
 @router.post("/collect-all")
 async def collect_all_keywords(
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
     """采集所有配置的关键词"""
@@ -179,13 +251,8 @@ async def collect_all_keywords(
         if not user_config or not user_config.keywords:
             raise HTTPException(status_code=404, detail="未配置关键词")
         
-        # 添加后台任务
-        background_tasks.add_task(
-            _background_collect,
-            user_config.keywords,
-            50,  # 默认每个关键词采集50条
-            db
-        )
+        # 创建采集任务，已在采集中的关键词合并到进行中的采集
+        job = await job_service.create("collect", {"keywords": user_config.keywords, "analyze": True})
         
         return {
             "success": True,
@@ -193,10 +260,13 @@ async def collect_all_keywords(
             "data": {
                 "keywords": user_config.keywords,
                 "total_keywords": len(user_config.keywords),
-                "status": "started"
+                "status": job["status"],
+                "job_id": job["id"]
             }
         }
         
+    except CollectionBusyError as e:
+        raise _busy_response(e)
     except Exception as e:
         logger.error(f"启动全量采集失败: {str(e)}")
         raise HTTPException(status_code=500, detail=f"启动全量采集失败: {str(e)}")
@@ -0,0 +1 @@
+# 基准测试脚本
\ No newline at end of file
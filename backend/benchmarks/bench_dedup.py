@@ -0,0 +1,48 @@
+"""近重复索引基准：测量 SimHash 指纹计算与索引查找的单条耗时
+
+用法（在 backend 目录下执行）::
+
+    python -m benchmarks.bench_dedup [--posts 100000]
+"""
+import argparse
+import random
+import time
+
+from benchmarks.bench_sentiment import load_corpus
+from services.dedup_service import NearDuplicateService
+
+def main():
+    parser = argparse.ArgumentParser(description="近重复索引基准测试")
+    parser.add_argument("--posts", type=int, default=100000, help="索引中的指纹数量")
+    parser.add_argument("--lookups", type=int, default=10000, help="查找次数")
+    args = parser.parse_args()
+
+    service = NearDuplicateService()
+    rng = random.Random(42)
+    for post_id in range(args.posts):
+        service.add(post_id, rng.getrandbits(64), "bench")
+
+    _, texts = load_corpus()
+    started = time.perf_counter()
+    fingerprints = [service.fingerprint(text, None) for text in texts]
+    fingerprint_us = (time.perf_counter() - started) / len(texts) * 1e6
+
+    # 一半查询为已有指纹翻转 2 位（应命中），一半为随机指纹
+    queries = []
+    for i in range(args.lookups):
+        if i % 2:
+            base = service.fingerprints[rng.randrange(args.posts)]
+            queries.append(base ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64)))
+        else:
+            queries.append(rng.getrandbits(64))
+
+    started = time.perf_counter()
+    hits = sum(service.find_duplicate(q, "bench") is not None for q in queries)
+    lookup_us = (time.perf_counter() - started) / len(queries) * 1e6
+
+    print(f"指纹计算: {fingerprint_us:.1f} µs/条（含 jieba 分词）")
+    print(f"索引规模 {args.posts} 条，查找: {lookup_us:.2f} µs/次，命中 {hits}/{len(queries)}")
+    print(f"语料指纹示例: {fingerprints[0]:016x}")
+
+if __name__ == "__main__":
+    main()
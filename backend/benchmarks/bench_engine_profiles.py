@@ -0,0 +1,144 @@
+"""数据库引擎配置档基准：在持续写入的同时测量读查询延迟
+
+每个配置档使用独立的写引擎和读引擎：一个写协程模拟采集任务逐批写入热帖与声量并提交，
+多个读协程反复执行热帖排行和趋势查询，统计读延迟分位数与写入吞吐。
+SQLite 默认在临时文件库上运行，每个配置档一个新库（WAL 设置会持久化到库文件）；
+PostgreSQL 通过 --url 指定，各配置档共用同一个库。
+
+用法（在 backend 目录下执行）::
+
+    python -m benchmarks.bench_engine_profiles [--profiles default sqlite] [--seconds 10]
+    python -m benchmarks.bench_engine_profiles --url postgresql+asyncpg://... --profiles default postgresql
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import numpy as np
+from sqlalchemy import select, func, and_
+
+from core.database import run_migrations, HotPost, KeywordTrend
+from core.engine_profiles import create_profiled_engine, is_sqlite_file
+
+KEYWORDS = ["护肤", "美妆", "穿搭", "旅行", "美食"]
+
+async def writer(engine, stop: asyncio.Event, batch_size: int, counter: List[int]):
+    """模拟采集任务：每批写入声量和热帖后提交"""
+    rng = random.Random(7)
+    prefix = f"bench-{os.getpid()}-{time.time_ns()}"
+    seq = 0
+    while not stop.is_set():
+        async with engine.begin() as conn:
+            now = datetime.utcnow()
+            keyword = rng.choice(KEYWORDS)
+            await conn.execute(KeywordTrend.__table__.insert(), [{"keyword": keyword, "date": now, "count": rng.randint(0, 50)}])
+            await conn.execute(HotPost.__table__.insert(), [
+                {
+                    "post_id": f"{prefix}-{seq + i}",
+                    "title": "基准测试帖子",
+                    "content": "基准测试内容" * 20,
+                    "keyword": keyword,
+                    "likes_count": rng.randint(0, 5000),
+                    "comments_count": rng.randint(0, 500),
+                    "hot_score": rng.random() * 3000,
+                    "collected_at": now,
+                    "duplicate_count": 0,
+                }
+                for i in range(batch_size)
+            ])
+        seq += batch_size
+        counter[0] += batch_size
+        await asyncio.sleep(0)
+
+async def reader(engine, stop: asyncio.Event, latencies: List[float]):
+    """反复执行热帖排行与小时趋势查询"""
+    rng = random.Random()
+    while not stop.is_set():
+        keyword = rng.choice(KEYWORDS)
+        since = datetime.utcnow() - timedelta(days=1)
+        started = time.perf_counter()
+        async with engine.connect() as conn:
+            await conn.execute(
+                select(HotPost.id, HotPost.title, HotPost.hot_score)
+                .where(and_(HotPost.keyword == keyword, HotPost.duplicate_of.is_(None)))
+                .order_by(HotPost.hot_score.desc(), HotPost.id.desc())
+                .limit(20)
+            )
+            await conn.execute(
+                select(func.count(KeywordTrend.id), func.sum(KeywordTrend.count))
+                .where(and_(KeywordTrend.keyword == keyword, KeywordTrend.date >= since))
+            )
+        latencies.append(time.perf_counter() - started)
+
+async def run_profile(url: str, profile: str, seconds: float, readers: int, batch_size: int) -> dict:
+    write_engine = create_profiled_engine(url, profile=profile, echo=False)
+    read_engine = create_profiled_engine(url, read_only=True, profile=profile, echo=False) \
+        if is_sqlite_file(url) else write_engine
+
+    async with write_engine.connect() as conn:
+        await conn.run_sync(run_migrations)
+
+    stop = asyncio.Event()
+    latencies: List[float] = []
+    written = [0]
+    errors = 0
+    tasks = [asyncio.create_task(writer(write_engine, stop, batch_size, written))]
+    tasks += [asyncio.create_task(reader(read_engine, stop, latencies)) for _ in range(readers)]
+    await asyncio.sleep(seconds)
+    stop.set()
+    for result in await asyncio.gather(*tasks, return_exceptions=True):
+        if isinstance(result, Exception):
+            errors += 1
+            print(f"    [{profile}] 任务异常: {result!r}")
+
+    if read_engine is not write_engine:
+        await read_engine.dispose()
+    await write_engine.dispose()
+
+    samples = np.asarray(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        "reads": len(latencies),
+        "p50": float(np.percentile(samples, 50)),
+        "p95": float(np.percentile(samples, 95)),
+        "p99": float(np.percentile(samples, 99)),
+        "writes_per_s": written[0] / seconds,
+        "errors": errors,
+    }
+
+async def main_async(args):
+    for profile in args.profiles:
+        if args.url:
+            url = args.url
+            workdir = None
+        else:
+            workdir = tempfile.TemporaryDirectory()
+            url = f"sqlite+aiosqlite:///{os.path.join(workdir.name, 'bench.db')}"
+        try:
+            stats = await run_profile(url, profile, args.seconds, args.readers, args.batch_size)
+        finally:
+            if workdir:
+                workdir.cleanup()
+        print(
+            f"[{profile}] 读 {stats['reads']} 次  p50 {stats['p50']:.2f} ms  p95 {stats['p95']:.2f} ms  "
+            f"p99 {stats['p99']:.2f} ms  写入 {stats['writes_per_s']:.0f} 行/秒  异常 {stats['errors']}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="数据库引擎配置档基准测试")
+    parser.add_argument("--url", default=None, help="数据库 URL，缺省时使用临时 SQLite 文件库")
+    parser.add_argument("--profiles", nargs="+", default=None, help="要对比的配置档，缺省为 default 与 URL 对应的配置档")
+    parser.add_argument("--seconds", type=float, default=10, help="每个配置档的运行时长（秒）")
+    parser.add_argument("--readers", type=int, default=8, help="并发读协程数")
+    parser.add_argument("--batch-size", type=int, default=20, help="每次提交写入的热帖数")
+    args = parser.parse_args()
+    if not args.profiles:
+        args.profiles = ["default", "postgresql" if args.url and args.url.startswith("postgresql") else "sqlite"]
+    asyncio.run(main_async(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""情绪引擎基准：对比 snownlp 与 lexicon 引擎的吞吐量与一致性
+
+用法（在 backend 目录下执行）::
+
+    python -m benchmarks.bench_sentiment [--repeat 20]
+"""
+import argparse
+import os
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from services.analysis_service import SENTIMENT_ENGINES
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus", "sentiment_zh.txt")
+
+def load_corpus(path: str = CORPUS_PATH) -> Tuple[List[str], List[str]]:
+    """读取标注语料，返回 (标签列表, 文本列表)"""
+    labels, texts = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            label, text = line.split("\t", 1)
+            labels.append(label)
+            texts.append(text)
+    return labels, texts
+
+def to_labels(scores: np.ndarray) -> np.ndarray:
+    """按 analyze_sentiment 的阈值把分数映射为三分类标签"""
+    labels = np.full(scores.shape, "neutral", dtype=object)
+    labels[scores > 0.6] = "positive"
+    labels[scores < 0.4] = "negative"
+    return labels
+
+def main():
+    parser = argparse.ArgumentParser(description="情绪引擎基准测试")
+    parser.add_argument("--repeat", type=int, default=20, help="语料重复倍数")
+    args = parser.parse_args()
+
+    gold, texts = load_corpus()
+    batch = texts * args.repeat
+    predictions = {}
+
+    print(f"语料: {len(texts)} 条, 基准批量: {len(batch)} 条")
+    for name, engine_cls in SENTIMENT_ENGINES.items():
+        engine = engine_cls()
+        if not engine.is_available():
+            print(f"[{name}] 不可用，跳过")
+            continue
+
+        engine.score_batch(texts[:5])  # 预热（加载模型/词典）
+        started = time.perf_counter()
+        engine.score_batch(batch)
+        elapsed = time.perf_counter() - started
+
+        predictions[name] = to_labels(engine.score_batch(texts))
+        accuracy = float(np.mean(predictions[name] == np.asarray(gold, dtype=object)))
+        print(f"[{name}] {elapsed * 1000:.1f} ms, {len(batch) / elapsed:.0f} 条/秒, 标注准确率 {accuracy:.1%}")
+
+    if "snownlp" in predictions and "lexicon" in predictions:
+        agreement = predictions["snownlp"] == predictions["lexicon"]
+        print(f"lexicon 与 snownlp 三分类一致率: {float(np.mean(agreement)):.1%}")
+        for label in ("positive", "negative", "neutral"):
+            mask = predictions["snownlp"] == label
+            if mask.any():
+                print(f"  snownlp={label}: 一致率 {float(np.mean(agreement[mask])):.1%} ({int(mask.sum())} 条)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""响应序列化基准：对比标准库 json 与 orjson 在典型接口负载上的编码耗时，以及 NDJSON 流式输出的内存峰值
+
+负载按真实接口的结构构造：热帖列表（含正文，正文取自情绪语料）、多关键词小时粒度趋势、看板聚合。
+每种负载比较三条路径：
+  - json：FastAPI 默认路径，jsonable_encoder 后用 json.dumps 编码
+  - orjson：jsonable_encoder 后用 orjson 编码（默认响应类 ORJSONResponse 的路径）
+  - direct：跳过 jsonable_encoder 直接编码（响应缓存和 cached_response 的路径）
+
+用法（在 backend 目录下执行）::
+
+    python -m benchmarks.bench_serialization [--posts 2000] [--repeat 20]
+"""
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+
+from benchmarks.bench_sentiment import load_corpus
+from core.serialization import dumps, ORJSON_AVAILABLE
+
+KEYWORDS = ["护肤", "美妆", "穿搭", "旅行", "美食"]
+
+def build_hot_posts(count: int, texts: List[str]) -> List[Dict[str, Any]]:
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    return [
+        {
+            "id": i,
+            "rank": i,
+            "title": texts[i % len(texts)][:20],
+            "author": f"用户{rng.randint(1000, 9999)}",
+            "content": " ".join(rng.choice(texts) for _ in range(8)),
+            "likes_count": rng.randint(0, 50000),
+            "comments_count": rng.randint(0, 5000),
+            "hot_score": round(rng.random() * 3000, 2),
+            "duplicate_count": 0,
+            "url": f"https://www.xiaohongshu.com/explore/{rng.getrandbits(64):016x}",
+            "keyword": rng.choice(KEYWORDS),
+            "publish_time": (now - timedelta(minutes=i)).isoformat(),
+            "collected_at": now.isoformat()
+        }
+        for i in range(1, count + 1)
+    ]
+
+def build_trends(days: int) -> Dict[str, List[Dict[str, Any]]]:
+    rng = random.Random(11)
+    start = datetime.utcnow() - timedelta(days=days)
+    return {
+        keyword: [
+            {"date": (start + timedelta(hours=h)).isoformat(), "value": rng.randint(0, 500)}
+            for h in range(days * 24)
+        ]
+        for keyword in KEYWORDS
+    }
+
+def build_payloads(posts: int) -> Dict[str, Any]:
+    _, texts = load_corpus()
+    hot_posts = build_hot_posts(posts, texts)
+    trends = build_trends(30)
+    return {
+        "hot-posts": {"success": True, "data": hot_posts, "total": len(hot_posts), "next_cursor": None},
+        "trends": {"success": True, "data": trends, "keywords": KEYWORDS, "days": 30, "granularity": "hour"},
+        "dashboard": {
+            "success": True,
+            "data": {
+                "keywords": KEYWORDS,
+                "trends": build_trends(7),
+                "hot_posts": {keyword: hot_posts[:10] for keyword in KEYWORDS},
+                "word_cloud": {"merged": [{"word": t[:2], "size": 1.0} for t in texts[:50]], "keywords": {}},
+                "errors": {}
+            }
+        }
+    }
+
+def encode_json(value: Any) -> bytes:
+    return json.dumps(jsonable_encoder(value), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def encode_orjson(value: Any) -> bytes:
+    return dumps(jsonable_encoder(value))
+
+def timeit(fn: Callable[[Any], bytes], value: Any, repeat: int) -> float:
+    fn(value)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(value)
+    return (time.perf_counter() - started) / repeat * 1000
+
+def peak_memory(fn: Callable[[], None]) -> float:
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description="响应序列化基准测试")
+    parser.add_argument("--posts", type=int, default=2000, help="热帖列表条数")
+    parser.add_argument("--repeat", type=int, default=20, help="每条路径重复次数")
+    args = parser.parse_args()
+
+    if not ORJSON_AVAILABLE:
+        print("orjson 未安装，orjson / direct 路径实际使用标准库 json")
+
+    payloads = build_payloads(args.posts)
+    paths = {"json": encode_json, "orjson": encode_orjson, "direct": dumps}
+    for name, payload in payloads.items():
+        size = len(dumps(payload)) / 1024
+        timings = {path: timeit(fn, payload, args.repeat) for path, fn in paths.items()}
+        print(
+            f"[{name}] {size:.0f} KiB  " +
+            "  ".join(f"{path} {ms:.2f} ms" for path, ms in timings.items()) +
+            f"  加速 {timings['json'] / timings['direct']:.1f}x"
+        )
+
+    # 导出：一次性编码整个列表 vs 逐行编码（NDJSON），只保留当前行
+    _, texts = load_corpus()
+    rows = args.posts * 10
+
+    def whole():
+        dumps(build_hot_posts(rows, texts))
+
+    def streamed():
+        for i in range(0, rows, 500):
+            for post in build_hot_posts(min(500, rows - i), texts):
+                dumps(post) + b"\n"
+
+    print(f"[export {rows} 行] 整体编码峰值 {peak_memory(whole):.1f} MiB  NDJSON 逐行峰值 {peak_memory(streamed):.1f} MiB")
+
+if __name__ == "__main__":
+    main()
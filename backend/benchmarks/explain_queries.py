@@ -0,0 +1,92 @@
+"""索引使用检查：在迁移后的空 SQLite 库上对各接口的热点查询执行 EXPLAIN QUERY PLAN，
+确认每条查询都命中索引而不是全表扫描，带 ORDER BY 的查询直接按索引顺序读取而不做临时排序
+
+用法（在 backend 目录下执行）::
+
+    python -m benchmarks.explain_queries
+
+同样的检查由 tests/test_query_plans.py 在 pytest 中执行。
+"""
+import asyncio
+import sys
+from typing import List
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func, and_, desc, tuple_
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.database import (
+    run_migrations, HotPost, WordCloudSnapshot, SentimentAnalysis, ScrapingLog, KeywordTrend, KeywordTrendRollup
+)
+from services.analysis_service import HOT_POST_LIST_COLUMNS, SENTIMENT_COLUMNS
+from api.routes.scraper import LOG_COLUMNS
+
+def hot_queries():
+    """各接口使用的查询（与 services/ 和 api/routes/ 中的写法保持一致）"""
+    since = datetime.utcnow() - timedelta(days=7)
+    return {
+        "热帖排行(按关键词)": select(*HOT_POST_LIST_COLUMNS)
+            .where(and_(HotPost.keyword == "护肤", HotPost.duplicate_of.is_(None)))
+            .order_by(HotPost.hot_score.desc(), HotPost.id.desc()).limit(11),
+        "热帖排行(全局, 游标翻页)": select(*HOT_POST_LIST_COLUMNS)
+            .where(and_(HotPost.duplicate_of.is_(None), tuple_(HotPost.hot_score, HotPost.id) < tuple_(100.0, 500)))
+            .order_by(HotPost.hot_score.desc(), HotPost.id.desc()).limit(11),
+        "词云/情绪分析取帖": select(HotPost.title, HotPost.content)
+            .where(and_(HotPost.keyword == "护肤", HotPost.collected_at >= since)).limit(100),
+        "关键词趋势(小时)": select(KeywordTrend.keyword, func.strftime("%Y-%m-%d %H:00:00", KeywordTrend.date), func.sum(KeywordTrend.count))
+            .where(and_(KeywordTrend.keyword.in_(["护肤", "美妆"]), KeywordTrend.date >= since))
+            .group_by(KeywordTrend.keyword, func.strftime("%Y-%m-%d %H:00:00", KeywordTrend.date)),
+        "关键词趋势(日/周汇总)": select(KeywordTrendRollup.keyword, KeywordTrendRollup.bucket, KeywordTrendRollup.count)
+            .where(and_(
+                KeywordTrendRollup.granularity == "day",
+                KeywordTrendRollup.keyword.in_(["护肤", "美妆"]),
+                KeywordTrendRollup.bucket >= since
+            )),
+        "词云最新快照": select(WordCloudSnapshot)
+            .where(and_(WordCloudSnapshot.keyword == "护肤", WordCloudSnapshot.date >= since))
+            .order_by(WordCloudSnapshot.date.desc()).limit(1),
+        "情绪分析": select(*SENTIMENT_COLUMNS)
+            .where(and_(SentimentAnalysis.keyword == "护肤", SentimentAnalysis.date >= since))
+            .order_by(SentimentAnalysis.date.desc()),
+        "采集日志(按类型)": select(*LOG_COLUMNS)
+            .where(ScrapingLog.task_type == "search")
+            .order_by(desc(ScrapingLog.started_at), desc(ScrapingLog.id)).limit(21),
+        "采集日志(按状态, 游标翻页)": select(*LOG_COLUMNS)
+            .where(and_(ScrapingLog.status == "failed", tuple_(ScrapingLog.started_at, ScrapingLog.id) < tuple_(since, 500)))
+            .order_by(desc(ScrapingLog.started_at), desc(ScrapingLog.id)).limit(21),
+        "采集日志(全部)": select(*LOG_COLUMNS)
+            .order_by(desc(ScrapingLog.started_at), desc(ScrapingLog.id)).limit(21),
+    }
+
+async def query_plan(conn, query) -> List[str]:
+    """在给定连接上执行 EXPLAIN QUERY PLAN，返回各步骤描述"""
+    compiled = query.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+    params = tuple(compiled.params[key] for key in compiled.positiontup)
+    result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params)
+    return [row[-1] for row in result.fetchall()]
+
+def plan_problems(plan: List[str]) -> List[str]:
+    """查询计划中的问题步骤：不带索引的 SCAN 即全表扫描；ORDER BY 需要临时排序说明没用上有序索引"""
+    problems = [step for step in plan if step.startswith("SCAN") and "INDEX" not in step]
+    problems += [step for step in plan if "TEMP B-TREE FOR ORDER BY" in step]
+    if not any("INDEX" in step for step in plan):
+        problems.append("未使用任何索引")
+    return problems
+
+async def explain_all() -> bool:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    all_indexed = True
+    async with engine.connect() as conn:
+        await conn.run_sync(run_migrations)
+        for name, query in hot_queries().items():
+            plan = await query_plan(conn, query)
+            problems = plan_problems(plan)
+            all_indexed = all_indexed and not problems
+            print(f"[{'OK' if not problems else 'FAIL'}] {name}")
+            for step in plan:
+                print(f"    {step}")
+    await engine.dispose()
+    return all_indexed
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(explain_all()) else 1)
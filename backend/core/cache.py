@@ -0,0 +1,305 @@
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import functools
+import inspect
+import hashlib
+import json
+import os
+import time
+from fastapi import Request, Response
+from core.serialization import dumps, json_bytes_response
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 响应缓存后端: memory（进程内 TTL+LRU）、redis（多进程共享）或 none（不缓存响应，仅在进程内维护数据版本）
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "300"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# 不带关键词（跨关键词汇总）的缓存项所属的作用域
+ALL_KEYWORDS = "__all__"
+
+# 用户配置的作用域
+CONFIG_SCOPE = "__config__"
+
+# 所有缓存项共享的全局代数，清理任务等批量变更时整体失效
+GLOBAL_EPOCH = "__epoch__"
+
+class CacheBackend(ABC):
+    """缓存后端接口：序列化后的响应体存取与按名字递增的代数计数"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """取缓存值，不存在或已过期时返回 None"""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: int):
+        """写入缓存值，ttl 秒后过期"""
+
+    @abstractmethod
+    async def get_generations(self, names: List[str]) -> List[int]:
+        """按顺序返回各名字的代数，从未递增过的为 0"""
+
+    @abstractmethod
+    async def bump_generations(self, names: List[str]):
+        """各名字的代数加一"""
+
+    @abstractmethod
+    async def clear(self):
+        """清空缓存值和代数"""
+
+class MemoryCacheBackend(CacheBackend):
+    """进程内 TTL+LRU 缓存，也用作测试中 Redis 后端的替身"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.generations: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        self.entries[key] = (self.clock() + ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def get_generations(self, names: List[str]) -> List[int]:
+        return [self.generations.get(name, 0) for name in names]
+
+    async def bump_generations(self, names: List[str]):
+        for name in names:
+            self.generations[name] = self.generations.get(name, 0) + 1
+
+    async def clear(self):
+        self.entries.clear()
+        self.generations.clear()
+
+class RedisCacheBackend(CacheBackend):
+    """Redis 缓存，多个 API 进程共享缓存和失效代数；值为序列化后的 JSON 字节，取出后原样返回"""
+
+    def __init__(self, url: str = REDIS_URL, prefix: str = "xhs:cache:"):
+        import redis.asyncio as redis
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(f"{self.prefix}v:{key}")
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        await self.client.set(f"{self.prefix}v:{key}", value, ex=ttl)
+
+    async def get_generations(self, names: List[str]) -> List[int]:
+        values = await self.client.mget([f"{self.prefix}g:{name}" for name in names])
+        return [int(value) if value is not None else 0 for value in values]
+
+    async def bump_generations(self, names: List[str]):
+        async with self.client.pipeline(transaction=False) as pipe:
+            for name in names:
+                pipe.incr(f"{self.prefix}g:{name}")
+            await pipe.execute()
+
+    async def clear(self):
+        async for key in self.client.scan_iter(match=f"{self.prefix}*"):
+            await self.client.delete(key)
+
+def create_cache_backend(name: str = CACHE_BACKEND) -> CacheBackend:
+    if name == "redis":
+        try:
+            return RedisCacheBackend()
+        except ImportError:
+            logger.warning("redis 未安装，响应缓存回退到进程内缓存")
+    elif name not in ("memory", "none"):
+        logger.warning(f"未知的缓存后端 {name}，使用进程内缓存")
+    return MemoryCacheBackend()
+
+class ResponseCache:
+    """接口响应缓存与数据版本
+
+    每个关键词（以及跨关键词汇总、配置）有一个代数，写入后递增。缓存键和 ETag 都由接口名、参数和
+    所涉及作用域的代数组成：写入后旧缓存项和旧 ETag 随之失效，缓存项在 TTL 到期后淘汰，无需逐个删除。
+    计算开始前读取代数，计算期间发生的写入会使本次结果写入旧键，不会把过期数据当作新结果缓存。
+    缓存的是序列化后的响应体，命中时直接作为响应返回，不再重复编码。关闭缓存（store_values=False）时仍维护代数，ETag 照常可用。
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: int = CACHE_TTL_SECONDS, store_values: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.store_values = store_values
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def scopes_for(self, keywords: Iterable[Optional[str]]) -> List[str]:
+        scopes = sorted({keyword for keyword in keywords if keyword})
+        return [GLOBAL_EPOCH] + (scopes or [ALL_KEYWORDS])
+
+    async def generations(self, scopes: List[str]) -> Optional[Dict[str, int]]:
+        """读取各作用域的代数，后端不可用时返回 None"""
+        try:
+            return dict(zip(scopes, await self.backend.get_generations(scopes)))
+        except Exception as e:
+            logger.warning(f"读取数据版本失败: {str(e)}")
+            return None
+
+    def _digest(self, endpoint: str, params: Dict[str, Any], generations: Dict[str, int], **extra) -> str:
+        payload = json.dumps(
+            {"endpoint": endpoint, "params": params, "generations": generations, **extra},
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def build_key(self, endpoint: str, params: Dict[str, Any], generations: Dict[str, int]) -> str:
+        return f"{endpoint}:{self._digest(endpoint, params, generations)}"
+
+    def etag(self, endpoint: str, params: Dict[str, Any], generations: Dict[str, int]) -> str:
+        """弱 ETag：数据版本不变时内容等价（生成时间等字段可能不同）
+
+        查询按相对当前时间的窗口计算，即使没有写入结果也会慢慢变化，因此按 TTL 切分时间片，
+        ETag 至少每个 TTL 周期更新一次。
+        """
+        window = int(time.time() // max(self.ttl, 1))
+        return f'W/"{self._digest(endpoint, params, generations, window=window)[:32]}"'
+
+    async def get_or_compute(self, endpoint: str, params: Dict[str, Any], scopes: List[str],
+                             compute: Callable[[], Any], generations: Optional[Dict[str, int]] = None) -> bytes:
+        """返回序列化后的响应体：命中时取缓存，否则计算、序列化并写入；缓存后端出错时直接计算"""
+        if not self.store_values:
+            return dumps(await compute())
+
+        if generations is None:
+            generations = await self.generations(scopes)
+        if generations is None:
+            return dumps(await compute())
+
+        key = self.build_key(endpoint, params, generations)
+        try:
+            cached = await self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"读取响应缓存失败: {str(e)}")
+            return dumps(await compute())
+
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        body = dumps(await compute())
+        try:
+            await self.backend.set(key, body, self.ttl)
+        except Exception as e:
+            logger.warning(f"写入响应缓存失败: {str(e)}")
+        return body
+
+    async def _bump(self, scopes: List[str]):
+        try:
+            await self.backend.bump_generations(scopes)
+        except Exception as e:
+            logger.warning(f"更新数据版本失败: {str(e)}")
+
+    async def invalidate(self, *keywords: str):
+        """关键词数据变化：使其单关键词缓存和跨关键词汇总缓存失效"""
+        await self._bump(sorted({k for k in keywords if k}) + [ALL_KEYWORDS])
+
+    async def invalidate_config(self):
+        """用户配置变化"""
+        await self._bump([CONFIG_SCOPE])
+
+    async def invalidate_all(self):
+        """批量变更（如过期数据清理）后使全部缓存失效"""
+        await self._bump([GLOBAL_EPOCH])
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__ if self.store_values else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 弱比较（忽略 W/ 前缀），支持逗号分隔的多个值和 *"""
+    if not if_none_match:
+        return False
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+def cached_response(endpoint: str, exclude: Iterable[str] = ("db",), scopes: Optional[List[str]] = None,
+                    extra_scopes: Iterable[str] = (), cache: bool = True,
+                    params_scopes: Optional[Callable[[Dict[str, Any]], Iterable[str]]] = None,
+                    before: Optional[Callable[..., Awaitable[Any]]] = None):
+    """为路由加上 ETag 条件请求和响应缓存
+
+    作用域默认由参数 keyword / keywords 决定，也可用 scopes 固定指定，extra_scopes 总是附加，
+    params_scopes 按请求参数返回需要附加的作用域（如结果含跨关键词汇总时附加 ALL_KEYWORDS）。
+    before 在 ETag 比较之前以处理函数的参数调用，用于 304 也不能跳过的副作用（如触发后台刷新）。If-None-Match 与当前数据版本
+    对应的 ETag 一致时直接返回 304，不执行查询也不序列化；否则（cache 为真时）经响应缓存取得序列化后的
+    响应体直接返回，并在响应头带上 ETag。用在 @router.get 与处理函数之间，处理函数抛出的异常不会被缓存。
+    """
+    excluded = set(exclude)
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        extra_params = [
+            inspect.Parameter("_cache_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+        ]
+
+        @functools.wraps(func)
+        async def wrapper(*args, _cache_request: Request, **kwargs):
+            if before:
+                await before(*args, **kwargs)
+            params = {name: value for name, value in kwargs.items() if name not in excluded}
+            route_scopes = [GLOBAL_EPOCH] + scopes if scopes else response_cache.scopes_for(
+                list(params.get("keywords") or []) + [params.get("keyword")]
+            )
+            route_scopes += list(extra_scopes)
+            if params_scopes:
+                route_scopes += [scope for scope in params_scopes(params) if scope not in route_scopes]
+            generations = await response_cache.generations(route_scopes)
+            if generations is None:
+                return await func(*args, **kwargs)
+
+            etag = response_cache.etag(endpoint, params, generations)
+            headers = {"ETag": etag, "Cache-Control": "no-cache"}
+            if etag_matches(_cache_request.headers.get("if-none-match"), etag):
+                response_cache.not_modified += 1
+                return Response(status_code=304, headers=headers)
+
+            if cache:
+                body = await response_cache.get_or_compute(
+                    endpoint, params, route_scopes, lambda: func(*args, **kwargs), generations
+                )
+            else:
+                body = dumps(await func(*args, **kwargs))
+            return json_bytes_response(body, headers=headers)
+
+        wrapper.__signature__ = signature.replace(parameters=[
+            *[p for p in signature.parameters.values() if p.kind != inspect.Parameter.VAR_KEYWORD],
+            *extra_params
+        ])
+        return wrapper
+    return decorator
+
+# 全局实例
+response_cache = ResponseCache(create_cache_backend(), store_values=CACHE_BACKEND != "none")
@@ -1,22 +1,63 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy import Column, Integer, String, DateTime, Text, Float, Boolean, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Text, Float, Boolean, JSON, Index, UniqueConstraint
+from sqlalchemy.exc import SQLAlchemyError
+from contextlib import asynccontextmanager
 from datetime import datetime
 import os
+import time
+import logging
+from core.engine_profiles import create_profiled_engine, is_sqlite_file
+from core.metrics import instrument_engine
+from core.slow_query import slow_query_log
+
+logger = logging.getLogger(__name__)
 
 # Database URL - can be configured via environment variables
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./xiaohongshu_monitor.db")
 
-# Create async engine
-engine = create_async_engine(DATABASE_URL, echo=True)
+# Alembic 配置文件路径
+ALEMBIC_INI_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+# Create async engine（参数按 DB_ENGINE_PROFILE 配置档选择，见 core/engine_profiles.py）
+engine = create_profiled_engine(DATABASE_URL)
+
+# 只读副本 URL；未配置时 SQLite 文件库使用只读引擎（WAL 模式下读连接不会被采集写入阻塞），其余直接读主库
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+
+# 只读副本连接失败后回退到主库的时长（秒），到期后再尝试副本
+READ_REPLICA_RETRY_SECONDS = float(os.getenv("READ_REPLICA_RETRY_SECONDS", "30"))
 
-# Create async session maker
+if DATABASE_READ_URL:
+    read_engine = create_profiled_engine(DATABASE_READ_URL, read_only=True)
+elif is_sqlite_file(DATABASE_URL):
+    read_engine = create_profiled_engine(DATABASE_URL, read_only=True)
+else:
+    read_engine = engine
+
+# 语句耗时指标
+instrument_engine(engine, "primary")
+slow_query_log.install(engine, "primary")
+if read_engine is not engine:
+    instrument_engine(read_engine, "read")
+    slow_query_log.install(read_engine, "read")
+
+# Create async session maker（写会话，也用于需要读到自己写入的场景）
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
     expire_on_commit=False
 )
 
+# 只读会话
+ReadSessionLocal = async_sessionmaker(
+    bind=read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
+_read_replica_down_until = 0.0
+
 class Base(DeclarativeBase):
     pass
 
@@ -33,15 +74,46 @@ class UserConfig(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+# keyword_trends / sentiment_analysis / scraping_logs 在 PostgreSQL 上
+# 按天范围分区（迁移 0003，分区维护见 core/partitioning.py）
+
 class KeywordTrend(Base):
     __tablename__ = "keyword_trends"
+    __table_args__ = (
+        Index("ix_keyword_trends_keyword_date", "keyword", "date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    keyword = Column(String(100), index=True)
+    keyword = Column(String(100))
     date = Column(DateTime, index=True)
     count = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+class KeywordTrendRollup(Base):
+    __tablename__ = "keyword_trend_rollups"
+    __table_args__ = (
+        UniqueConstraint("granularity", "keyword", "bucket", name="uq_keyword_trend_rollups_granularity_keyword_bucket"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    granularity = Column(String(10))  # day, week
+    keyword = Column(String(100))
+    bucket = Column(DateTime)  # 日/周（周一）起始时间
+    count = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class KeywordSpikeState(Base):
+    __tablename__ = "keyword_spike_states"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    keyword = Column(String(100), unique=True, index=True)
+    ewma_mean = Column(Float, default=0.0)  # 声量指数加权均值
+    ewma_var = Column(Float, default=0.0)  # 声量指数加权方差
+    observations = Column(Integer, default=0)
+    last_value = Column(Integer, default=0)
+    last_alert_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class HotPost(Base):
     __tablename__ = "hot_posts"
     
@@ -54,25 +126,56 @@ class HotPost(Base):
     likes_count = Column(Integer, default=0)
     comments_count = Column(Integer, default=0)
     hot_score = Column(Float, default=0.0)  # 热度分数
-    keyword = Column(String(100), index=True)
+    keyword = Column(String(100))
     publish_time = Column(DateTime)
     collected_at = Column(DateTime, default=datetime.utcnow)
+    simhash = Column(String(16))  # 标题+正文的 SimHash 指纹（16位十六进制）
+    duplicate_of = Column(Integer)  # 近重复簇代表帖子ID，代表帖子本身为空
+    duplicate_count = Column(Integer, default=0)  # 代表帖子所在簇的重复帖子数
+
+    __table_args__ = (
+        # 词云/情绪分析: keyword + collected_at 时间窗口
+        Index("ix_hot_posts_keyword_collected_at", "keyword", "collected_at"),
+        # 热帖排行与游标分页: 只含簇代表的部分索引，按 (hot_score, id) 倒序
+        Index(
+            "ix_hot_posts_keyword_rank", "keyword", hot_score.desc(), id.desc(),
+            postgresql_where=duplicate_of.is_(None), sqlite_where=duplicate_of.is_(None)
+        ),
+        Index(
+            "ix_hot_posts_rank", hot_score.desc(), id.desc(),
+            postgresql_where=duplicate_of.is_(None), sqlite_where=duplicate_of.is_(None)
+        ),
+        # 按代表查簇成员: 只索引重复帖子，duplicate_of IS NULL 的排行查询不会误选它而放弃上面的有序索引
+        Index(
+            "ix_hot_posts_duplicate_of", duplicate_of,
+            postgresql_where=duplicate_of.isnot(None), sqlite_where=duplicate_of.isnot(None)
+        ),
+    )
 
-class WordCloudData(Base):
-    __tablename__ = "word_cloud_data"
+class WordCloudSnapshot(Base):
+    """词云快照：每个关键词每次生成一条记录，words 为按权重倒序的 [[词, 权重], ...]"""
+    __tablename__ = "word_cloud_snapshots"
     
     id = Column(Integer, primary_key=True, index=True)
-    keyword = Column(String(100), index=True)
-    word = Column(String(50))
-    weight = Column(Float)
+    keyword = Column(String(100))
+    words = Column(JSON, default=list)
+    total_words = Column(Integer, default=0)
     date = Column(DateTime, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # 按关键词取最新快照
+        Index("ix_word_cloud_snapshots_keyword_date", "keyword", date.desc()),
+    )
+
 class SentimentAnalysis(Base):
     __tablename__ = "sentiment_analysis"
+    __table_args__ = (
+        Index("ix_sentiment_analysis_keyword_date", "keyword", "date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    keyword = Column(String(100), index=True)
+    keyword = Column(String(100))
     date = Column(DateTime, index=True)
     positive_score = Column(Float, default=0.0)
     negative_score = Column(Float, default=0.0)
@@ -80,6 +183,33 @@ class SentimentAnalysis(Base):
     total_posts = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+class KeywordStats(Base):
+    __tablename__ = "keyword_stats"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    keyword = Column(String(100), unique=True, index=True)  # 全局汇总行为 "__all__"
+    monitored_keywords = Column(Integer, default=0)  # 仅全局行使用：有热帖的关键词数
+    hot_posts = Column(Integer, default=0)
+    total_interactions = Column(Integer, default=0)  # 点赞数 + 评论数
+    sentiment_sum = Column(Float, default=0.0)  # positive_score 累加值
+    sentiment_count = Column(Integer, default=0)
+    latest_positive_score = Column(Float)
+    latest_sentiment_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class KeywordTermCount(Base):
+    __tablename__ = "keyword_term_counts"
+    __table_args__ = (
+        # 唯一约束的索引同时服务 keyword + bucket 前缀查询
+        UniqueConstraint("keyword", "bucket", "term", name="uq_keyword_term_counts_keyword_bucket_term"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    keyword = Column(String(100))
+    bucket = Column(DateTime)  # 小时桶起始时间
+    term = Column(String(50))
+    count = Column(Integer, default=0)
+
 class ScrapingLog(Base):
     __tablename__ = "scraping_logs"
     
@@ -92,6 +222,47 @@ class ScrapingLog(Base):
     started_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime)
 
+    __table_args__ = (
+        # 采集日志游标分页: 按 (started_at, id) 倒序，可按类型或状态筛选
+        Index("ix_scraping_logs_task_type_started_at_id", "task_type", started_at.desc(), id.desc()),
+        Index("ix_scraping_logs_status_started_at_id", "status", started_at.desc(), id.desc()),
+        Index("ix_scraping_logs_started_at_id", started_at.desc(), id.desc()),
+    )
+
+class Job(Base):
+    """后台任务（采集、实时监测）：状态与进度持久化，可在进程外查询、取消和重试"""
+    __tablename__ = "jobs"
+    
+    id = Column(String(32), primary_key=True)
+    job_type = Column(String(50))  # collect, monitor
+    status = Column(String(20), default="queued")  # queued, running, success, failed, cancelled
+    params = Column(JSON, default=dict)
+    progress_done = Column(Integer, default=0)
+    progress_total = Column(Integer)  # 持续运行的任务（实时监测）为空
+    message = Column(Text)
+    result = Column(JSON)
+    error = Column(Text)
+    attempt = Column(Integer, default=1)
+    retry_of = Column(String(32))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    completed_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # 任务列表游标分页: 按 (created_at, id) 倒序，可按状态筛选
+        Index("ix_jobs_status_created_at_id", "status", created_at.desc(), id.desc()),
+        Index("ix_jobs_created_at_id", created_at.desc(), id.desc()),
+    )
+
+def upsert(db: AsyncSession, model):
+    """按会话所连数据库的方言返回 INSERT 构造，支持 on_conflict_do_update（PostgreSQL / SQLite）"""
+    if db.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
 async def get_db():
     async with AsyncSessionLocal() as session:
         try:
@@ -99,6 +270,46 @@ async def get_db():
         finally:
             await session.close()
 
+async def _open_read_session() -> AsyncSession:
+    """打开只读会话；只读副本连接失败时记录下来，在 READ_REPLICA_RETRY_SECONDS 内改用主库"""
+    global _read_replica_down_until
+    if read_engine is engine or time.monotonic() < _read_replica_down_until:
+        return AsyncSessionLocal()
+
+    session = ReadSessionLocal()
+    try:
+        await session.connection()
+        return session
+    except (OSError, SQLAlchemyError) as e:
+        await session.close()
+        _read_replica_down_until = time.monotonic() + READ_REPLICA_RETRY_SECONDS
+        logger.warning(f"只读库连接失败，{READ_REPLICA_RETRY_SECONDS:.0f} 秒内读请求改走主库: {str(e)}")
+        return AsyncSessionLocal()
+
+@asynccontextmanager
+async def read_session():
+    """只读会话上下文，可能读到略有延迟的副本数据"""
+    session = await _open_read_session()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+async def get_read_db():
+    """只读接口使用的会话"""
+    async with read_session() as session:
+        yield session
+
+def run_migrations(connection):
+    """在给定连接上执行 Alembic 迁移至最新版本"""
+    from alembic import command
+    from alembic.config import Config
+
+    alembic_cfg = Config(ALEMBIC_INI_PATH)
+    alembic_cfg.attributes["connection"] = connection
+    command.upgrade(alembic_cfg, "head")
+
 async def init_db():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+    # 迁移自行管理事务（PostgreSQL 上的 CONCURRENTLY 索引需要脱离事务执行）
+    async with engine.connect() as conn:
+        await conn.run_sync(run_migrations)
\ No newline at end of file
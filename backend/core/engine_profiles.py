@@ -0,0 +1,102 @@
+from typing import Any, Dict, Optional
+import os
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 引擎配置档：auto 按数据库类型自动选择，default 为 SQLAlchemy 默认参数
+DB_ENGINE_PROFILE = os.getenv("DB_ENGINE_PROFILE", "auto")
+
+# 是否打印 SQL
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() in ("1", "true", "yes")
+
+# SQLite: 锁等待时间（毫秒）与内存映射大小（字节）
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+# PostgreSQL: 连接池与 asyncpg 预编译语句缓存
+PG_POOL_SIZE = int(os.getenv("PG_POOL_SIZE", "10"))
+PG_MAX_OVERFLOW = int(os.getenv("PG_MAX_OVERFLOW", "20"))
+PG_POOL_TIMEOUT = float(os.getenv("PG_POOL_TIMEOUT", "30"))
+PG_POOL_RECYCLE = int(os.getenv("PG_POOL_RECYCLE", "1800"))
+PG_STATEMENT_CACHE_SIZE = int(os.getenv("PG_STATEMENT_CACHE_SIZE", "500"))
+
+def is_sqlite_file(url: str) -> bool:
+    """是否为 SQLite 文件库（内存库没有 WAL，也无法跨连接共享）"""
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+def _sqlite_pragmas(read_only: bool):
+    """每个新连接上执行的 PRAGMA"""
+    pragmas = [
+        "PRAGMA journal_mode=WAL",  # 读写互不阻塞
+        "PRAGMA synchronous=NORMAL",  # WAL 下仅在检查点时 fsync
+        f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    return pragmas
+
+def _default_profile(url: str, read_only: bool) -> Dict[str, Any]:
+    return {}
+
+def _sqlite_profile(url: str, read_only: bool) -> Dict[str, Any]:
+    return {
+        "connect_args": {"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+        "pragmas": _sqlite_pragmas(read_only) if is_sqlite_file(url) else [],
+    }
+
+def _postgresql_profile(url: str, read_only: bool) -> Dict[str, Any]:
+    return {
+        # SQLAlchemy 侧按 SQL 文本缓存 asyncpg 预编译语句，connect_args 为 asyncpg 自身的语句缓存
+        "url": make_url(url).update_query_dict({"prepared_statement_cache_size": str(PG_STATEMENT_CACHE_SIZE)}),
+        "connect_args": {"statement_cache_size": PG_STATEMENT_CACHE_SIZE},
+        "pool_size": PG_POOL_SIZE,
+        "max_overflow": PG_MAX_OVERFLOW,
+        "pool_timeout": PG_POOL_TIMEOUT,
+        "pool_recycle": PG_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+ENGINE_PROFILES = {
+    "default": _default_profile,
+    "sqlite": _sqlite_profile,
+    "postgresql": _postgresql_profile,
+}
+
+def resolve_profile(url: str, profile: Optional[str] = None) -> str:
+    """解析配置档名称，auto 时按 URL 的数据库类型选择"""
+    profile = profile or DB_ENGINE_PROFILE
+    if profile == "auto":
+        backend = make_url(url).get_backend_name()
+        return backend if backend in ENGINE_PROFILES else "default"
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"未知的数据库引擎配置: {profile}，可选: auto, {', '.join(ENGINE_PROFILES)}")
+    return profile
+
+def create_profiled_engine(url: str, read_only: bool = False, profile: Optional[str] = None,
+                           echo: Optional[bool] = None) -> AsyncEngine:
+    """按配置档创建异步引擎；read_only 仅对 SQLite 文件库生效（只读连接）"""
+    profile = resolve_profile(url, profile)
+    options = ENGINE_PROFILES[profile](url, read_only)
+    engine_url = options.pop("url", url)
+    pragmas = options.pop("pragmas", [])
+
+    engine = create_async_engine(engine_url, echo=DB_ECHO if echo is None else echo, **options)
+
+    if pragmas:
+        @event.listens_for(engine.sync_engine, "connect")
+        def _set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+            finally:
+                cursor.close()
+
+    logger.info(f"数据库引擎配置: {profile}{' (只读)' if read_only else ''}")
+    return engine
@@ -0,0 +1,238 @@
+from typing import Dict, Iterable, List, Tuple
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+import os
+import threading
+import time
+from sqlalchemy import event
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 是否采集指标，关闭后各记录调用直接返回
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# 进程启动时间，用于计算运行时长
+START_TIME = time.time()
+
+# 默认直方图分桶（秒），覆盖毫秒级查询到分钟级的页面加载
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metric(ABC):
+    """带标签的指标；同进程内多线程（数据库事件可能来自线程池）写入时加锁"""
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Prometheus 文本格式的样本行（不含 HELP/TYPE）"""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+class Counter(Metric):
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self.values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self.lock:
+            items = sorted(self.values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+class Gauge(Counter):
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels):
+        if not METRICS_ENABLED:
+            return
+        with self.lock:
+            self.values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+class Histogram(Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 每组标签: [各分桶计数（不累加）..., +Inf 桶计数], 总和
+        self.values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            counts, total = self.values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """统计代码块耗时（可跨 await）"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> List[str]:
+        with self.lock:
+            items = sorted((key, (list(counts), total[0])) for key, (counts, total) in self.values.items())
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Prometheus 文本格式（0.0.4）"""
+        uptime = f"# HELP process_uptime_seconds 进程运行时长\n# TYPE process_uptime_seconds gauge\n" \
+                 f"process_uptime_seconds {_format_value(time.time() - START_TIME)}"
+        return "\n".join([uptime] + [metric.render() for metric in self.metrics.values()]) + "\n"
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 全局实例
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP 请求处理耗时（按路由模板）", ("method", "route", "status")
+))
+DB_STATEMENT_SECONDS = registry.register(Histogram(
+    "db_statement_duration_seconds", "SQL 语句执行耗时（按语句类型）", ("engine", "statement")
+))
+SCRAPER_STAGE_SECONDS = registry.register(Histogram(
+    "scraper_stage_duration_seconds", "采集各阶段耗时（页面导航、内容提取）", ("stage",)
+))
+SCRAPER_NOTES = registry.register(Counter(
+    "scraper_notes_total", "采集的笔记数（fetched 为新写入，skipped 按原因区分）", ("result", "reason")
+))
+SCRAPER_KEYWORDS = registry.register(Counter(
+    "scraper_keywords_total", "关键词采集次数", ("status",)
+))
+ANALYSIS_SECONDS = registry.register(Histogram(
+    "analysis_duration_seconds", "单个关键词的分析耗时", ("task", "keyword")
+))
+WEBSOCKET_SEND_SECONDS = registry.register(Histogram(
+    "websocket_send_duration_seconds", "WebSocket 单条消息发送耗时", ("message_type",)
+))
+WEBSOCKET_QUEUE_DEPTH = registry.register(Gauge(
+    "websocket_send_queue_depth", "正在等待发送完成的 WebSocket 消息数"
+))
+WEBSOCKET_CONNECTIONS = registry.register(Gauge(
+    "websocket_connections", "当前 WebSocket 连接数"
+))
+
+class MetricsMiddleware:
+    """ASGI 中间件：按路由模板统计请求耗时（到响应体发送完毕为止，流式响应同样适用）"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # 路由匹配后 scope 中带有 route，未匹配的请求（如 404 扫描）归为一类，避免标签爆炸
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status["code"])
+            )
+
+def statement_type(statement: str) -> str:
+    """取 SQL 的首个关键字作为语句类型"""
+    head = statement.lstrip().split(None, 1)
+    return head[0].upper() if head else "OTHER"
+
+def instrument_engine(async_engine, name: str):
+    """在引擎上挂接语句计时事件（按 SELECT / INSERT / UPDATE / DELETE 等分类）"""
+    sync_engine = async_engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started_at"].pop()
+        DB_STATEMENT_SECONDS.observe(time.perf_counter() - started, engine=name, statement=statement_type(statement))
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        # 出错的语句不会触发 after_cursor_execute，丢弃其开始时间
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started_at"):
+            conn.info["query_started_at"].pop()
@@ -0,0 +1,19 @@
+from typing import Any, Dict
+import base64
+import json
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """把排序键编码为不透明的游标字符串"""
+    raw = json.dumps(values, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """解析游标，格式不合法时抛出 ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("无效的分页游标")
+    if not isinstance(values, dict):
+        raise ValueError("无效的分页游标")
+    return values
@@ -0,0 +1,95 @@
+from typing import List, Tuple
+from datetime import date, datetime, timedelta
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+import logging
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL 上按天做范围分区的表及其分区键（迁移 0003 有自己固定的副本，修改这里不影响已发布的迁移）
+PARTITIONED_TABLES = {
+    "keyword_trends": "date",
+    "sentiment_analysis": "date",
+    "scraping_logs": "started_at",
+}
+
+# 提前创建的分区天数
+PARTITION_DAYS_AHEAD = 7
+
+def partition_name(table: str, day: date) -> str:
+    return f"{table}_p{day:%Y%m%d}"
+
+def is_partitioned(connection: Connection, table: str) -> bool:
+    """表是否为 PostgreSQL 分区表"""
+    if connection.dialect.name != "postgresql":
+        return False
+    relkind = connection.execute(
+        text("SELECT relkind FROM pg_class WHERE relname = :table AND relkind IN ('p', 'r')"),
+        {"table": table}
+    ).scalar()
+    return relkind == "p"
+
+def list_partitions(connection: Connection, table: str) -> List[Tuple[str, date]]:
+    """列出按天命名的分区及其对应日期（不含默认分区）"""
+    rows = connection.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+            "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+            "WHERE parent.relname = :table"
+        ),
+        {"table": table}
+    ).scalars().all()
+
+    prefix = f"{table}_p"
+    partitions = []
+    for name in rows:
+        if name.startswith(prefix):
+            try:
+                partitions.append((name, datetime.strptime(name[len(prefix):], "%Y%m%d").date()))
+            except ValueError:
+                continue
+    return sorted(partitions, key=lambda item: item[1])
+
+def ensure_partitions(connection: Connection, table: str, start: date, end: date) -> int:
+    """确保 [start, end] 内每天都有分区，返回新建的分区数"""
+    existing = {day for _, day in list_partitions(connection, table)}
+    created = 0
+    day = start
+    while day <= end:
+        if day not in existing:
+            try:
+                # 默认分区里已有该日期范围的数据时建分区会失败，用保存点隔离，留给下次处理
+                with connection.begin_nested():
+                    connection.execute(text(
+                        f"CREATE TABLE {partition_name(table, day)} PARTITION OF {table} "
+                        f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+                    ))
+                created += 1
+            except Exception as e:
+                logger.warning(f"创建分区 {partition_name(table, day)} 失败: {str(e)}")
+        day += timedelta(days=1)
+    return created
+
+def drop_partitions_before(connection: Connection, table: str, cutoff: datetime) -> int:
+    """分离并删除整体早于 cutoff 的分区，返回删除的分区数"""
+    dropped = 0
+    for name, day in list_partitions(connection, table):
+        if datetime.combine(day + timedelta(days=1), datetime.min.time()) > cutoff:
+            break
+        connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        connection.execute(text(f"DROP TABLE {name}"))
+        dropped += 1
+    return dropped
+
+def maintain_partitions(connection: Connection, cutoff: datetime = None) -> dict:
+    """为所有分区表预建未来分区，并在给定 cutoff 时删除过期分区"""
+    today = datetime.utcnow().date()
+    summary = {}
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(connection, table):
+            continue
+        created = ensure_partitions(connection, table, today, today + timedelta(days=PARTITION_DAYS_AHEAD))
+        dropped = drop_partitions_before(connection, table, cutoff) if cutoff else 0
+        summary[table] = {"created": created, "dropped": dropped}
+    return summary
@@ -0,0 +1,214 @@
+from typing import Any, Callable, Dict, List, Optional
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime
+import functools
+import hmac
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 请求采样剖析: off（关闭）、header（带 X-Profile 请求头且令牌正确的请求）或 all（所有请求，仅用于排查）
+PROFILING_MODE = os.getenv("PROFILING_MODE", "off")
+
+# 剖析令牌：header 模式触发剖析和下载剖析结果都需在 X-Profile-Token 请求头中携带，未设置时两者均不可用
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+
+# 是否剖析定时任务
+PROFILE_JOBS = os.getenv("PROFILE_JOBS", "false").lower() == "true"
+
+# 剖析结果输出目录
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+
+# 采样间隔（毫秒）
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+
+# 触发单个请求剖析的请求头，以及携带剖析令牌的请求头
+PROFILE_HEADER = "x-profile"
+PROFILE_TOKEN_HEADER = "x-profile-token"
+
+PROFILE_FILE_PATTERN = re.compile(r"^[\w.-]+\.folded$")
+
+class StackSampler:
+    """采样剖析器：后台线程按固定间隔读取目标线程的调用栈并按栈聚合计数
+
+    协程都在事件循环线程上执行，采样得到的是采样时刻正在运行的协程调用链；同一时间并发的其他请求
+    也会被采到，排查单个请求时应在低并发下进行。输出为 folded 格式（每行“帧;帧;... 次数”），
+    可直接用 flamegraph.pl 或 speedscope 查看。
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = PROFILE_INTERVAL_MS / 1000):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at = 0.0
+        self.duration = 0.0
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            with self.lock:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def folded(self) -> str:
+        with self.lock:
+            stacks = self.stacks.most_common()
+        return "\n".join(f"{stack} {count}" for stack, count in stacks) + "\n"
+
+    def top(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """按自身耗时（栈顶帧）排序的函数"""
+        with self.lock:
+            stacks = list(self.stacks.items())
+        leaf = Counter()
+        for stack, count in stacks:
+            leaf[stack.rsplit(";", 1)[-1]] += count
+        return [
+            {"frame": frame, "samples": count, "percent": round(count / self.samples * 100, 1)}
+            for frame, count in leaf.most_common(limit)
+        ] if self.samples else []
+
+def check_profile_token(token: Optional[str]) -> bool:
+    """校验剖析令牌；未配置 PROFILE_TOKEN 时一律拒绝"""
+    if not PROFILE_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode(), PROFILE_TOKEN.encode())
+
+def _profile_path(profile_id: str) -> str:
+    return os.path.join(PROFILE_DIR, f"{profile_id}.folded")
+
+def new_profile_id(name: str) -> str:
+    safe_name = re.sub(r"[^\w.-]+", "_", name).strip("_")[:60]
+    return f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{safe_name}-{uuid.uuid4().hex[:6]}"
+
+def write_profile(profile_id: str, sampler: StackSampler) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = _profile_path(profile_id)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(sampler.folded())
+    logger.info(f"剖析结果已写入 {path}（{sampler.samples} 个样本，{sampler.duration * 1000:.0f} ms）")
+    return path
+
+@asynccontextmanager
+async def profile_block(name: str, profile_id: Optional[str] = None):
+    """采样剖析一段异步代码，结束后写入 PROFILE_DIR"""
+    profile_id = profile_id or new_profile_id(name)
+    sampler = StackSampler()
+    sampler.start()
+    try:
+        yield sampler
+    finally:
+        sampler.stop()
+        try:
+            write_profile(profile_id, sampler)
+        except OSError as e:
+            logger.error(f"写入剖析结果失败: {str(e)}")
+
+def profiled_job(name: str):
+    """定时任务装饰器：PROFILE_JOBS 开启时剖析每次执行"""
+    def decorator(func: Callable):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not PROFILE_JOBS:
+                return await func(*args, **kwargs)
+            async with profile_block(f"job-{name}"):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def list_profiles() -> List[Dict[str, Any]]:
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for file_name in sorted(os.listdir(PROFILE_DIR), reverse=True):
+        if PROFILE_FILE_PATTERN.match(file_name):
+            path = os.path.join(PROFILE_DIR, file_name)
+            profiles.append({
+                "id": file_name[:-len(".folded")],
+                "size": os.path.getsize(path),
+                "created_at": datetime.utcfromtimestamp(os.path.getmtime(path)).isoformat()
+            })
+    return profiles
+
+def resolve_profile(profile_id: str) -> str:
+    """剖析结果文件路径；id 不合法或文件不存在时抛出 ValueError"""
+    if not PROFILE_FILE_PATTERN.match(f"{profile_id}.folded"):
+        raise ValueError("无效的剖析结果 id")
+    path = _profile_path(profile_id)
+    if not os.path.isfile(path):
+        raise ValueError("剖析结果不存在")
+    return path
+
+class ProfilingMiddleware:
+    """ASGI 中间件：按 PROFILING_MODE 剖析请求，响应头 X-Profile-Id 给出结果 id
+
+    header 模式下请求须同时带 X-Profile 和正确的 X-Profile-Token，否则任意客户端都能让服务端开始采样。
+    结果写入 PROFILE_DIR，可凭同一令牌通过 /api/monitor/profiles/{id} 下载；请求头为 X-Profile: top 时，
+    另在响应头 X-Profile-Top 中返回到响应开始为止自身耗时最高的几个函数。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _requested(self, scope) -> Optional[str]:
+        if PROFILING_MODE == "all":
+            return "1"
+        if PROFILING_MODE == "header":
+            headers = {name: value.decode("latin-1").strip() for name, value in scope.get("headers", [])}
+            value = headers.get(PROFILE_HEADER.encode(), "").lower()
+            if value in ("", "0", "false"):
+                return None
+            return value if check_profile_token(headers.get(PROFILE_TOKEN_HEADER.encode())) else None
+        return None
+
+    async def __call__(self, scope, receive, send):
+        requested = self._requested(scope) if scope["type"] == "http" else None
+        if not requested:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = new_profile_id(f"{scope['method']}-{scope['path']}")
+        sampler_holder = {}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile_id.encode()))
+                if requested == "top" and sampler_holder:
+                    sampler = sampler_holder["sampler"]
+                    top = ", ".join(f"{item['frame']}={item['percent']}%" for item in sampler.top(5))
+                    headers.append((b"x-profile-top", top.encode("latin-1", "replace")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        async with profile_block(profile_id, profile_id) as sampler:
+            sampler_holder["sampler"] = sampler
+            await self.app(scope, receive, send_wrapper)
@@ -2,9 +2,18 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from sqlalchemy.ext.asyncio import AsyncSession
 from core.database import AsyncSessionLocal, UserConfig
+from core.cache import response_cache
+from core.profiling import profiled_job
 from services.scraper_service import scraper_service
 from services.analysis_service import analysis_service
+from services.collection_coordinator import collection_coordinator, CollectionBusyError
+from services.job_service import job_service
+from services.retention_service import retention_service
+from services.dedup_service import dedup_service
+from services.stats_service import stats_service
+from services.search_service import search_service
 from sqlalchemy import select
+from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
@@ -53,6 +62,15 @@ async def start_scheduler():
             replace_existing=True
         )
         
+        # 启动后立即补建一次全文索引（迁移前已存在的热帖）
+        scheduler.add_job(
+            search_index_backfill_task,
+            id="search_index_backfill",
+            name="全文索引补建",
+            next_run_time=datetime.now(),
+            replace_existing=True
+        )
+        
         # 启动调度器
         scheduler.start()
         logger.info("调度器已启动，定时任务已配置")
@@ -60,6 +78,7 @@ async def start_scheduler():
     except Exception as e:
         logger.error(f"启动调度器失败: {str(e)}")
 
+@profiled_job("keyword_monitoring")
 async def keyword_monitoring_task():
     """关键词声量监测任务"""
     try:
@@ -80,14 +99,19 @@ async def keyword_monitoring_task():
             if user_config.collection_frequency not in ["hourly", "realtime"]:
                 logger.info(f"当前配置频率为 {user_config.collection_frequency}，跳过小时监测")
                 return
+            keywords = list(user_config.keywords)
+        
+        # 作为后台任务执行（可在 /api/jobs 查看和取消），与手动触发或实时监测中的同关键词采集合并
+        job = await job_service.create("collect", {"keywords": keywords, "analyze": False, "source": "scheduler"})
+        job = await job_service.wait(job["id"])
+        logger.info(f"关键词监测任务完成: {job['status']} {job['result']}")
             
-            # 执行采集
-            results = await scraper_service.batch_collect_data(user_config.keywords, db)
-            logger.info(f"关键词监测任务完成: {results}")
-            
+    except CollectionBusyError as e:
+        logger.warning(f"采集队列已满，跳过本次关键词监测: {str(e)}")
     except Exception as e:
         logger.error(f"关键词监测任务失败: {str(e)}")
 
+@profiled_job("hot_posts_collection")
 async def hot_posts_collection_task():
     """热帖数据采集任务"""
     try:
@@ -107,7 +131,8 @@ async def hot_posts_collection_task():
             # 执行热帖采集（更详细的采集）
             for keyword in user_config.keywords:
                 try:
-                    posts = await scraper_service.search_notes(keyword, limit=50)
+                    async with collection_coordinator.slot():
+                        posts = await scraper_service.search_notes(keyword, limit=50)
                     logger.info(f"关键词 {keyword} 采集到 {len(posts)} 条热帖")
                 except Exception as e:
                     logger.error(f"采集关键词 {keyword} 的热帖失败: {str(e)}")
@@ -115,6 +140,7 @@ async def hot_posts_collection_task():
     except Exception as e:
         logger.error(f"热帖采集任务失败: {str(e)}")
 
+@profiled_job("word_cloud_update")
 async def word_cloud_update_task():
     """词云数据更新任务"""
     try:
@@ -148,6 +174,7 @@ async def word_cloud_update_task():
     except Exception as e:
         logger.error(f"词云更新任务失败: {str(e)}")
 
+@profiled_job("data_cleanup")
 async def data_cleanup_task():
     """数据清理任务"""
     try:
@@ -163,40 +190,35 @@ async def data_cleanup_task():
             retention_days = 30  # 默认保留30天
             if user_config and user_config.data_retention_days:
                 retention_days = user_config.data_retention_days
-            
-            from datetime import datetime, timedelta
-            from core.database import KeywordTrend, HotPost, WordCloudData, SentimentAnalysis, ScrapingLog
-            
-            cutoff_date = datetime.utcnow() - timedelta(days=retention_days)
-            
-            # 清理过期数据
-            tables_to_clean = [
-                (KeywordTrend, KeywordTrend.date),
-                (HotPost, HotPost.collected_at),
-                (WordCloudData, WordCloudData.created_at),
-                (SentimentAnalysis, SentimentAnalysis.created_at),
-                (ScrapingLog, ScrapingLog.started_at)
-            ]
-            
-            total_deleted = 0
-            for table, date_column in tables_to_clean:
-                try:
-                    from sqlalchemy import delete
-                    result = await db.execute(
-                        delete(table).where(date_column < cutoff_date)
-                    )
-                    deleted_count = result.rowcount
-                    total_deleted += deleted_count
-                    logger.info(f"清理 {table.__tablename__} 表: 删除 {deleted_count} 条记录")
-                except Exception as e:
-                    logger.error(f"清理 {table.__tablename__} 表失败: {str(e)}")
-            
-            await db.commit()
-            logger.info(f"数据清理任务完成，总计删除 {total_deleted} 条记录")
+        
+        # 按分区或分批清理过期数据（每批独立会话，不在外层会话中持有事务）
+        deleted = await retention_service.apply_retention(retention_days)
+        total_deleted = sum(deleted.values())
+        
+        # 热帖已删除，近重复索引需重新加载，统计数据紧接着全量重算
+        dedup_service.reset()
+        async with AsyncSessionLocal() as db:
+            keywords_count = await stats_service.rebuild(db)
+            logger.info(f"统计数据已重算，共 {keywords_count} 个关键词")
+        await response_cache.invalidate_all()
+        
+        logger.info(f"数据清理任务完成，总计删除 {total_deleted} 条记录")
             
     except Exception as e:
         logger.error(f"数据清理任务失败: {str(e)}")
 
+@profiled_job("search_index_backfill")
+async def search_index_backfill_task():
+    """全文索引补建任务"""
+    try:
+        async with AsyncSessionLocal() as db:
+            indexed = await search_service.backfill(db)
+            if indexed:
+                logger.info(f"全文索引补建完成，共 {indexed} 条热帖")
+            
+    except Exception as e:
+        logger.error(f"全文索引补建任务失败: {str(e)}")
+
 async def stop_scheduler():
     """停止调度器"""
     if scheduler.running:
@@ -0,0 +1,67 @@
+from typing import Any, AsyncIterator
+import json
+import os
+from fastapi import Response
+from fastapi.responses import JSONResponse, StreamingResponse
+import logging
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logging.warning("orjson not available, responses will be serialized with the standard json module")
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# 流式导出时每批从数据库游标取的行数
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+
+def _default(value: Any):
+    """orjson / json 都不认识的类型（numpy 标量、Decimal 等）"""
+    if hasattr(value, "item"):
+        return value.item()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+if ORJSON_AVAILABLE:
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(value: Any) -> bytes:
+        """序列化为 UTF-8 JSON 字节串（中文不转义）"""
+        return orjson.dumps(value, default=_default, option=ORJSON_OPTIONS)
+
+    # 接口默认响应类
+    DefaultResponse = ORJSONResponse
+else:
+    def dumps(value: Any) -> bytes:
+        """序列化为 UTF-8 JSON 字节串（中文不转义）"""
+        return json.dumps(value, ensure_ascii=False, default=_default, separators=(",", ":")).encode("utf-8")
+
+    DefaultResponse = JSONResponse
+
+def dumps_text(value: Any) -> str:
+    """序列化为 JSON 字符串，用于 WebSocket 文本帧"""
+    return dumps(value).decode("utf-8")
+
+def json_bytes_response(body: bytes, status_code: int = 200, headers: dict = None) -> Response:
+    """直接返回已序列化的 JSON 字节，跳过 FastAPI 的 jsonable_encoder 和再次序列化"""
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
+
+async def _ndjson_lines(items: AsyncIterator[Any]) -> AsyncIterator[bytes]:
+    try:
+        async for item in items:
+            yield dumps(item) + b"\n"
+    except Exception as e:
+        # 响应头已发出，只能以最后一行报告错误
+        logger.error(f"NDJSON 流输出中断: {str(e)}")
+        yield dumps({"error": str(e)}) + b"\n"
+
+def ndjson_response(items: AsyncIterator[Any], filename: str = None) -> StreamingResponse:
+    """把异步迭代的记录逐行输出为 NDJSON，内存占用与结果总量无关"""
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'} if filename else None
+    return StreamingResponse(_ndjson_lines(items), media_type=NDJSON_MEDIA_TYPE, headers=headers)
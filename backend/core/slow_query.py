@@ -0,0 +1,129 @@
+from typing import Any, Dict, List, Optional
+from collections import deque
+from datetime import datetime
+import os
+import sys
+import threading
+import time
+from sqlalchemy import event
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 慢查询阈值（毫秒），执行时间超过该值的语句记入慢查询日志；设为 0 关闭
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+
+# 慢查询日志保留的条数（环形缓冲，超出后丢弃最早的记录）
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "200"))
+
+# 记录的参数和语句的最大长度，超出部分截断
+SLOW_QUERY_MAX_TEXT = 2000
+
+# 项目代码所在目录，用于从调用栈中找出发起查询的业务代码
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _truncate(text: str) -> str:
+    return text if len(text) <= SLOW_QUERY_MAX_TEXT else text[:SLOW_QUERY_MAX_TEXT] + "...(截断)"
+
+def _is_project_frame(frame) -> bool:
+    filename = frame.f_code.co_filename
+    return filename.startswith(PROJECT_DIR) and "site-packages" not in filename and filename != __file__
+
+def _find_call_site(frame) -> Optional[List[str]]:
+    sites = []
+    while frame is not None and len(sites) < 3:
+        if _is_project_frame(frame):
+            sites.append(
+                f"{os.path.relpath(frame.f_code.co_filename, PROJECT_DIR)}:{frame.f_lineno} in {frame.f_code.co_name}"
+            )
+        frame = frame.f_back
+    return sites or None
+
+def call_site() -> List[str]:
+    """发起查询的业务代码位置（由内到外最多 3 层）
+
+    异步会话的语句在 SQLAlchemy 派生的 greenlet 中执行，当前栈上只有驱动和 SQLAlchemy 的帧；
+    此时改从父 greenlet（等待查询结果的协程）被挂起的帧往上查找。
+    """
+    sites = _find_call_site(sys._getframe(2))
+    if sites:
+        return sites
+    try:
+        import greenlet
+        parent = greenlet.getcurrent().parent
+        if parent is not None:
+            return _find_call_site(parent.gr_frame) or []
+    except ImportError:
+        pass
+    return []
+
+class SlowQueryLog:
+    """慢查询日志：超过阈值的语句连同参数、耗时和调用位置保存在内存环形缓冲中，供接口查询"""
+
+    def __init__(self, threshold_ms: float = SLOW_QUERY_THRESHOLD_MS, size: int = SLOW_QUERY_LOG_SIZE):
+        self.threshold_ms = threshold_ms
+        self.entries: deque = deque(maxlen=size)
+        self.lock = threading.Lock()
+        self.total = 0
+
+    def install(self, async_engine, name: str):
+        """在引擎上挂接语句计时事件"""
+        if self.threshold_ms <= 0:
+            return
+        sync_engine = async_engine.sync_engine
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("slow_query_started_at", []).append(time.perf_counter())
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            elapsed_ms = (time.perf_counter() - conn.info["slow_query_started_at"].pop()) * 1000
+            if elapsed_ms >= self.threshold_ms:
+                self.record(name, statement, parameters, elapsed_ms, executemany)
+
+        @event.listens_for(sync_engine, "handle_error")
+        def _error(exception_context):
+            conn = exception_context.connection
+            if conn is not None and conn.info.get("slow_query_started_at"):
+                conn.info["slow_query_started_at"].pop()
+
+    def record(self, engine: str, statement: str, parameters: Any, elapsed_ms: float, executemany: bool = False):
+        entry = {
+            "engine": engine,
+            "duration_ms": round(elapsed_ms, 2),
+            "statement": _truncate(" ".join(statement.split())),
+            "parameters": _truncate(repr(parameters)),
+            "executemany": executemany,
+            "call_site": call_site(),
+            "recorded_at": datetime.utcnow().isoformat()
+        }
+        with self.lock:
+            self.entries.append(entry)
+            self.total += 1
+        logger.warning(f"慢查询 {entry['duration_ms']} ms @ {entry['call_site'][:1]}: {entry['statement'][:200]}")
+
+    def recent(self, limit: int = 50, min_ms: float = 0, engine: Optional[str] = None) -> List[Dict[str, Any]]:
+        """最近的慢查询（新的在前）"""
+        with self.lock:
+            entries = list(self.entries)
+        entries = [
+            entry for entry in reversed(entries)
+            if entry["duration_ms"] >= min_ms and (engine is None or entry["engine"] == engine)
+        ]
+        return entries[:limit]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "threshold_ms": self.threshold_ms,
+            "capacity": self.entries.maxlen,
+            "buffered": len(self.entries),
+            "total": self.total
+        }
+
+# 全局实例
+slow_query_log = SlowQueryLog()
@@ -1,19 +1,21 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import uvicorn
-from api.routes import config, scraper, monitor, data
+from api.routes import config, scraper, monitor, data, archive, jobs
 from core.database import init_db
 from core.scheduler import start_scheduler
-from services.websocket_manager import ConnectionManager
-
-# WebSocket connection manager
-manager = ConnectionManager()
+from core.serialization import DefaultResponse
+from core.metrics import registry, MetricsMiddleware, PROMETHEUS_CONTENT_TYPE
+from core.profiling import ProfilingMiddleware
+from services.websocket_manager import manager
+from services.job_service import job_service
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await init_db()
+    await job_service.recover()
     await start_scheduler()
     yield
     # Shutdown
@@ -23,7 +25,8 @@ app = FastAPI(
     title="小红书舆情监测系统 API",
     description="Xiaohongshu Social Media Monitoring System",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=DefaultResponse
 )
 
 # CORS middleware
@@ -35,11 +38,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 请求耗时指标
+app.add_middleware(MetricsMiddleware)
+
+# 按需采样剖析请求（PROFILING_MODE）
+app.add_middleware(ProfilingMiddleware)
+
 # Include routers
 app.include_router(config.router, prefix="/api/config", tags=["配置管理"])
 app.include_router(scraper.router, prefix="/api/scraper", tags=["数据采集"])
 app.include_router(monitor.router, prefix="/api/monitor", tags=["实时监测"])
 app.include_router(data.router, prefix="/api/data", tags=["数据查询"])
+app.include_router(archive.router, prefix="/api/archive", tags=["数据归档"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["后台任务"])
 
 @app.websocket("/ws/monitor/{client_id}")
 async def websocket_endpoint(websocket: WebSocket, client_id: str):
@@ -55,6 +66,11 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
 async def root():
     return {"message": "小红书舆情监测系统 API"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus 文本格式的指标"""
+    return Response(content=registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
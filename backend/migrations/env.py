@@ -0,0 +1,65 @@
+import asyncio
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy.ext.asyncio import create_async_engine
+from core.database import Base, DATABASE_URL
+
+config = context.config
+
+# 由应用内 init_db 调用时沿用应用自身的日志配置
+if config.config_file_name is not None and "connection" not in config.attributes:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# 全文索引表由迁移以原生 SQL 维护，不参与 autogenerate 比对
+EXCLUDED_TABLES = ("hot_posts_fts", "hot_post_search")
+
+def include_name(name, type_, parent_names):
+    if type_ == "table":
+        return not (name or "").startswith(EXCLUDED_TABLES)
+    return True
+
+def _configure(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=connection.dialect.name == "sqlite",  # SQLite 不支持大部分 ALTER TABLE
+        compare_type=True,
+        include_name=include_name
+    )
+
+def run_migrations_offline():
+    """生成 SQL 脚本而不连接数据库"""
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"}
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def do_run_migrations(connection):
+    _configure(connection)
+    with context.begin_transaction():
+        context.run_migrations()
+
+async def run_async_migrations():
+    engine = create_async_engine(DATABASE_URL)
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await engine.dispose()
+
+def run_migrations_online():
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        # init_db 通过 run_sync 传入的同步连接
+        do_run_migrations(connection)
+    else:
+        asyncio.run(run_async_migrations())
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
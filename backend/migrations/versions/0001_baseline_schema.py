@@ -0,0 +1,154 @@
+"""baseline schema
+
+与引入迁移前 create_all 生成的表结构一致。对已有数据库只补建缺失的表、列和索引，
+因此既可用于空库初始化，也可直接在旧库上执行。
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _inspector():
+    return sa.inspect(op.get_bind())
+
+
+def _create_table(name, *columns, indexes=(), **kw):
+    """表不存在时建表，并补建缺失的单列索引"""
+    if name not in _inspector().get_table_names():
+        op.create_table(name, *columns, **kw)
+    existing = {index["name"] for index in _inspector().get_indexes(name)}
+    for column, unique in indexes:
+        index_name = f"ix_{name}_{column}"
+        if index_name not in existing:
+            op.create_index(index_name, name, [column], unique=unique)
+
+
+def upgrade() -> None:
+    _create_table(
+        "user_configs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.String(50)),
+        sa.Column("keywords", sa.JSON()),
+        sa.Column("collection_frequency", sa.String(20)),
+        sa.Column("data_retention_days", sa.Integer()),
+        sa.Column("hot_post_threshold", sa.Integer()),
+        sa.Column("notification_enabled", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        indexes=[("id", False), ("user_id", True)]
+    )
+    _create_table(
+        "keyword_trends",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("keyword", sa.String(100)),
+        sa.Column("date", sa.DateTime()),
+        sa.Column("count", sa.Integer()),
+        sa.Column("created_at", sa.DateTime()),
+        indexes=[("id", False), ("keyword", False), ("date", False)]
+    )
+    _create_table(
+        "keyword_spike_states",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("keyword", sa.String(100)),
+        sa.Column("ewma_mean", sa.Float()),
+        sa.Column("ewma_var", sa.Float()),
+        sa.Column("observations", sa.Integer()),
+        sa.Column("last_value", sa.Integer()),
+        sa.Column("last_alert_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        indexes=[("id", False), ("keyword", True)]
+    )
+    _create_table(
+        "hot_posts",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("post_id", sa.String(100)),
+        sa.Column("title", sa.Text()),
+        sa.Column("author", sa.String(100)),
+        sa.Column("content", sa.Text()),
+        sa.Column("url", sa.Text()),
+        sa.Column("likes_count", sa.Integer()),
+        sa.Column("comments_count", sa.Integer()),
+        sa.Column("hot_score", sa.Float()),
+        sa.Column("keyword", sa.String(100)),
+        sa.Column("publish_time", sa.DateTime()),
+        sa.Column("collected_at", sa.DateTime()),
+        sa.Column("simhash", sa.String(16)),
+        sa.Column("duplicate_of", sa.Integer()),
+        sa.Column("duplicate_count", sa.Integer()),
+        indexes=[("id", False), ("post_id", True), ("keyword", False)]
+    )
+    # 近重复检测新增的列（旧库由 create_all 建表时没有）
+    hot_post_columns = {column["name"] for column in _inspector().get_columns("hot_posts")}
+    for column in (
+        sa.Column("simhash", sa.String(16)),
+        sa.Column("duplicate_of", sa.Integer()),
+        sa.Column("duplicate_count", sa.Integer(), server_default="0"),
+    ):
+        if column.name not in hot_post_columns:
+            op.add_column("hot_posts", column)
+    _create_table("hot_posts", indexes=[("duplicate_of", False)])
+
+    _create_table(
+        "word_cloud_data",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("keyword", sa.String(100)),
+        sa.Column("word", sa.String(50)),
+        sa.Column("weight", sa.Float()),
+        sa.Column("date", sa.DateTime()),
+        sa.Column("created_at", sa.DateTime()),
+        indexes=[("id", False), ("keyword", False), ("date", False)]
+    )
+    _create_table(
+        "sentiment_analysis",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("keyword", sa.String(100)),
+        sa.Column("date", sa.DateTime()),
+        sa.Column("positive_score", sa.Float()),
+        sa.Column("negative_score", sa.Float()),
+        sa.Column("neutral_score", sa.Float()),
+        sa.Column("total_posts", sa.Integer()),
+        sa.Column("created_at", sa.DateTime()),
+        indexes=[("id", False), ("keyword", False), ("date", False)]
+    )
+    _create_table(
+        "keyword_term_counts",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("keyword", sa.String(100)),
+        sa.Column("bucket", sa.DateTime()),
+        sa.Column("term", sa.String(50)),
+        sa.Column("count", sa.Integer()),
+        sa.UniqueConstraint("keyword", "bucket", "term", name="uq_keyword_term_counts_keyword_bucket_term"),
+        indexes=[("id", False)]
+    )
+    _create_table(
+        "scraping_logs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("task_type", sa.String(50)),
+        sa.Column("keyword", sa.String(100)),
+        sa.Column("status", sa.String(20)),
+        sa.Column("message", sa.Text()),
+        sa.Column("data_count", sa.Integer()),
+        sa.Column("started_at", sa.DateTime()),
+        sa.Column("completed_at", sa.DateTime()),
+        indexes=[("id", False)]
+    )
+
+
+def downgrade() -> None:
+    for table in (
+        "scraping_logs", "keyword_term_counts", "sentiment_analysis", "word_cloud_data",
+        "hot_posts", "keyword_spike_states", "keyword_trends", "user_configs"
+    ):
+        op.drop_table(table)
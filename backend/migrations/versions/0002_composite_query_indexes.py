@@ -0,0 +1,83 @@
+"""composite indexes for hot queries
+
+为按 keyword + 时间过滤、按 hot_score/date 排序的查询建立组合索引，并删除被组合索引
+最左前缀覆盖的 keyword 单列索引。PostgreSQL 上使用 CONCURRENTLY 建删索引，不阻塞写入。
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (索引名, 表名, 列, 额外参数)
+INDEXES = [
+    ("ix_keyword_trends_keyword_date", "keyword_trends", ["keyword", "date"], {}),
+    ("ix_hot_posts_keyword_collected_at", "hot_posts", ["keyword", "collected_at"], {}),
+    ("ix_hot_posts_keyword_hot_score", "hot_posts", ["keyword", sa.text("hot_score DESC")], {}),
+    ("ix_hot_posts_hot_score", "hot_posts", [sa.text("hot_score DESC")], {}),
+    ("ix_word_cloud_data_keyword_date", "word_cloud_data", ["keyword", "date"], {"postgresql_include": ["word", "weight"]}),
+    ("ix_sentiment_analysis_keyword_date", "sentiment_analysis", ["keyword", "date"], {}),
+    ("ix_scraping_logs_task_type_started_at", "scraping_logs", ["task_type", "started_at"], {}),
+    ("ix_scraping_logs_started_at", "scraping_logs", ["started_at"], {}),
+]
+
+# 被组合索引最左前缀覆盖的单列索引
+SUPERSEDED_INDEXES = [
+    ("ix_keyword_trends_keyword", "keyword_trends", ["keyword"]),
+    ("ix_hot_posts_keyword", "hot_posts", ["keyword"]),
+    ("ix_word_cloud_data_keyword", "word_cloud_data", ["keyword"]),
+    ("ix_sentiment_analysis_keyword", "sentiment_analysis", ["keyword"]),
+]
+
+
+def _index_names(table):
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def _is_postgresql():
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def _create_index(name, table, columns, **kw):
+    if name in _index_names(table):
+        return
+    if _is_postgresql():
+        with op.get_context().autocommit_block():
+            op.create_index(name, table, columns, postgresql_concurrently=True, **kw)
+    else:
+        op.create_index(name, table, columns, **kw)
+
+
+def _drop_index(name, table):
+    if name not in _index_names(table):
+        return
+    if _is_postgresql():
+        with op.get_context().autocommit_block():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+    else:
+        op.drop_index(name, table_name=table)
+
+
+def upgrade() -> None:
+    for name, table, columns, kw in INDEXES:
+        _create_index(name, table, columns, **kw)
+    for name, table, _ in SUPERSEDED_INDEXES:
+        _drop_index(name, table)
+
+
+def downgrade() -> None:
+    for name, table, columns in SUPERSEDED_INDEXES:
+        _create_index(name, table, columns)
+    for name, table, _, _ in INDEXES:
+        _drop_index(name, table)
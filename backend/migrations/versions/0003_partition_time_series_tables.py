@@ -0,0 +1,115 @@
+"""range-partition time series tables on PostgreSQL
+
+把 keyword_trends、word_cloud_data、sentiment_analysis、scraping_logs 改为按天的
+范围分区表，过期数据可以整块分离删除。分区表主键必须包含分区键，因此主键改为
+(id, 分区键)，id 仍由原序列生成。SQLite 上不做任何改动，保留期清理走分批删除。
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00
+
+"""
+from datetime import datetime, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# 本迁移处理的表及分区键、预建分区天数在此固定，不引用应用中会随版本变化的 core.partitioning
+PARTITIONED_TABLES = {
+    "keyword_trends": "date",
+    "word_cloud_data": "date",
+    "sentiment_analysis": "date",
+    "scraping_logs": "started_at",
+}
+PARTITION_DAYS_AHEAD = 7
+
+
+def is_partitioned(bind, table):
+    relkind = bind.execute(
+        sa.text("SELECT relkind FROM pg_class WHERE relname = :table AND relkind IN ('p', 'r')"),
+        {"table": table}
+    ).scalar()
+    return relkind == "p"
+
+
+def ensure_partitions(bind, table, start, end):
+    """为 [start, end] 内每天建分区（迁移时表中尚无数据落入默认分区，不会冲突）"""
+    day = start
+    while day <= end:
+        name = f"{table}_p{day:%Y%m%d}"
+        exists = bind.execute(sa.text("SELECT 1 FROM pg_class WHERE relname = :name"), {"name": name}).scalar()
+        if not exists:
+            op.execute(
+                f"CREATE TABLE {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+            )
+        day += timedelta(days=1)
+
+
+def _index_definitions(bind, table):
+    """读取表上除主键外的索引定义"""
+    return bind.execute(
+        sa.text(
+            "SELECT indexname, indexdef FROM pg_indexes "
+            "WHERE tablename = :table AND indexname NOT LIKE '%_pkey'"
+        ),
+        {"table": table}
+    ).fetchall()
+
+
+def _rebuild(bind, table, partition_key):
+    """以相同结构重建表并迁移数据；partition_key 为空时重建为普通表"""
+    legacy = f"{table}_legacy"
+    indexes = _index_definitions(bind, table)
+
+    # 分区键不允许为空，旧数据缺失时按当前时间补齐
+    if partition_key:
+        op.execute(f"UPDATE {table} SET {partition_key} = (now() at time zone 'utc') WHERE {partition_key} IS NULL")
+
+    op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    op.execute(f"ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey")
+    if partition_key:
+        op.execute(f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE ({partition_key})")
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, {partition_key})")
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+        first_day = bind.execute(sa.text(f"SELECT min({partition_key}) FROM {legacy}")).scalar()
+        today = datetime.utcnow().date()
+        ensure_partitions(bind, table, first_day.date() if first_day else today, today + timedelta(days=PARTITION_DAYS_AHEAD))
+    else:
+        op.execute(f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS)")
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)")
+
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    op.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+    op.execute(f"DROP TABLE {legacy} CASCADE")
+
+    # 改名前读取的索引定义指向原表名，直接在新表上重建；分区表上的索引会自动下推到各分区
+    for _, indexdef in indexes:
+        op.execute(indexdef)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    for table, partition_key in PARTITIONED_TABLES.items():
+        if not is_partitioned(bind, table):
+            _rebuild(bind, table, partition_key)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    for table in PARTITIONED_TABLES:
+        if is_partitioned(bind, table):
+            _rebuild(bind, table, None)
@@ -0,0 +1,60 @@
+"""keyword trend daily/weekly rollups
+
+新增 keyword_trend_rollups 汇总表，并用现有原始声量数据回填日/周汇总。
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# SQLite 上与 SQLAlchemy DateTime 的存储格式（带 6 位微秒）保持一致，否则按值比较和范围过滤都对不上
+SQLITE_DATETIME_FORMAT = "%Y-%m-%d 00:00:00.000000"
+
+
+def _bucket_sql(dialect: str, granularity: str) -> str:
+    if dialect == "postgresql":
+        return f"date_trunc('{granularity}', date)"
+    if granularity == "week":
+        return f"strftime('{SQLITE_DATETIME_FORMAT}', date, '-6 days', 'weekday 1')"
+    return f"strftime('{SQLITE_DATETIME_FORMAT}', date)"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "keyword_trend_rollups",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("granularity", sa.String(10)),
+        sa.Column("keyword", sa.String(100)),
+        sa.Column("bucket", sa.DateTime()),
+        sa.Column("count", sa.Integer()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.UniqueConstraint("granularity", "keyword", "bucket", name="uq_keyword_trend_rollups_granularity_keyword_bucket"),
+    )
+    op.create_index("ix_keyword_trend_rollups_id", "keyword_trend_rollups", ["id"])
+
+    dialect = op.get_bind().dialect.name
+    now = "(now() at time zone 'utc')" if dialect == "postgresql" else "CURRENT_TIMESTAMP"
+    for granularity in ("day", "week"):
+        bucket = _bucket_sql(dialect, granularity)
+        op.execute(
+            f"INSERT INTO keyword_trend_rollups (granularity, keyword, bucket, count, updated_at) "
+            f"SELECT '{granularity}', keyword, {bucket}, sum(count), {now} "
+            f"FROM keyword_trends WHERE date IS NOT NULL GROUP BY keyword, {bucket}"
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_keyword_trend_rollups_id", table_name="keyword_trend_rollups")
+    op.drop_table("keyword_trend_rollups")
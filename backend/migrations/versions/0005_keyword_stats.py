@@ -0,0 +1,43 @@
+"""incrementally maintained keyword stats
+
+新增 keyword_stats 统计表。表为空时首次请求 /api/data/stats 会全量重算一次。
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "keyword_stats",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("keyword", sa.String(100)),
+        sa.Column("monitored_keywords", sa.Integer()),
+        sa.Column("hot_posts", sa.Integer()),
+        sa.Column("total_interactions", sa.Integer()),
+        sa.Column("sentiment_sum", sa.Float()),
+        sa.Column("sentiment_count", sa.Integer()),
+        sa.Column("latest_positive_score", sa.Float()),
+        sa.Column("latest_sentiment_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_keyword_stats_id", "keyword_stats", ["id"])
+    op.create_index("ix_keyword_stats_keyword", "keyword_stats", ["keyword"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_keyword_stats_keyword", table_name="keyword_stats")
+    op.drop_index("ix_keyword_stats_id", table_name="keyword_stats")
+    op.drop_table("keyword_stats")
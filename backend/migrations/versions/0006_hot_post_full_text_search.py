@@ -0,0 +1,50 @@
+"""hot post full-text search index
+
+SQLite: FTS5 虚拟表 hot_posts_fts（rowid = hot_posts.id），删除热帖时由触发器同步删除索引。
+PostgreSQL: hot_post_search 表保存 tsvector，GIN 索引，随热帖级联删除。
+已有热帖的索引由启动后的回填任务补建（需要 jieba 分词）。
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.create_table(
+            "hot_post_search",
+            sa.Column("post_id", sa.Integer(), sa.ForeignKey("hot_posts.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("search_vector", postgresql.TSVECTOR(), nullable=False),
+        )
+        op.create_index(
+            "ix_hot_post_search_search_vector", "hot_post_search", ["search_vector"], postgresql_using="gin"
+        )
+    else:
+        # 内容为预分词文本（空格分隔），unicode61 按空格切分即可
+        op.execute("CREATE VIRTUAL TABLE IF NOT EXISTS hot_posts_fts USING fts5(title, content, tokenize='unicode61')")
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS hot_posts_fts_delete AFTER DELETE ON hot_posts "
+            "BEGIN DELETE FROM hot_posts_fts WHERE rowid = old.id; END"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_hot_post_search_search_vector", table_name="hot_post_search")
+        op.drop_table("hot_post_search")
+    else:
+        op.execute("DROP TRIGGER IF EXISTS hot_posts_fts_delete")
+        op.execute("DROP TABLE IF EXISTS hot_posts_fts")
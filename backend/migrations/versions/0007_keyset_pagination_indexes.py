@@ -0,0 +1,108 @@
+"""keyset pagination indexes
+
+热帖排行改为 (hot_score, id) 倒序的部分索引（只含近重复簇代表），采集日志增加
+(started_at, id) 倒序索引及按类型/状态筛选的组合索引，替换 0002 中的对应索引。
+
+ix_hot_posts_duplicate_of 同时改为只含重复帖子（duplicate_of IS NOT NULL）的部分索引。原来的全量索引
+能匹配 duplicate_of IS NULL，SQLite 在全局热帖排行上会选它做等值查找，再对全部簇代表临时排序，
+而不用上面的 (hot_score, id) 有序部分索引。簇成员查找（duplicate_of = 代表ID）仍可使用新索引。
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CANONICAL_ONLY = sa.text("duplicate_of IS NULL")
+
+INDEXES = [
+    ("ix_hot_posts_keyword_rank", "hot_posts", ["keyword", sa.text("hot_score DESC"), sa.text("id DESC")],
+     {"postgresql_where": CANONICAL_ONLY, "sqlite_where": CANONICAL_ONLY}),
+    ("ix_hot_posts_rank", "hot_posts", [sa.text("hot_score DESC"), sa.text("id DESC")],
+     {"postgresql_where": CANONICAL_ONLY, "sqlite_where": CANONICAL_ONLY}),
+    ("ix_scraping_logs_task_type_started_at_id", "scraping_logs",
+     ["task_type", sa.text("started_at DESC"), sa.text("id DESC")], {}),
+    ("ix_scraping_logs_status_started_at_id", "scraping_logs",
+     ["status", sa.text("started_at DESC"), sa.text("id DESC")], {}),
+    ("ix_scraping_logs_started_at_id", "scraping_logs", [sa.text("started_at DESC"), sa.text("id DESC")], {}),
+]
+
+DUPLICATE_OF_INDEX = "ix_hot_posts_duplicate_of"
+DUPLICATES_ONLY = sa.text("duplicate_of IS NOT NULL")
+
+SUPERSEDED_INDEXES = [
+    ("ix_hot_posts_keyword_hot_score", "hot_posts", ["keyword", sa.text("hot_score DESC")]),
+    ("ix_hot_posts_hot_score", "hot_posts", [sa.text("hot_score DESC")]),
+    ("ix_scraping_logs_task_type_started_at", "scraping_logs", ["task_type", "started_at"]),
+    ("ix_scraping_logs_started_at", "scraping_logs", ["started_at"]),
+]
+
+
+def _index_names(table):
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def _is_partitioned(bind, table):
+    relkind = bind.execute(
+        sa.text("SELECT relkind FROM pg_class WHERE relname = :table AND relkind IN ('p', 'r')"),
+        {"table": table}
+    ).scalar()
+    return relkind == "p"
+
+
+def _concurrently(table):
+    """PostgreSQL 普通表上 CONCURRENTLY 建删索引；分区表不支持，只能在事务内执行"""
+    bind = op.get_bind()
+    return bind.dialect.name == "postgresql" and not _is_partitioned(bind, table)
+
+
+def _create_index(name, table, columns, **kw):
+    if name in _index_names(table):
+        return
+    if _concurrently(table):
+        with op.get_context().autocommit_block():
+            op.create_index(name, table, columns, postgresql_concurrently=True, **kw)
+    else:
+        op.create_index(name, table, columns, **kw)
+
+
+def _drop_index(name, table):
+    if name not in _index_names(table):
+        return
+    if _concurrently(table):
+        with op.get_context().autocommit_block():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+    else:
+        op.drop_index(name, table_name=table)
+
+
+def upgrade() -> None:
+    for name, table, columns, kw in INDEXES:
+        _create_index(name, table, columns, **kw)
+    for name, table, _ in SUPERSEDED_INDEXES:
+        _drop_index(name, table)
+    _drop_index(DUPLICATE_OF_INDEX, "hot_posts")
+    _create_index(
+        DUPLICATE_OF_INDEX, "hot_posts", ["duplicate_of"],
+        postgresql_where=DUPLICATES_ONLY, sqlite_where=DUPLICATES_ONLY
+    )
+
+
+def downgrade() -> None:
+    _drop_index(DUPLICATE_OF_INDEX, "hot_posts")
+    _create_index(DUPLICATE_OF_INDEX, "hot_posts", ["duplicate_of"])
+    for name, table, columns in SUPERSEDED_INDEXES:
+        _create_index(name, table, columns)
+    for name, table, _, _ in INDEXES:
+        _drop_index(name, table)
@@ -0,0 +1,156 @@
+"""word cloud snapshots
+
+词云由逐词一行改为每次生成一条快照（words 为 [[词, 权重], ...]），按 (keyword, date 倒序)
+建索引以便取最新快照。旧的 word_cloud_data 按 (keyword, date) 合并为快照后删除。
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 00:00:00
+
+"""
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# 快照保留的词数，与词云生成时返回的数量一致
+SNAPSHOT_WORDS = 50
+
+# 0003 在 PostgreSQL 上把 word_cloud_data 按 date 做了按天分区，降级时按同样的结构恢复
+PARTITION_DAYS_AHEAD = 7
+
+
+snapshots = sa.table(
+    "word_cloud_snapshots",
+    sa.column("keyword", sa.String),
+    sa.column("words", sa.JSON),
+    sa.column("total_words", sa.Integer),
+    sa.column("date", sa.DateTime),
+    sa.column("created_at", sa.DateTime),
+)
+
+word_cloud_data = sa.table(
+    "word_cloud_data",
+    sa.column("keyword", sa.String),
+    sa.column("word", sa.String),
+    sa.column("weight", sa.Float),
+    sa.column("date", sa.DateTime),
+    sa.column("created_at", sa.DateTime),
+)
+
+
+def _create_partitioned_word_cloud_data(first_day):
+    """按 0003 的结果重建分区表: 主键 (id, date)、默认分区，并预建到 PARTITION_DAYS_AHEAD 天后的按天分区"""
+    op.execute(
+        "CREATE TABLE word_cloud_data ("
+        "id SERIAL, keyword VARCHAR(100), word VARCHAR(50), weight FLOAT, "
+        "date TIMESTAMP WITHOUT TIME ZONE NOT NULL, created_at TIMESTAMP WITHOUT TIME ZONE, "
+        "CONSTRAINT word_cloud_data_pkey PRIMARY KEY (id, date)"
+        ") PARTITION BY RANGE (date)"
+    )
+    op.execute("CREATE TABLE word_cloud_data_default PARTITION OF word_cloud_data DEFAULT")
+
+    day = first_day
+    last_day = datetime.utcnow().date() + timedelta(days=PARTITION_DAYS_AHEAD)
+    while day <= last_day:
+        op.execute(
+            f"CREATE TABLE word_cloud_data_p{day:%Y%m%d} PARTITION OF word_cloud_data "
+            f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+        )
+        day += timedelta(days=1)
+
+
+def _create_word_cloud_data(bind, first_day):
+    if bind.dialect.name == "postgresql":
+        _create_partitioned_word_cloud_data(first_day)
+    else:
+        op.create_table(
+            "word_cloud_data",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("keyword", sa.String(100)),
+            sa.Column("word", sa.String(50)),
+            sa.Column("weight", sa.Float()),
+            sa.Column("date", sa.DateTime()),
+            sa.Column("created_at", sa.DateTime()),
+        )
+    op.create_index("ix_word_cloud_data_id", "word_cloud_data", ["id"])
+    op.create_index("ix_word_cloud_data_date", "word_cloud_data", ["date"])
+    op.create_index(
+        "ix_word_cloud_data_keyword_date", "word_cloud_data", ["keyword", "date"],
+        postgresql_include=["word", "weight"]
+    )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "word_cloud_snapshots",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("keyword", sa.String(100)),
+        sa.Column("words", sa.JSON()),
+        sa.Column("total_words", sa.Integer()),
+        sa.Column("date", sa.DateTime()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_word_cloud_snapshots_id", "word_cloud_snapshots", ["id"])
+    op.create_index("ix_word_cloud_snapshots_date", "word_cloud_snapshots", ["date"])
+    op.create_index("ix_word_cloud_snapshots_keyword_date", "word_cloud_snapshots", ["keyword", sa.text("date DESC")])
+
+    bind = op.get_bind()
+    if "word_cloud_data" not in sa.inspect(bind).get_table_names():
+        return
+
+    # 同一次生成的词共享同一个 date，按 (keyword, date) 分组即得到一份快照
+    rows = bind.execute(
+        sa.select(word_cloud_data.c.keyword, word_cloud_data.c.date, word_cloud_data.c.word, word_cloud_data.c.weight)
+        .where(word_cloud_data.c.date.isnot(None))
+        .order_by(word_cloud_data.c.keyword, word_cloud_data.c.date, word_cloud_data.c.weight.desc())
+    ).fetchall()
+    batch = []
+    for (keyword, date), group in groupby(rows, key=lambda row: (row.keyword, row.date)):
+        words = [[row.word, row.weight] for row in group]
+        batch.append({
+            "keyword": keyword,
+            "words": words[:SNAPSHOT_WORDS],
+            "total_words": len(words),
+            "date": date,
+            "created_at": date,
+        })
+        if len(batch) >= 500:
+            op.bulk_insert(snapshots, batch)
+            batch = []
+    if batch:
+        op.bulk_insert(snapshots, batch)
+
+    op.drop_table("word_cloud_data")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(snapshots.c.keyword, snapshots.c.words, snapshots.c.date)
+        .where(snapshots.c.date.isnot(None))
+    ).fetchall()
+    first_day = min((row.date.date() for row in rows), default=datetime.utcnow().date())
+    _create_word_cloud_data(bind, first_day)
+
+    batch = [
+        {"keyword": row.keyword, "word": word, "weight": weight, "date": row.date, "created_at": row.date}
+        for row in rows
+        for word, weight in row.words or []
+    ]
+    if batch:
+        op.bulk_insert(word_cloud_data, batch)
+
+    op.drop_index("ix_word_cloud_snapshots_keyword_date", table_name="word_cloud_snapshots")
+    op.drop_index("ix_word_cloud_snapshots_date", table_name="word_cloud_snapshots")
+    op.drop_index("ix_word_cloud_snapshots_id", table_name="word_cloud_snapshots")
+    op.drop_table("word_cloud_snapshots")
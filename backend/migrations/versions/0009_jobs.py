@@ -0,0 +1,50 @@
+"""background jobs
+
+新增 jobs 表，记录采集与实时监测后台任务的状态、进度和结果，供 /api/jobs 查询、取消和重试。
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.String(32), primary_key=True),
+        sa.Column("job_type", sa.String(50)),
+        sa.Column("status", sa.String(20)),
+        sa.Column("params", sa.JSON()),
+        sa.Column("progress_done", sa.Integer()),
+        sa.Column("progress_total", sa.Integer()),
+        sa.Column("message", sa.Text()),
+        sa.Column("result", sa.JSON()),
+        sa.Column("error", sa.Text()),
+        sa.Column("attempt", sa.Integer()),
+        sa.Column("retry_of", sa.String(32)),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("started_at", sa.DateTime()),
+        sa.Column("completed_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index(
+        "ix_jobs_status_created_at_id", "jobs", ["status", sa.text("created_at DESC"), sa.text("id DESC")]
+    )
+    op.create_index("ix_jobs_created_at_id", "jobs", [sa.text("created_at DESC"), sa.text("id DESC")])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jobs_created_at_id", table_name="jobs")
+    op.drop_index("ix_jobs_status_created_at_id", table_name="jobs")
+    op.drop_table("jobs")
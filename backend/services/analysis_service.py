@@ -1,4 +1,8 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+from abc import ABC, abstractmethod
+from collections import Counter
+import asyncio
+import os
 import jieba
 import jieba.analyse
 from wordcloud import WordCloud
@@ -6,8 +10,13 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
-from core.database import HotPost, WordCloudData, SentimentAnalysis, KeywordTrend
+from sqlalchemy import select, func, and_, tuple_
+from core.database import read_session, HotPost, WordCloudSnapshot, SentimentAnalysis, KeywordTrend, KeywordTrendRollup
+from core.pagination import encode_cursor, decode_cursor
+from core.cache import response_cache
+from core.serialization import EXPORT_BATCH_SIZE
+from core.metrics import ANALYSIS_SECONDS
+from services.stats_service import stats_service
 import logging
 import base64
 from io import BytesIO
@@ -17,10 +26,155 @@ try:
     SNOWNLP_AVAILABLE = True
 except ImportError:
     SNOWNLP_AVAILABLE = False
-    logging.warning("snownlp not available, sentiment analysis will be disabled")
+    logging.warning("snownlp not available, sentiment analysis will fall back to the lexicon engine")
 
 logger = logging.getLogger(__name__)
 
+# 情绪分析引擎: snownlp（逐条朴素贝叶斯）或 lexicon（NumPy 批量词典打分）
+SENTIMENT_ENGINE = os.getenv("SENTIMENT_ENGINE", "snownlp")
+
+# 词云和词频统计中忽略的常见词
+STOP_WORDS = {'小红书', '大家', '这个', '觉得', '可以', '非常', '真的'}
+
+# 趋势数据支持的时间粒度及对应的日期标签格式
+TREND_GRANULARITIES = {
+    "hour": "%m/%d %H:00",
+    "day": "%m/%d",
+    "week": "%m/%d"
+}
+
+# 热帖列表查询投影的列，不含大字段 content（需要时由 include_content 显式加上）
+HOT_POST_LIST_COLUMNS = (
+    HotPost.id, HotPost.title, HotPost.author, HotPost.likes_count, HotPost.comments_count,
+    HotPost.hot_score, HotPost.duplicate_count, HotPost.url, HotPost.keyword,
+    HotPost.publish_time, HotPost.collected_at
+)
+
+# 情绪分析查询投影的列
+SENTIMENT_COLUMNS = (
+    SentimentAnalysis.keyword, SentimentAnalysis.date, SentimentAnalysis.positive_score,
+    SentimentAnalysis.negative_score, SentimentAnalysis.neutral_score, SentimentAnalysis.total_posts
+)
+
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lexicon", "sentiment_lexicon.txt")
+
+class SentimentEngine(ABC):
+    """情绪打分引擎接口：输入一批文本，返回每条文本的正向概率（0~1）"""
+    name = "base"
+
+    def is_available(self) -> bool:
+        return True
+
+    @abstractmethod
+    def score_batch(self, texts: List[str]) -> np.ndarray:
+        """批量打分，无法打分的文本返回 NaN"""
+
+class SnowNLPSentimentEngine(SentimentEngine):
+    """基于 snownlp 的逐条情绪打分"""
+    name = "snownlp"
+
+    def is_available(self) -> bool:
+        return SNOWNLP_AVAILABLE
+
+    def score_batch(self, texts: List[str]) -> np.ndarray:
+        scores = np.full(len(texts), np.nan)
+        for i, text in enumerate(texts):
+            try:
+                scores[i] = snownlp.SnowNLP(text).sentiments
+            except Exception as e:
+                logger.warning(f"分析单条文本情绪时出错: {str(e)}")
+        return scores
+
+class LexiconSentimentEngine(SentimentEngine):
+    """基于情感词典的批量情绪打分
+
+    文本经 jieba 分词后编码为稀疏词袋（文档下标、词下标、修饰系数三元组），
+    与词典权重向量做一次稀疏矩阵-向量乘得到原始分，再经 sigmoid 映射到 0~1，
+    与 snownlp 的输出区间保持一致。否定词翻转、程度副词放大紧随其后的情感词。
+    分词使用独立的 jieba.Tokenizer，词典词不会影响词云等其他地方的全局分词。
+    """
+    name = "lexicon"
+
+    PUNCTUATION = set("，。！？；、,.!?;~～\n ")
+
+    def __init__(self, lexicon_path: str = DEFAULT_LEXICON_PATH, scale: float = 1.5):
+        self.scale = scale
+        self.vocab: Dict[str, int] = {}
+        self.negators = set()
+        self.intensifiers: Dict[str, float] = {}
+        weights = []
+
+        with open(lexicon_path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if line.startswith("!"):
+                    self.negators.add(line[1:])
+                    continue
+                word, weight = line.split("\t")
+                if word.startswith("^"):
+                    self.intensifiers[word[1:]] = float(weight)
+                    continue
+                self.vocab[word] = len(weights)
+                weights.append(float(weight))
+
+        self.weights = np.asarray(weights, dtype=np.float64)
+
+        # 保证词典词在分词时不被切开
+        self.tokenizer = jieba.Tokenizer()
+        for word in list(self.vocab) + list(self.negators) + list(self.intensifiers):
+            self.tokenizer.add_word(word)
+
+    def _encode(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """将文本编码为稀疏词袋三元组 (doc_ids, token_ids, values)"""
+        doc_ids, token_ids, values = [], [], []
+        for doc_id, text in enumerate(texts):
+            modifier = 1.0
+            for token in self.tokenizer.lcut(text or ""):
+                if token in self.negators:
+                    modifier = -modifier
+                elif token in self.intensifiers:
+                    modifier *= self.intensifiers[token]
+                elif token in self.vocab:
+                    doc_ids.append(doc_id)
+                    token_ids.append(self.vocab[token])
+                    values.append(modifier)
+                    modifier = 1.0
+                elif token in self.PUNCTUATION:
+                    modifier = 1.0
+        return (
+            np.asarray(doc_ids, dtype=np.int64),
+            np.asarray(token_ids, dtype=np.int64),
+            np.asarray(values, dtype=np.float64)
+        )
+
+    def score_batch(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.empty(0)
+        doc_ids, token_ids, values = self._encode(texts)
+        raw = np.bincount(doc_ids, weights=self.weights[token_ids] * values, minlength=len(texts))
+        return 1.0 / (1.0 + np.exp(-self.scale * raw))
+
+SENTIMENT_ENGINES = {
+    SnowNLPSentimentEngine.name: SnowNLPSentimentEngine,
+    LexiconSentimentEngine.name: LexiconSentimentEngine
+}
+
+def get_sentiment_engine(name: Optional[str] = None) -> SentimentEngine:
+    """按名称创建情绪引擎，不可用时回退到词典引擎"""
+    name = name or SENTIMENT_ENGINE
+    engine_cls = SENTIMENT_ENGINES.get(name)
+    if engine_cls is None:
+        logger.warning(f"未知的情绪分析引擎 {name}，使用 lexicon 引擎")
+        engine_cls = LexiconSentimentEngine
+
+    engine = engine_cls()
+    if not engine.is_available():
+        logger.warning(f"情绪分析引擎 {name} 不可用，使用 lexicon 引擎")
+        engine = LexiconSentimentEngine()
+    return engine
+
 class DataAnalysisService:
     def __init__(self):
         # 初始化jieba
@@ -35,6 +189,9 @@ class DataAnalysisService:
         for word in custom_words:
             jieba.add_word(word)
 
+        # 情绪分析引擎
+        self.sentiment_engine = get_sentiment_engine()
+
     async def generate_word_cloud(self, texts: List[str], keyword: str = None) -> Dict[str, Any]:
         """生成词云数据"""
         try:
@@ -58,7 +215,7 @@ class DataAnalysisService:
             # 转换为词云数据格式
             word_data = []
             for word, weight in keywords:
-                if len(word) > 1 and word not in ['小红书', '大家', '这个', '觉得', '可以', '非常', '真的']:
+                if len(word) > 1 and word not in STOP_WORDS:
                     word_data.append({
                         "word": word,
                         "weight": float(weight),
@@ -104,7 +261,8 @@ class DataAnalysisService:
 
     async def analyze_sentiment(self, texts: List[str]) -> Dict[str, float]:
         """分析情绪"""
-        if not SNOWNLP_AVAILABLE or not texts:
+        texts = [text for text in texts if text and len(text.strip()) > 5]
+        if not texts:
             return {
                 "positive": 0.5,
                 "negative": 0.3,
@@ -113,18 +271,11 @@ class DataAnalysisService:
             }
         
         try:
-            sentiments = []
-            for text in texts:
-                if text and len(text.strip()) > 5:
-                    try:
-                        s = snownlp.SnowNLP(text)
-                        sentiment_score = s.sentiments
-                        sentiments.append(sentiment_score)
-                    except Exception as e:
-                        logger.warning(f"分析单条文本情绪时出错: {str(e)}")
-                        continue
-            
-            if not sentiments:
+            # 打分是 CPU 密集的同步计算，放到线程中执行，避免阻塞事件循环
+            scores = await asyncio.to_thread(self.sentiment_engine.score_batch, texts)
+            sentiments = scores[~np.isnan(scores)]
+            
+            if sentiments.size == 0:
                 return {
                     "positive": 0.5,
                     "negative": 0.3,
@@ -133,18 +284,19 @@ class DataAnalysisService:
                 }
             
             # 计算情绪分布
-            positive_count = sum(1 for s in sentiments if s > 0.6)
-            negative_count = sum(1 for s in sentiments if s < 0.4)
-            neutral_count = len(sentiments) - positive_count - negative_count
+            positive_count = int(np.count_nonzero(sentiments > 0.6))
+            negative_count = int(np.count_nonzero(sentiments < 0.4))
+            neutral_count = sentiments.size - positive_count - negative_count
             
-            total = len(sentiments)
+            total = int(sentiments.size)
             
             return {
                 "positive": round(positive_count / total, 3),
                 "negative": round(negative_count / total, 3),
                 "neutral": round(neutral_count / total, 3),
                 "total_analyzed": total,
-                "average_score": round(np.mean(sentiments), 3)
+                "average_score": round(float(sentiments.mean()), 3),
+                "engine": self.sentiment_engine.name
             }
             
         except Exception as e:
@@ -157,97 +309,268 @@ class DataAnalysisService:
                 "error": str(e)
             }
 
-    async def calculate_trend_data(self, keyword: str, days: int = 7, db: AsyncSession = None) -> List[Dict]:
-        """计算趋势数据"""
+    def _hour_bucket(self, column, dialect: str):
+        """构造按小时分桶的表达式"""
+        if dialect == "postgresql":
+            return func.date_trunc("hour", column)
+        return func.strftime("%Y-%m-%d %H:00:00", column)
+
+    def _trend_index(self, start_date: datetime, end_date: datetime, granularity: str) -> pd.DatetimeIndex:
+        """预先生成完整的时间索引，用于补齐缺失的时间桶"""
+        start = pd.Timestamp(start_date)
+        end = pd.Timestamp(end_date)
+        if granularity == "hour":
+            return pd.date_range(start.floor("h"), end.floor("h"), freq="h")
+        if granularity == "week":
+            start = start.normalize() - pd.Timedelta(days=start.weekday())
+            end = end.normalize() - pd.Timedelta(days=end.weekday())
+            return pd.date_range(start, end, freq="7D")
+        return pd.date_range(start.normalize(), end.normalize(), freq="D")
+
+    def count_terms(self, texts: List[str]) -> Counter:
+        """统计文本中的词频（过滤单字、纯数字和常见词）"""
+        counts = Counter()
+        for text in texts:
+            if not text:
+                continue
+            for word in jieba.lcut(text):
+                word = word.strip()
+                if len(word) > 1 and not word.isdigit() and word not in STOP_WORDS:
+                    counts[word[:50]] += 1
+        return counts
+
+    async def calculate_multi_trend_data(
+        self,
+        keywords: List[str],
+        days: int = 7,
+        granularity: str = "day",
+        db: AsyncSession = None
+    ) -> Dict[str, List[Dict]]:
+        """一次分组查询计算多个关键词的趋势数据"""
         try:
-            if not db:
-                return []
+            if not db or not keywords:
+                return {}
             
-            # 计算日期范围
-            end_date = datetime.utcnow()
-            start_date = end_date - timedelta(days=days)
+            if granularity not in TREND_GRANULARITIES:
+                raise ValueError(f"不支持的时间粒度: {granularity}")
             
-            # 查询趋势数据
-            result = await db.execute(
-                select(
-                    func.date(KeywordTrend.date).label('date'),
-                    func.sum(KeywordTrend.count).label('total_count')
+            # 计算日期范围和完整时间索引
+            end_date = datetime.utcnow()
+            time_index = self._trend_index(end_date - timedelta(days=days), end_date, granularity)
+            start_date = time_index[0].to_pydatetime()
+            
+            if granularity == "hour":
+                # 小时粒度只有原始数据满足，按关键词和小时桶分组查询
+                bucket = self._hour_bucket(KeywordTrend.date, db.bind.dialect.name).label('bucket')
+                query = (
+                    select(
+                        KeywordTrend.keyword,
+                        bucket,
+                        func.sum(KeywordTrend.count).label('total_count')
+                    )
+                    .where(
+                        and_(
+                            KeywordTrend.keyword.in_(keywords),
+                            KeywordTrend.date >= start_date,
+                            KeywordTrend.date <= end_date
+                        )
+                    )
+                    .group_by(KeywordTrend.keyword, bucket)
                 )
-                .where(
-                    and_(
-                        KeywordTrend.keyword == keyword,
-                        KeywordTrend.date >= start_date,
-                        KeywordTrend.date <= end_date
+            else:
+                # 日/周粒度读取对应的汇总层，长时间范围同样廉价且不受原始数据保留期限制
+                query = (
+                    select(
+                        KeywordTrendRollup.keyword,
+                        KeywordTrendRollup.bucket.label('bucket'),
+                        KeywordTrendRollup.count.label('total_count')
+                    )
+                    .where(
+                        and_(
+                            KeywordTrendRollup.granularity == granularity,
+                            KeywordTrendRollup.keyword.in_(keywords),
+                            KeywordTrendRollup.bucket >= start_date,
+                            KeywordTrendRollup.bucket <= end_date
+                        )
                     )
                 )
-                .group_by(func.date(KeywordTrend.date))
-                .order_by(func.date(KeywordTrend.date))
-            )
+            result = await db.execute(query)
             
-            trends = result.fetchall()
-            
-            # 格式化数据
-            trend_data = []
-            for trend in trends:
-                trend_data.append({
-                    "date": trend.date.strftime("%m/%d"),
-                    "value": trend.total_count,
-                    "keyword": keyword
-                })
-            
-            # 如果数据不足，填充零值
-            if len(trend_data) < days:
-                existing_dates = {item["date"] for item in trend_data}
-                for i in range(days):
-                    date_obj = start_date + timedelta(days=i)
-                    date_str = date_obj.strftime("%m/%d")
-                    if date_str not in existing_dates:
-                        trend_data.append({
-                            "date": date_str,
-                            "value": 0,
-                            "keyword": keyword
-                        })
-                
-                # 重新排序
-                trend_data.sort(key=lambda x: datetime.strptime(f"2024/{x['date']}", "%Y/%m/%d"))
+            frame = pd.DataFrame(result.fetchall(), columns=["keyword", "bucket", "total_count"])
+            frame["bucket"] = pd.to_datetime(frame["bucket"])
+            
+            # 对齐到完整时间索引，缺失的时间桶填充零值
+            if frame.empty:
+                matrix = pd.DataFrame(0, index=time_index, columns=keywords, dtype=np.int64)
+            else:
+                matrix = (
+                    frame.pivot_table(index="bucket", columns="keyword", values="total_count", aggfunc="sum")
+                    .reindex(index=time_index, columns=keywords)
+                    .fillna(0)
+                    .astype(np.int64)
+                )
+            
+            label_format = TREND_GRANULARITIES[granularity]
+            labels = time_index.strftime(label_format)
+            timestamps = time_index.strftime("%Y-%m-%dT%H:%M:%S")
             
-            return trend_data
+            return {
+                keyword: [
+                    {
+                        "date": label,
+                        "timestamp": timestamp,
+                        "value": int(value),
+                        "keyword": keyword
+                    }
+                    for label, timestamp, value in zip(labels, timestamps, matrix[keyword].to_numpy())
+                ]
+                for keyword in keywords
+            }
             
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"计算趋势数据时出错: {str(e)}")
-            return []
+            return {}
+
+    async def calculate_trend_data(
+        self,
+        keyword: str,
+        days: int = 7,
+        db: AsyncSession = None,
+        granularity: str = "day"
+    ) -> List[Dict]:
+        """计算趋势数据"""
+        trends = await self.calculate_multi_trend_data([keyword], days, granularity, db)
+        return trends.get(keyword, [])
+
+    def hot_post_columns(self, include_content: bool = False) -> tuple:
+        return HOT_POST_LIST_COLUMNS + (HotPost.content,) if include_content else HOT_POST_LIST_COLUMNS
+
+    def _format_hot_post(self, post, rank: int, include_content: bool = False) -> Dict[str, Any]:
+        """post 为投影查询的行（按列名取值）"""
+        formatted = {
+            "id": post.id,
+            "rank": rank,
+            "title": post.title,
+            "author": post.author,
+            "likes_count": post.likes_count,
+            "comments_count": post.comments_count,
+            "hot_score": round(post.hot_score, 2),
+            "duplicate_count": post.duplicate_count or 0,
+            "url": post.url,
+            "keyword": post.keyword,
+            "publish_time": post.publish_time.isoformat() if post.publish_time else None,
+            "collected_at": post.collected_at.isoformat()
+        }
+        if include_content:
+            formatted["content"] = post.content
+        return formatted
+
+    async def page_hot_posts(
+        self,
+        keyword: str = None,
+        limit: int = 10,
+        cursor: str = None,
+        db: AsyncSession = None,
+        include_content: bool = False
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """按 (hot_score, id) 倒序做游标分页，返回本页热帖和下一页游标
+
+        只查询列表所需的列并直接由行元组构造结果，不加载 ORM 对象；正文仅在 include_content 时读取。
+        """
+        # 近重复帖子只保留簇代表
+        query = (
+            select(*self.hot_post_columns(include_content))
+            .where(HotPost.duplicate_of.is_(None))
+            .order_by(HotPost.hot_score.desc(), HotPost.id.desc())
+            .limit(limit + 1)
+        )
+        
+        if keyword:
+            query = query.where(HotPost.keyword == keyword)
+        
+        rank_offset = 0
+        if cursor:
+            position = decode_cursor(cursor)
+            if "hot_score" not in position or "id" not in position:
+                raise ValueError("无效的分页游标")
+            query = query.where(
+                tuple_(HotPost.hot_score, HotPost.id) < tuple_(position["hot_score"], position["id"])
+            )
+            rank_offset = position.get("rank", 0)
+        
+        result = await db.execute(query)
+        hot_posts = result.all()
+        has_more = len(hot_posts) > limit
+        hot_posts = hot_posts[:limit]
+        
+        # 格式化数据
+        ranked_posts = [
+            self._format_hot_post(post, i, include_content) for i, post in enumerate(hot_posts, rank_offset + 1)
+        ]
+        
+        next_cursor = None
+        if has_more:
+            last = hot_posts[-1]
+            next_cursor = encode_cursor({
+                "hot_score": last.hot_score,
+                "id": last.id,
+                "rank": rank_offset + len(hot_posts)
+            })
+        
+        return ranked_posts, next_cursor
+
+    async def stream_hot_posts(self, keyword: str = None, batch_size: int = EXPORT_BATCH_SIZE):
+        """按热度倒序逐条产出热帖（含正文），每次从服务端游标取 batch_size 行，不一次性加载全部结果"""
+        query = (
+            select(*self.hot_post_columns(include_content=True))
+            .order_by(HotPost.hot_score.desc(), HotPost.id.desc())
+            .execution_options(yield_per=batch_size)
+        )
+        if keyword:
+            query = query.where(HotPost.keyword == keyword)
+
+        async with read_session() as db:
+            result = await db.stream(query)
+            rank = 0
+            async for post in result:
+                rank += 1
+                yield self._format_hot_post(post, rank, include_content=True)
+
+    async def top_hot_posts_by_keyword(self, keywords: List[str], limit: int, db: AsyncSession,
+                                       include_content: bool = False) -> Dict[str, List[Dict]]:
+        """一次查询取多个关键词各自的前 limit 条热帖（按关键词分区编号）"""
+        ranked = (
+            select(
+                HotPost.id,
+                func.row_number().over(
+                    partition_by=HotPost.keyword,
+                    order_by=(HotPost.hot_score.desc(), HotPost.id.desc())
+                ).label("rank")
+            )
+            .where(and_(HotPost.keyword.in_(keywords), HotPost.duplicate_of.is_(None)))
+            .subquery()
+        )
+        result = await db.execute(
+            select(*self.hot_post_columns(include_content), ranked.c.rank)
+            .join(ranked, HotPost.id == ranked.c.id)
+            .where(ranked.c.rank <= limit)
+            .order_by(HotPost.keyword, ranked.c.rank)
+        )
+        posts = {keyword: [] for keyword in keywords}
+        for post in result.all():
+            posts[post.keyword].append(self._format_hot_post(post, post.rank, include_content))
+        return posts
 
-    async def rank_hot_posts(self, keyword: str = None, limit: int = 10, db: AsyncSession = None) -> List[Dict]:
+    async def rank_hot_posts(self, keyword: str = None, limit: int = 10, db: AsyncSession = None,
+                             include_content: bool = False) -> List[Dict]:
         """排序热帖"""
         try:
             if not db:
                 return []
             
-            # 构建查询
-            query = select(HotPost).order_by(HotPost.hot_score.desc()).limit(limit)
-            
-            if keyword:
-                query = query.where(HotPost.keyword == keyword)
-            
-            result = await db.execute(query)
-            hot_posts = result.scalars().all()
-            
-            # 格式化数据
-            ranked_posts = []
-            for i, post in enumerate(hot_posts, 1):
-                ranked_posts.append({
-                    "rank": i,
-                    "title": post.title,
-                    "author": post.author,
-                    "likes_count": post.likes_count,
-                    "comments_count": post.comments_count,
-                    "hot_score": round(post.hot_score, 2),
-                    "url": post.url,
-                    "keyword": post.keyword,
-                    "publish_time": post.publish_time.isoformat() if post.publish_time else None,
-                    "collected_at": post.collected_at.isoformat()
-                })
-            
+            ranked_posts, _ = await self.page_hot_posts(keyword, limit, None, db, include_content)
             return ranked_posts
             
         except Exception as e:
@@ -264,7 +587,8 @@ class DataAnalysisService:
                 .where(
                     and_(
                         HotPost.keyword == keyword,
-                        HotPost.collected_at >= recent_date
+                        HotPost.collected_at >= recent_date,
+                        HotPost.duplicate_of.is_(None)
                     )
                 )
                 .limit(100)
@@ -282,26 +606,127 @@ class DataAnalysisService:
                 return False
             
             # 生成词云数据
-            word_cloud_result = await self.generate_word_cloud(texts, keyword)
+            with ANALYSIS_SECONDS.time(task="word_cloud", keyword=keyword):
+                word_cloud_result = await self.generate_word_cloud(texts, keyword)
             
-            # 保存到数据库
-            current_date = datetime.utcnow()
-            for word_data in word_cloud_result.get("words", []):
-                word_cloud_entry = WordCloudData(
-                    keyword=keyword,
-                    word=word_data["word"],
-                    weight=word_data["weight"],
-                    date=current_date
-                )
-                db.add(word_cloud_entry)
+            # 整份词云存为一条快照
+            db.add(WordCloudSnapshot(
+                keyword=keyword,
+                words=[[item["word"], item["weight"]] for item in word_cloud_result.get("words", [])],
+                total_words=word_cloud_result.get("total_words", 0),
+                date=datetime.utcnow()
+            ))
             
             await db.commit()
+            await response_cache.invalidate(keyword)
             return True
             
         except Exception as e:
             logger.error(f"更新词云数据时出错: {str(e)}")
             return False
 
+    async def latest_word_cloud_snapshots(self, db: AsyncSession, since: datetime, keyword: Optional[str] = None,
+                                          keywords: Optional[List[str]] = None) -> List[WordCloudSnapshot]:
+        """取 since 之后每个关键词（可限定为 keywords）的最新词云快照"""
+        if keyword:
+            result = await db.execute(
+                select(WordCloudSnapshot)
+                .where(and_(WordCloudSnapshot.keyword == keyword, WordCloudSnapshot.date >= since))
+                .order_by(WordCloudSnapshot.date.desc())
+                .limit(1)
+            )
+            return list(result.scalars().all())
+
+        latest = (
+            select(WordCloudSnapshot.keyword, func.max(WordCloudSnapshot.date).label("date"))
+            .where(WordCloudSnapshot.date >= since)
+            .group_by(WordCloudSnapshot.keyword)
+        )
+        if keywords:
+            latest = latest.where(WordCloudSnapshot.keyword.in_(keywords))
+        latest = latest.subquery()
+        result = await db.execute(
+            select(WordCloudSnapshot)
+            .join(latest, and_(
+                WordCloudSnapshot.keyword == latest.c.keyword,
+                WordCloudSnapshot.date == latest.c.date
+            ))
+        )
+        # 同一时刻的重复快照只保留一条
+        snapshots = {}
+        for snapshot in result.scalars().all():
+            snapshots.setdefault(snapshot.keyword, snapshot)
+        return list(snapshots.values())
+
+    def merge_word_clouds(self, snapshots: List[WordCloudSnapshot], limit: int = 50) -> List[Dict[str, Any]]:
+        """合并多个关键词的词云快照
+
+        每个快照权重相同，某词在快照中缺失按 0 计，即取各快照权重的平均值。
+        """
+        if not snapshots:
+            return []
+        totals = Counter()
+        for snapshot in snapshots:
+            for word, weight in snapshot.words or []:
+                totals[word] += float(weight)
+        return [
+            {"word": word, "weight": weight / len(snapshots), "size": int(weight / len(snapshots) * 100)}
+            for word, weight in totals.most_common(limit)
+        ]
+
+    async def get_word_cloud(self, keyword: Optional[str], hours: int, db: AsyncSession,
+                             limit: int = 50) -> List[Dict[str, Any]]:
+        """获取最近 hours 小时内的最新词云，未指定关键词时合并所有关键词的最新快照"""
+        since = datetime.utcnow() - timedelta(hours=hours)
+        snapshots = await self.latest_word_cloud_snapshots(db, since, keyword)
+        return self.merge_word_clouds(snapshots, limit)
+
+    def summarize_sentiment(self, rows: List[Any]) -> Dict[str, Any]:
+        """把情绪分析记录（SENTIMENT_COLUMNS 投影的行）整理为逐次趋势和按帖子数加权的总体情绪"""
+        sentiment_trends = []
+        total_positive = 0
+        total_negative = 0
+        total_neutral = 0
+        total_posts = 0
+        
+        for data in rows:
+            sentiment_trends.append({
+                "date": data.date.strftime("%m/%d"),
+                "positive": data.positive_score,
+                "negative": data.negative_score,
+                "neutral": data.neutral_score,
+                "total_posts": data.total_posts
+            })
+            
+            total_positive += data.positive_score * data.total_posts
+            total_negative += data.negative_score * data.total_posts
+            total_neutral += data.neutral_score * data.total_posts
+            total_posts += data.total_posts
+        
+        return {
+            "trends": sentiment_trends,
+            "overall": {
+                "positive": round(total_positive / total_posts, 3) if total_posts > 0 else 0,
+                "negative": round(total_negative / total_posts, 3) if total_posts > 0 else 0,
+                "neutral": round(total_neutral / total_posts, 3) if total_posts > 0 else 0
+            },
+            "total_analyzed": total_posts
+        }
+
+    async def sentiment_by_keyword(self, keywords: List[str], days: int,
+                                   db: AsyncSession) -> Dict[str, Dict[str, Any]]:
+        """一次查询读取多个关键词近 days 天的情绪分析"""
+        start_time = datetime.utcnow() - timedelta(days=days)
+        result = await db.execute(
+            select(*SENTIMENT_COLUMNS)
+            .where(and_(SentimentAnalysis.keyword.in_(keywords), SentimentAnalysis.date >= start_time))
+            .order_by(SentimentAnalysis.keyword, SentimentAnalysis.date.desc())
+        )
+        rows = {keyword: [] for keyword in keywords}
+        for data in result.all():
+            rows[data.keyword].append(data)
+        return {keyword: self.summarize_sentiment(keyword_rows) for keyword, keyword_rows in rows.items()}
+
     async def update_sentiment_analysis(self, keyword: str, db: AsyncSession) -> bool:
         """更新情绪分析数据"""
         try:
@@ -313,7 +738,8 @@ class DataAnalysisService:
                     and_(
                         HotPost.keyword == keyword,
                         HotPost.collected_at >= recent_date,
-                        HotPost.content.isnot(None)
+                        HotPost.content.isnot(None),
+                        HotPost.duplicate_of.is_(None)
                     )
                 )
                 .limit(100)
@@ -326,7 +752,8 @@ class DataAnalysisService:
                 return False
             
             # 分析情绪
-            sentiment_result = await self.analyze_sentiment(texts)
+            with ANALYSIS_SECONDS.time(task="sentiment", keyword=keyword):
+                sentiment_result = await self.analyze_sentiment(texts)
             
             # 保存到数据库
             sentiment_entry = SentimentAnalysis(
@@ -339,7 +766,11 @@ class DataAnalysisService:
             )
             
             db.add(sentiment_entry)
+            await stats_service.on_sentiment_added(
+                keyword, sentiment_entry.positive_score, sentiment_entry.date, db
+            )
             await db.commit()
+            await response_cache.invalidate(keyword)
             return True
             
         except Exception as e:
@@ -0,0 +1,208 @@
+from typing import Any, Dict, List, Optional
+import asyncio
+import json
+import os
+import re
+from datetime import datetime
+from sqlalchemy import select, and_, Boolean, DateTime, Float, Integer, JSON
+from core.database import read_engine, HotPost, KeywordTrend, SentimentAnalysis
+import logging
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    logging.warning("pyarrow not available, historical data will not be archived to Parquet")
+
+logger = logging.getLogger(__name__)
+
+# 归档目录，按 <表名>/date=<YYYY-MM-DD>/<批次>.parquet 分区存放
+ARCHIVE_DIR = os.getenv(
+    "ARCHIVE_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "archive")
+)
+
+# 清理前是否先归档，以及流式读取的每批行数
+ARCHIVE_ENABLED = os.getenv("ARCHIVE_ENABLED", "true").lower() in ("1", "true", "yes")
+ARCHIVE_CHUNK_SIZE = int(os.getenv("ARCHIVE_CHUNK_SIZE", "5000"))
+
+# 需要归档的表及其分区时间列
+ARCHIVE_TABLES = {
+    HotPost.__tablename__: (HotPost, HotPost.collected_at),
+    KeywordTrend.__tablename__: (KeywordTrend, KeywordTrend.date),
+    SentimentAnalysis.__tablename__: (SentimentAnalysis, SentimentAnalysis.date),
+}
+
+WATERMARK_FILE = "_watermark.json"
+FILE_NAME_PATTERN = re.compile(r"^[\w.-]+\.parquet$")
+
+def _arrow_type(column):
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    return pa.string()
+
+class ArchiveService:
+    """历史数据 Parquet 归档
+
+    清理任务删除过期行之前，按时间列顺序用服务端游标分批读出，按天写入各自的 Parquet 文件，
+    任一时刻只持有一批行和一个打开的文件。每张表记录已归档的时间上界（水位），
+    下次只导出水位之后的行，清理失败残留的行不会被重复归档。
+    """
+
+    def __init__(self, archive_dir: str = ARCHIVE_DIR, chunk_size: int = ARCHIVE_CHUNK_SIZE):
+        self.archive_dir = archive_dir
+        self.chunk_size = chunk_size
+
+    @property
+    def enabled(self) -> bool:
+        return ARCHIVE_ENABLED and PYARROW_AVAILABLE
+
+    def _table_dir(self, table_name: str) -> str:
+        return os.path.join(self.archive_dir, table_name)
+
+    def _read_watermark(self, table_name: str) -> Optional[datetime]:
+        path = os.path.join(self._table_dir(table_name), WATERMARK_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return datetime.fromisoformat(json.load(f)["exported_before"])
+
+    def _write_watermark(self, table_name: str, cutoff: datetime):
+        path = os.path.join(self._table_dir(table_name), WATERMARK_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"exported_before": cutoff.isoformat()}, f)
+        os.replace(tmp_path, path)
+
+    def _schema(self, table):
+        return pa.schema([(column.name, _arrow_type(column)) for column in table.__table__.columns])
+
+    def _to_record(self, row, columns) -> Dict[str, Any]:
+        record = dict(row._mapping)
+        for column in columns:
+            if isinstance(column.type, JSON) and record[column.name] is not None:
+                record[column.name] = json.dumps(record[column.name], ensure_ascii=False)
+        return record
+
+    async def export_table(self, table_name: str, cutoff: datetime) -> int:
+        """把水位到 cutoff 之间的行按天写入 Parquet，返回导出的行数"""
+        table, date_column = ARCHIVE_TABLES[table_name]
+        columns = list(table.__table__.columns)
+        schema = self._schema(table)
+        watermark = self._read_watermark(table_name)
+        if watermark and watermark >= cutoff:
+            return 0
+
+        criteria = [date_column < cutoff]
+        if watermark:
+            criteria.append(date_column >= watermark)
+        query = (
+            select(table.__table__)
+            .where(and_(*criteria))
+            .order_by(date_column, table.id)
+            .execution_options(yield_per=self.chunk_size)
+        )
+
+        batch_name = f"{cutoff:%Y%m%dT%H%M%S}.parquet"
+        written_paths = []
+        writer = None
+        current_day = None
+        exported = 0
+        try:
+            async with read_engine.connect() as conn:
+                result = await conn.stream(query)
+                async for partition in result.partitions(self.chunk_size):
+                    # 一批内按天切分，时间列有序，因此每天的行连续出现
+                    day_records: List[Dict[str, Any]] = []
+                    for row in partition:
+                        day = getattr(row, date_column.key).date()
+                        if day != current_day:
+                            if day_records:
+                                await asyncio.to_thread(writer.write_table, pa.Table.from_pylist(day_records, schema))
+                                day_records = []
+                            if writer:
+                                await asyncio.to_thread(writer.close)
+                            day_dir = os.path.join(self._table_dir(table_name), f"date={day.isoformat()}")
+                            os.makedirs(day_dir, exist_ok=True)
+                            written_paths.append(os.path.join(day_dir, batch_name))
+                            writer = pq.ParquetWriter(written_paths[-1], schema, compression="zstd")
+                            current_day = day
+                        day_records.append(self._to_record(row, columns))
+                    if day_records:
+                        await asyncio.to_thread(writer.write_table, pa.Table.from_pylist(day_records, schema))
+                    exported += len(partition)
+            if writer:
+                await asyncio.to_thread(writer.close)
+                writer = None
+        except Exception:
+            # 删除本次写出的文件，水位不变，下次整体重新导出
+            if writer:
+                writer.close()
+            for path in written_paths:
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+
+        os.makedirs(self._table_dir(table_name), exist_ok=True)
+        self._write_watermark(table_name, cutoff)
+        return exported
+
+    async def export_before(self, cutoff: datetime) -> Dict[str, Optional[int]]:
+        """归档所有表中早于 cutoff 的行；返回各表导出行数，失败的表为 None"""
+        exported = {}
+        for table_name in ARCHIVE_TABLES:
+            try:
+                exported[table_name] = await self.export_table(table_name, cutoff)
+                logger.info(f"归档 {table_name} 表: 导出 {exported[table_name]} 条记录")
+            except Exception as e:
+                exported[table_name] = None
+                logger.error(f"归档 {table_name} 表失败: {str(e)}")
+        return exported
+
+    def list_files(self, table_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """列出归档文件"""
+        files = []
+        for name in ([table_name] if table_name else ARCHIVE_TABLES):
+            table_dir = self._table_dir(name)
+            if not os.path.isdir(table_dir):
+                continue
+            for partition in sorted(os.listdir(table_dir)):
+                if not partition.startswith("date="):
+                    continue
+                for file_name in sorted(os.listdir(os.path.join(table_dir, partition))):
+                    if not FILE_NAME_PATTERN.match(file_name):
+                        continue
+                    stat = os.stat(os.path.join(table_dir, partition, file_name))
+                    files.append({
+                        "table": name,
+                        "date": partition[len("date="):],
+                        "file": file_name,
+                        "size_bytes": stat.st_size,
+                        "modified_at": datetime.utcfromtimestamp(stat.st_mtime).isoformat()
+                    })
+        return files
+
+    def resolve_file(self, table_name: str, day: str, file_name: str) -> str:
+        """校验参数并返回归档文件路径，不合法或不存在时抛出 ValueError"""
+        if table_name not in ARCHIVE_TABLES:
+            raise ValueError(f"不支持的归档表: {table_name}")
+        try:
+            datetime.strptime(day, "%Y-%m-%d")
+        except ValueError:
+            raise ValueError(f"日期格式应为 YYYY-MM-DD: {day}")
+        if not FILE_NAME_PATTERN.match(file_name):
+            raise ValueError(f"无效的文件名: {file_name}")
+        path = os.path.join(self._table_dir(table_name), f"date={day}", file_name)
+        if not os.path.isfile(path):
+            raise ValueError("归档文件不存在")
+        return path
+
+# 全局实例
+archive_service = ArchiveService()
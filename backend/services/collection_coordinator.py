@@ -0,0 +1,190 @@
+from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import datetime
+import asyncio
+import os
+import uuid
+from core.database import AsyncSessionLocal
+from services.scraper_service import scraper_service
+from services.analysis_service import analysis_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 同时执行的采集数：采集共用浏览器的同一个页面，默认串行
+COLLECTION_MAX_CONCURRENCY = int(os.getenv("COLLECTION_MAX_CONCURRENCY", "1"))
+
+# 排队等待的采集任务上限，超出后拒绝新请求（HTTP 429）
+COLLECTION_MAX_QUEUE = int(os.getenv("COLLECTION_MAX_QUEUE", "20"))
+
+# 单个关键词采集的预估耗时（秒），用于计算 Retry-After
+COLLECTION_SECONDS_PER_KEYWORD = int(os.getenv("COLLECTION_SECONDS_PER_KEYWORD", "60"))
+
+# 保留供查询的已结束任务数
+COLLECTION_HISTORY_SIZE = 200
+
+class CollectionBusyError(Exception):
+    """采集队列已满"""
+
+    def __init__(self, retry_after: int, queued: int):
+        super().__init__(f"采集任务队列已满（{queued} 个任务等待中），请 {retry_after} 秒后重试")
+        self.retry_after = retry_after
+        self.queued = queued
+
+class CollectionRun:
+    """一个关键词的一次采集"""
+
+    def __init__(self, keyword: str, analyze: bool):
+        self.id = uuid.uuid4().hex
+        self.keyword = keyword
+        self.analyze = analyze
+        self.status = "queued"
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.completed_at: Optional[datetime] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.requests = 1
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("success", "failed", "cancelled")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "keyword": self.keyword,
+            "status": self.status,
+            "requests": self.requests,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "result": self.result,
+            "error": self.error
+        }
+
+class CollectionCoordinator:
+    """采集任务协调（single-flight + 准入控制）
+
+    手动搜索、全量采集、实时监测和定时任务都经这里发起采集。同一关键词已有排队或执行中的采集时，
+    新请求合并到该任务上而不是再起一次；执行数受 COLLECTION_MAX_CONCURRENCY 限制，保证同一时间
+    只有限定数量的采集在操作浏览器页面；排队数超过 COLLECTION_MAX_QUEUE 时拒绝并给出重试等待时间。
+    调用方可以 await 任务完成，也可以凭任务 id 轮询状态。协调只在当前进程内生效。
+    """
+
+    def __init__(self, max_concurrency: int = COLLECTION_MAX_CONCURRENCY, max_queue: int = COLLECTION_MAX_QUEUE):
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_queue = max_queue
+        self.slots = asyncio.Semaphore(self.max_concurrency)
+        self.inflight: Dict[str, CollectionRun] = {}
+        self.runs: "OrderedDict[str, CollectionRun]" = OrderedDict()
+        self.coalesced = 0
+        self.rejected = 0
+
+    def queued_count(self) -> int:
+        return sum(1 for run in self.inflight.values() if run.status == "queued")
+
+    def retry_after(self) -> int:
+        """按当前积压估算的等待时间"""
+        backlog = len(self.inflight)
+        return max(COLLECTION_SECONDS_PER_KEYWORD, backlog * COLLECTION_SECONDS_PER_KEYWORD // self.max_concurrency)
+
+    def check_capacity(self, keywords: List[str]):
+        """队列放不下这些关键词的新任务时抛出 CollectionBusyError"""
+        new_keywords = {keyword for keyword in keywords if keyword and keyword not in self.inflight}
+        queued = self.queued_count()
+        if new_keywords and queued + len(new_keywords) > self.max_queue:
+            self.rejected += 1
+            raise CollectionBusyError(self.retry_after(), queued)
+
+    def submit(self, keywords: List[str], analyze: bool = True) -> List[CollectionRun]:
+        """为各关键词发起采集，已在进行中的关键词复用现有任务；队列放不下全部新任务时整体拒绝"""
+        keywords = [keyword for keyword in dict.fromkeys(keywords) if keyword]
+        self.check_capacity(keywords)
+
+        runs = []
+        for keyword in keywords:
+            run = self.inflight.get(keyword)
+            if run is not None:
+                run.requests += 1
+                run.analyze = run.analyze or analyze
+                self.coalesced += 1
+            else:
+                run = CollectionRun(keyword, analyze)
+                self.inflight[keyword] = run
+                self.runs[run.id] = run
+                run.task = asyncio.create_task(self._execute(run))
+            runs.append(run)
+        self._trim_history()
+        return runs
+
+    async def wait(self, runs: List[CollectionRun], timeout: Optional[float] = None) -> List[CollectionRun]:
+        """等待任务结束，超时后返回当时的状态（任务继续在后台执行）"""
+        tasks = [run.task for run in runs if run.task and not run.done]
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+        return runs
+
+    def release(self, runs: List[CollectionRun]):
+        """请求方不再需要这些任务（如后台任务被取消）：没有其他请求方的任务随之取消"""
+        for run in runs:
+            run.requests -= 1
+            if run.requests <= 0 and run.task and not run.done:
+                run.task.cancel()
+
+    def get(self, run_id: str) -> Optional[CollectionRun]:
+        return self.runs.get(run_id)
+
+    def list_runs(self, active_only: bool = False) -> List[CollectionRun]:
+        runs = list(self.inflight.values()) if active_only else list(self.runs.values())
+        return sorted(runs, key=lambda run: run.created_at, reverse=True)
+
+    @asynccontextmanager
+    async def slot(self):
+        """占用一个采集名额，供直接操作浏览器页面的调用方（单篇笔记分析、定时热帖采集）使用"""
+        async with self.slots:
+            yield
+
+    async def _execute(self, run: CollectionRun):
+        try:
+            async with self.slots:
+                run.status = "running"
+                run.started_at = datetime.utcnow()
+                async with AsyncSessionLocal() as db:
+                    run.result = await scraper_service.batch_collect_data([run.keyword], db)
+                    if run.analyze:
+                        await analysis_service.update_word_cloud_data(run.keyword, db)
+                        await analysis_service.update_sentiment_analysis(run.keyword, db)
+            run.status = "failed" if run.result.get("error_count") and not run.result.get("success_count") else "success"
+        except asyncio.CancelledError:
+            logger.info(f"采集关键词 {run.keyword} 已取消")
+            run.status = "cancelled"
+            raise
+        except Exception as e:
+            logger.error(f"采集关键词 {run.keyword} 失败: {str(e)}")
+            run.status = "failed"
+            run.error = str(e)
+        finally:
+            run.completed_at = datetime.utcnow()
+            if self.inflight.get(run.keyword) is run:
+                del self.inflight[run.keyword]
+
+    def _trim_history(self):
+        finished = [run_id for run_id, run in self.runs.items() if run.done]
+        for run_id in finished[:max(len(finished) - COLLECTION_HISTORY_SIZE, 0)]:
+            del self.runs[run_id]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "running": len(self.inflight) - self.queued_count(),
+            "queued": self.queued_count(),
+            "coalesced": self.coalesced,
+            "rejected": self.rejected
+        }
+
+# 全局实例
+collection_coordinator = CollectionCoordinator()
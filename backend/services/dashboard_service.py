@@ -0,0 +1,97 @@
+from typing import Any, Dict, List, Optional
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from core.database import read_session, UserConfig
+from services.analysis_service import analysis_service, TREND_GRANULARITIES
+from services.stats_service import stats_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 看板包含的面板
+DASHBOARD_PANELS = ("stats", "trends", "hot_posts", "word_cloud", "sentiment")
+
+class DashboardService:
+    """看板聚合查询
+
+    各面板在各自的只读会话上并发执行（每个会话独占一个连接池连接），每个面板对所有关键词只发一条查询：
+    统计读 keyword_stats 的多行，热帖用按关键词分区的窗口函数一次取各关键词前 N 条，
+    趋势、词云快照和情绪分析同样按关键词列表批量查询。单个面板失败不影响其他面板。
+    """
+
+    async def configured_keywords(self) -> List[str]:
+        async with read_session() as db:
+            result = await db.execute(select(UserConfig.keywords).where(UserConfig.user_id == "default"))
+            return list(result.scalar_one_or_none() or [])
+
+    async def _stats(self, keywords: List[str], **_) -> Dict[str, Any]:
+        async with read_session() as db:
+            return await stats_service.get_stats_many(keywords, db)
+
+    async def _trends(self, keywords: List[str], days: int, granularity: str, **_) -> Dict[str, Any]:
+        async with read_session() as db:
+            return await analysis_service.calculate_multi_trend_data(keywords, days, granularity, db)
+
+    async def _hot_posts(self, keywords: List[str], hot_limit: int, **_) -> Dict[str, Any]:
+        async with read_session() as db:
+            return await analysis_service.top_hot_posts_by_keyword(keywords, hot_limit, db)
+
+    async def _word_cloud(self, keywords: List[str], hours: int, **_) -> Dict[str, Any]:
+        since = datetime.utcnow() - timedelta(hours=hours)
+        async with read_session() as db:
+            snapshots = await analysis_service.latest_word_cloud_snapshots(db, since, keywords=keywords)
+        by_keyword = {snapshot.keyword: snapshot for snapshot in snapshots}
+        return {
+            "merged": analysis_service.merge_word_clouds(snapshots),
+            "keywords": {
+                keyword: analysis_service.merge_word_clouds([by_keyword[keyword]]) if keyword in by_keyword else []
+                for keyword in keywords
+            }
+        }
+
+    async def _sentiment(self, keywords: List[str], days: int, **_) -> Dict[str, Any]:
+        async with read_session() as db:
+            return await analysis_service.sentiment_by_keyword(keywords, min(days, 30), db)
+
+    async def build(
+        self,
+        keywords: List[str],
+        fields: Optional[List[str]] = None,
+        days: int = 7,
+        granularity: str = "day",
+        hot_limit: int = 10,
+        hours: int = 24
+    ) -> Dict[str, Any]:
+        """并发查询所选面板；未指定关键词时使用配置中的监测关键词"""
+        fields = list(dict.fromkeys(fields or DASHBOARD_PANELS))
+        unknown = [field for field in fields if field not in DASHBOARD_PANELS]
+        if unknown:
+            raise ValueError(f"不支持的看板字段: {', '.join(unknown)}，可选: {', '.join(DASHBOARD_PANELS)}")
+        if granularity not in TREND_GRANULARITIES:
+            raise ValueError(f"不支持的时间粒度: {granularity}")
+
+        keywords = list(dict.fromkeys(keywords)) if keywords else await self.configured_keywords()
+        data: Dict[str, Any] = {"keywords": keywords}
+        if not keywords:
+            return {**data, **{field: {} for field in fields}, "errors": {}}
+
+        params = {"keywords": keywords, "days": days, "granularity": granularity, "hot_limit": hot_limit, "hours": hours}
+        results = await asyncio.gather(
+            *(getattr(self, f"_{field}")(**params) for field in fields),
+            return_exceptions=True
+        )
+
+        errors = {}
+        for field, result in zip(fields, results):
+            if isinstance(result, Exception):
+                logger.error(f"看板面板 {field} 查询失败: {str(result)}")
+                errors[field] = str(result)
+                data[field] = None
+            else:
+                data[field] = result
+        data["errors"] = errors
+        return data
+
+# 全局实例
+dashboard_service = DashboardService()
@@ -0,0 +1,216 @@
+from typing import Dict, List, Optional, Set, Tuple
+import hashlib
+import jieba
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, and_, exists, func, event
+from sqlalchemy.orm import Session, aliased
+from core.database import HotPost
+import logging
+
+logger = logging.getLogger(__name__)
+
+class NearDuplicateService:
+    """基于 SimHash 的帖子近重复检测
+
+    标题和正文经 jieba 分词后取相邻词二元组作为 shingle，生成 64 位 SimHash 指纹。
+    指纹按 16 位切分为 4 个分段建立倒排表：汉明距离不超过 3 的两个指纹必然在至少
+    一个分段上完全相同，因此查找只需 4 次字典访问加少量候选比对。
+
+    倒排表按关键词分开，近重复只在同一关键词内判定，避免一个关键词的帖子把另一个关键词的声量
+    归入自己的簇。新帖子的指纹先挂在会话上，事务提交后才进入索引，回滚（包括任务取消）的帖子不会
+    成为后续帖子的代表。
+    """
+
+    FINGERPRINT_BITS = 64
+    BAND_COUNT = 4
+    BAND_BITS = FINGERPRINT_BITS // BAND_COUNT
+    BAND_MASK = (1 << BAND_BITS) - 1
+
+    # 会话 info 中待提交指纹的键
+    PENDING_KEY = "dedup_pending"
+
+    def __init__(self, max_distance: int = 3):
+        if max_distance >= self.BAND_COUNT:
+            raise ValueError("max_distance 必须小于分段数，否则分段索引会漏检")
+        self.max_distance = max_distance
+        self.fingerprints: Dict[int, int] = {}  # 帖子ID -> 指纹
+        self.bands: Dict[str, List[Dict[int, Set[int]]]] = {}  # 关键词 -> 各分段倒排表
+        self.loaded: Set[str] = set()
+
+        event.listen(Session, "after_commit", self._after_commit)
+        event.listen(Session, "after_transaction_end", self._after_transaction_end)
+
+    def _shingles(self, text: str) -> List[str]:
+        """分词后生成相邻词二元组"""
+        tokens = [token for token in jieba.lcut(text) if token.strip()]
+        if len(tokens) < 2:
+            return tokens
+        return [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def fingerprint(self, title: Optional[str], content: Optional[str]) -> Optional[int]:
+        """计算标题+正文的 SimHash 指纹，文本为空时返回 None"""
+        shingles = self._shingles(f"{title or ''} {content or ''}".strip())
+        if not shingles:
+            return None
+
+        hashes = np.array(
+            [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big") for s in shingles],
+            dtype=np.uint64
+        )
+        # 展开为 (shingle数, 64) 的比特矩阵，逐位投票
+        bits = np.unpackbits(hashes.byteswap().view(np.uint8).reshape(-1, 8), axis=1)
+        votes = (bits.astype(np.int32) * 2 - 1).sum(axis=0)
+        return int.from_bytes(np.packbits(votes > 0).tobytes(), "big")
+
+    def _band_keys(self, fingerprint: int):
+        for band in range(self.BAND_COUNT):
+            yield band, (fingerprint >> (band * self.BAND_BITS)) & self.BAND_MASK
+
+    def find_duplicate(self, fingerprint: Optional[int], keyword: str) -> Optional[int]:
+        """在同一关键词的已入库帖子中查找与指纹近重复的帖子ID"""
+        if fingerprint is None:
+            return None
+        bands = self.bands.get(keyword)
+        if bands is None:
+            return None
+        for band, key in self._band_keys(fingerprint):
+            for post_id in bands[band].get(key, ()):
+                if (self.fingerprints[post_id] ^ fingerprint).bit_count() <= self.max_distance:
+                    return post_id
+        return None
+
+    def add(self, post_id: int, fingerprint: Optional[int], keyword: str):
+        """将帖子指纹加入该关键词的索引"""
+        if fingerprint is None:
+            return
+        self.fingerprints[post_id] = fingerprint
+        bands = self.bands.setdefault(keyword, [{} for _ in range(self.BAND_COUNT)])
+        for band, key in self._band_keys(fingerprint):
+            bands[band].setdefault(key, set()).add(post_id)
+
+    def reset(self):
+        """清空索引，下次使用时从数据库重新加载"""
+        self.fingerprints.clear()
+        self.bands = {}
+        self.loaded = set()
+
+    def _after_commit(self, session: Session):
+        for post_id, fingerprint, keyword in session.info.pop(self.PENDING_KEY, ()):
+            if keyword in self.loaded:
+                self.add(post_id, fingerprint, keyword)
+
+    def _after_transaction_end(self, session: Session, transaction):
+        # 未提交就结束的事务（回滚、取消后关闭会话），丢弃其中新帖子的指纹
+        if transaction.parent is None:
+            session.info.pop(self.PENDING_KEY, None)
+
+    def _find_pending(self, fingerprint: Optional[int], keyword: str, db: AsyncSession) -> Optional[int]:
+        """在同一事务内尚未提交的新帖子中查找近重复"""
+        if fingerprint is None:
+            return None
+        for post_id, pending_fingerprint, pending_keyword in db.info.get(self.PENDING_KEY, ()):
+            if pending_keyword == keyword and (pending_fingerprint ^ fingerprint).bit_count() <= self.max_distance:
+                return post_id
+        return None
+
+    async def ensure_loaded(self, keyword: str, db: AsyncSession):
+        """首次使用某关键词时从数据库加载其代表帖子的指纹"""
+        if keyword in self.loaded:
+            return
+        result = await db.execute(
+            select(HotPost.id, HotPost.simhash)
+            .where(
+                and_(
+                    HotPost.keyword == keyword,
+                    HotPost.simhash.isnot(None),
+                    HotPost.duplicate_of.is_(None)
+                )
+            )
+        )
+        self.bands.setdefault(keyword, [{} for _ in range(self.BAND_COUNT)])
+        for post_id, simhash in result.fetchall():
+            self.add(post_id, int(simhash, 16), keyword)
+        self.loaded.add(keyword)
+        logger.info(f"关键词 {keyword} 的近重复索引已加载")
+
+    async def register_post(self, hot_post: HotPost, db: AsyncSession) -> Optional[int]:
+        """为新帖子计算指纹并加入会话，返回其所属重复簇的代表帖子ID（非重复时返回 None）"""
+        keyword = hot_post.keyword
+        await self.ensure_loaded(keyword, db)
+
+        fingerprint = self.fingerprint(hot_post.title, hot_post.content)
+        hot_post.simhash = f"{fingerprint:016x}" if fingerprint is not None else None
+
+        canonical_id = self.find_duplicate(fingerprint, keyword)
+        if canonical_id is None:
+            canonical_id = self._find_pending(fingerprint, keyword, db)
+        if canonical_id is not None:
+            hot_post.duplicate_of = canonical_id
+            db.add(hot_post)
+            await db.execute(
+                update(HotPost)
+                .where(HotPost.id == canonical_id)
+                .values(duplicate_count=HotPost.duplicate_count + 1)
+            )
+            return canonical_id
+
+        db.add(hot_post)
+        await db.flush()
+        if fingerprint is not None:
+            db.info.setdefault(self.PENDING_KEY, []).append((hot_post.id, fingerprint, keyword))
+        return None
+
+    async def repair_clusters(self, db: AsyncSession) -> int:
+        """修复代表帖子已被删除（或与自身关键词不同）的重复帖子，返回重新归簇的帖子数
+
+        每个失去代表的簇中最早的帖子提升为新代表，其余帖子改挂到它下面，并重算相关代表帖子的
+        duplicate_count。
+        """
+        canonical = aliased(HotPost)
+        result = await db.execute(
+            select(HotPost.id, HotPost.duplicate_of, HotPost.keyword)
+            .where(
+                HotPost.duplicate_of.isnot(None),
+                ~exists().where(
+                    canonical.id == HotPost.duplicate_of,
+                    canonical.keyword == HotPost.keyword
+                )
+            )
+            .order_by(HotPost.id)
+        )
+        clusters: Dict[Tuple[int, str], List[int]] = {}
+        for post_id, duplicate_of, keyword in result.all():
+            clusters.setdefault((duplicate_of, keyword), []).append(post_id)
+        if not clusters:
+            return 0
+
+        for (old_canonical_id, _), post_ids in clusters.items():
+            new_canonical_id, members = post_ids[0], post_ids[1:]
+            await db.execute(
+                update(HotPost)
+                .where(HotPost.id == new_canonical_id)
+                .values(duplicate_of=None, duplicate_count=len(members))
+            )
+            if members:
+                await db.execute(
+                    update(HotPost).where(HotPost.id.in_(members)).values(duplicate_of=new_canonical_id)
+                )
+
+        # 跨关键词簇的原代表仍存在时，重算其重复数
+        old_canonical_ids = {old_canonical_id for old_canonical_id, _ in clusters}
+        remaining = (
+            select(func.count(canonical.id))
+            .where(canonical.duplicate_of == HotPost.id)
+            .scalar_subquery()
+        )
+        await db.execute(
+            update(HotPost).where(HotPost.id.in_(old_canonical_ids)).values(duplicate_count=remaining)
+        )
+
+        repaired = sum(len(post_ids) for post_ids in clusters.values())
+        logger.info(f"近重复簇修复: {len(clusters)} 个簇提升了新代表，涉及 {repaired} 条帖子")
+        return repaired
+
+# 全局实例
+dedup_service = NearDuplicateService()
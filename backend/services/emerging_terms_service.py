@@ -0,0 +1,119 @@
+from typing import Any, Dict, List
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, case, and_
+from core.database import KeywordTermCount, upsert
+from services.analysis_service import analysis_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+class EmergingTermsService:
+    """新兴词检测
+
+    采集入库时按关键词、小时桶累加词频（keyword_term_counts 表）；检测时只读取
+    当前窗口和基线窗口内的小时桶，用 Dunning 对数似然比（G²）衡量词频在两个窗口
+    间的变化，成本只与窗口长度相关，与历史数据量无关。
+    """
+
+    @staticmethod
+    def current_bucket(at: datetime = None) -> datetime:
+        """返回所在小时桶的起始时间"""
+        at = at or datetime.utcnow()
+        return at.replace(minute=0, second=0, microsecond=0)
+
+    async def update_term_counts(self, keyword: str, texts: List[str], db: AsyncSession, at: datetime = None) -> int:
+        """将一批文本的词频累加到当前小时桶（调用方负责提交事务），返回涉及的词数
+
+        以 upsert 在数据库端累加，同一关键词的两次采集并发写入同一小时桶时不会撞唯一约束。
+        """
+        counts = analysis_service.count_terms(texts)
+        if not counts:
+            return 0
+
+        bucket = self.current_bucket(at)
+        statement = upsert(db, KeywordTermCount).values([
+            {"keyword": keyword, "bucket": bucket, "term": term, "count": count}
+            for term, count in counts.items()
+        ])
+        await db.execute(
+            statement.on_conflict_do_update(
+                index_elements=["keyword", "bucket", "term"],
+                set_={"count": KeywordTermCount.count + statement.excluded.count}
+            )
+        )
+        return len(counts)
+
+    async def detect_emerging_terms(
+        self,
+        keyword: str,
+        db: AsyncSession,
+        hours: int = 6,
+        baseline_hours: int = 72,
+        min_count: int = 3,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """对比当前窗口与基线窗口的词频，返回按对数似然比排序的上升词"""
+        current_start = self.current_bucket() - timedelta(hours=hours - 1)
+        baseline_start = current_start - timedelta(hours=baseline_hours)
+
+        in_current = KeywordTermCount.bucket >= current_start
+        result = await db.execute(
+            select(
+                KeywordTermCount.term,
+                func.sum(case((in_current, KeywordTermCount.count), else_=0)).label("current_count"),
+                func.sum(case((in_current, 0), else_=KeywordTermCount.count)).label("baseline_count")
+            )
+            .where(
+                and_(
+                    KeywordTermCount.keyword == keyword,
+                    KeywordTermCount.bucket >= baseline_start
+                )
+            )
+            .group_by(KeywordTermCount.term)
+        )
+        rows = result.fetchall()
+        if not rows:
+            return []
+
+        terms = [row.term for row in rows]
+        a = np.array([row.current_count or 0 for row in rows], dtype=np.float64)
+        b = np.array([row.baseline_count or 0 for row in rows], dtype=np.float64)
+        c1, c2 = a.sum(), b.sum()
+        if c1 == 0:
+            return []
+
+        # 期望频次与 G² = 2 * Σ O * ln(O / E)，约定 0 * ln(0) = 0
+        total = c1 + c2
+        e1 = c1 * (a + b) / total
+        e2 = c2 * (a + b) / total
+        with np.errstate(divide="ignore", invalid="ignore"):
+            g2 = 2 * (
+                np.where(a > 0, a * np.log(a / e1), 0.0) +
+                np.where(b > 0, b * np.log(b / e2), 0.0)
+            )
+
+        # 归一化频率之比（基线加一平滑），只保留相对基线上升的词
+        current_rate = a / c1
+        baseline_rate = (b + 1) / (c2 + len(terms))
+        growth = current_rate / baseline_rate
+        rising = (a >= min_count) & (current_rate > b / c2 if c2 > 0 else a > 0)
+
+        order = np.argsort(-np.where(rising, g2, -np.inf))
+        emerging = []
+        for i in order[:limit]:
+            if not rising[i]:
+                break
+            emerging.append({
+                "term": terms[i],
+                "score": round(float(g2[i]), 3),
+                "current_count": int(a[i]),
+                "baseline_count": int(b[i]),
+                "growth": round(float(growth[i]), 2),
+                "is_new": bool(b[i] == 0)
+            })
+        return emerging
+
+# 全局实例
+emerging_terms_service = EmergingTermsService()
@@ -0,0 +1,242 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from datetime import datetime
+import asyncio
+import uuid
+from sqlalchemy import select, update, tuple_
+from core.database import AsyncSessionLocal, Job, read_session
+from core.pagination import encode_cursor, decode_cursor
+from services.collection_coordinator import collection_coordinator
+from services.websocket_manager import manager
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 未结束的任务状态
+ACTIVE_JOB_STATUSES = ("queued", "running")
+
+class JobContext:
+    """传给任务处理函数：读取参数、上报进度"""
+
+    def __init__(self, service: "JobService", job_id: str, params: Dict[str, Any], reservation: Any = None):
+        self.service = service
+        self.job_id = job_id
+        self.params = params
+        self.reservation = reservation
+
+    async def progress(self, done: int, total: Optional[int] = None, message: Optional[str] = None):
+        await self.service._update(self.job_id, progress_done=done, progress_total=total, message=message)
+
+JobHandler = Callable[[JobContext], Awaitable[Any]]
+
+# 创建任务前同步预留资源，返回值作为 JobContext.reservation；释放函数在任务未能创建或被取消时调用
+JobReserve = Callable[[Dict[str, Any]], Any]
+JobRelease = Callable[[Any], None]
+
+class JobService:
+    """后台任务
+
+    每个任务在独立的 asyncio 任务中执行并使用自己的数据库会话，不依赖发起请求的会话。状态和进度写入
+    jobs 表，并以 job_updated 消息经 WebSocket 推送。取消即取消对应的 asyncio 任务（处理函数在 await 处
+    收到 CancelledError）；失败或取消的任务可以按原参数重试，生成新的任务记录。进程重启时仍未结束的任务
+    标记为失败。任务只在创建它的进程内执行。
+
+    注册时可以提供预留函数：创建任务时先同步预留所需资源（如采集队列名额），预留失败直接抛给调用方
+    （如返回 429），而不是先创建任务再在执行时失败。
+    """
+
+    def __init__(self):
+        self.handlers: Dict[str, JobHandler] = {}
+        self.reservers: Dict[str, Tuple[JobReserve, JobRelease]] = {}
+        self.tasks: Dict[str, asyncio.Task] = {}
+
+    def register(self, job_type: str, handler: JobHandler, reserve: Optional[JobReserve] = None,
+                 release: Optional[JobRelease] = None):
+        self.handlers[job_type] = handler
+        if reserve is not None:
+            self.reservers[job_type] = (reserve, release or (lambda _: None))
+
+    def _format(self, job: Job) -> Dict[str, Any]:
+        return {
+            "id": job.id,
+            "job_type": job.job_type,
+            "status": job.status,
+            "params": job.params,
+            "progress": {
+                "done": job.progress_done or 0,
+                "total": job.progress_total,
+                "percent": round((job.progress_done or 0) / job.progress_total * 100, 1)
+                if job.progress_total else None
+            },
+            "message": job.message,
+            "result": job.result,
+            "error": job.error,
+            "attempt": job.attempt,
+            "retry_of": job.retry_of,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "completed_at": job.completed_at.isoformat() if job.completed_at else None
+        }
+
+    async def create(self, job_type: str, params: Dict[str, Any], attempt: int = 1,
+                     retry_of: Optional[str] = None) -> Dict[str, Any]:
+        """预留资源、创建任务并立即在后台开始执行；预留失败时抛出预留函数的异常，不创建任务"""
+        if job_type not in self.handlers:
+            raise ValueError(f"不支持的任务类型: {job_type}")
+        reserve, release = self.reservers.get(job_type, (None, None))
+        reservation = reserve(params) if reserve else None
+
+        job = Job(
+            id=uuid.uuid4().hex,
+            job_type=job_type,
+            status="queued",
+            params=params,
+            progress_done=0,
+            attempt=attempt,
+            retry_of=retry_of,
+            created_at=datetime.utcnow()
+        )
+        try:
+            async with AsyncSessionLocal() as db:
+                db.add(job)
+                await db.commit()
+        except BaseException:
+            if release:
+                release(reservation)
+            raise
+
+        task = asyncio.create_task(self._run(job.id, job_type, params, reservation))
+        self.tasks[job.id] = task
+        task.add_done_callback(lambda _: self.tasks.pop(job.id, None))
+        if release:
+            # 包括尚未开始执行就被取消的情况
+            task.add_done_callback(lambda done: release(reservation) if done.cancelled() else None)
+        return self._format(job)
+
+    async def _run(self, job_id: str, job_type: str, params: Dict[str, Any], reservation: Any = None):
+        try:
+            await self._update(job_id, status="running", started_at=datetime.utcnow())
+            result = await self.handlers[job_type](JobContext(self, job_id, params, reservation))
+            await self._update(job_id, status="success", result=result, completed_at=datetime.utcnow())
+        except asyncio.CancelledError:
+            # shield 保护状态写入，避免再次取消时中断
+            await asyncio.shield(self._update(job_id, status="cancelled", message="任务已取消",
+                                              completed_at=datetime.utcnow()))
+            raise
+        except Exception as e:
+            logger.error(f"后台任务 {job_id}（{job_type}）失败: {str(e)}")
+            await self._update(job_id, status="failed", error=str(e), completed_at=datetime.utcnow())
+
+    async def _update(self, job_id: str, **fields) -> Optional[Dict[str, Any]]:
+        """写入任务状态并推送给客户端"""
+        try:
+            async with AsyncSessionLocal() as db:
+                job = await db.get(Job, job_id)
+                if job is None:
+                    return None
+                for name, value in fields.items():
+                    setattr(job, name, value)
+                await db.commit()
+                data = self._format(job)
+        except Exception as e:
+            logger.error(f"更新后台任务 {job_id} 状态失败: {str(e)}")
+            return None
+
+        await manager.broadcast({"type": "job_updated", "data": data})
+        return data
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """读取单个任务；客户端在创建、取消后会立即轮询，读主库避免副本延迟返回旧状态"""
+        async with AsyncSessionLocal() as db:
+            job = await db.get(Job, job_id)
+            return self._format(job) if job else None
+
+    async def list_jobs(self, status: Optional[str] = None, job_type: Optional[str] = None, limit: int = 20,
+                        cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """按 (created_at, id) 倒序做游标分页（列表允许略有延迟，读只读副本）"""
+        query = select(Job).order_by(Job.created_at.desc(), Job.id.desc()).limit(limit + 1)
+        if status:
+            query = query.where(Job.status == status)
+        if job_type:
+            query = query.where(Job.job_type == job_type)
+        if cursor:
+            position = decode_cursor(cursor)
+            query = query.where(
+                tuple_(Job.created_at, Job.id) < tuple_(datetime.fromisoformat(position["created_at"]), position["id"])
+            )
+
+        async with read_session() as db:
+            jobs = (await db.execute(query)).scalars().all()
+        has_more = len(jobs) > limit
+        jobs = jobs[:limit]
+        next_cursor = encode_cursor({"created_at": jobs[-1].created_at.isoformat(), "id": jobs[-1].id}) \
+            if has_more else None
+        return [self._format(job) for job in jobs], next_cursor
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """等待任务结束（超时后返回当时的状态）"""
+        task = self.tasks.get(job_id)
+        if task is not None:
+            await asyncio.wait([task], timeout=timeout)
+        return await self.get(job_id)
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """取消任务；已结束的任务原样返回"""
+        task = self.tasks.get(job_id)
+        if task is not None:
+            task.cancel()
+            await asyncio.wait([task])
+
+        job = await self.get(job_id)
+        if job and job["status"] in ACTIVE_JOB_STATUSES:
+            # 尚未开始执行就被取消，或不在本进程执行（如进程重启前遗留的任务），直接标记
+            return await self._update(job_id, status="cancelled", message="任务已取消", completed_at=datetime.utcnow())
+        return job
+
+    async def retry(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """按原参数重新执行失败或已取消的任务，任务不存在时返回 None"""
+        job = await self.get(job_id)
+        if job is None:
+            return None
+        if job["status"] not in ("failed", "cancelled"):
+            raise ValueError(f"任务状态为 {job['status']}，只有失败或已取消的任务可以重试")
+        return await self.create(job["job_type"], job["params"], attempt=(job["attempt"] or 1) + 1, retry_of=job_id)
+
+    def is_active(self, job_id: Optional[str]) -> bool:
+        return job_id is not None and job_id in self.tasks
+
+    async def recover(self):
+        """启动时把上次进程遗留的未结束任务标记为失败，可通过重试重新执行"""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(Job)
+                .where(Job.status.in_(ACTIVE_JOB_STATUSES))
+                .values(status="failed", error="服务重启，任务中断", completed_at=datetime.utcnow())
+            )
+            await db.commit()
+        if result.rowcount:
+            logger.warning(f"{result.rowcount} 个后台任务因服务重启中断，已标记为失败")
+
+def reserve_collect(params: Dict[str, Any]):
+    """创建采集任务前向采集协调器提交各关键词，队列已满时抛出 CollectionBusyError"""
+    return collection_coordinator.submit(params["keywords"], params.get("analyze", True))
+
+async def collect_job(ctx: JobContext) -> Dict[str, Any]:
+    """采集任务：等待创建时提交的各关键词采集，每完成一个关键词上报一次进度（取消时由 JobService 释放）"""
+    runs = ctx.reservation
+    pending = {run.task: run for run in runs}
+    results = {}
+    await ctx.progress(0, len(runs), f"等待采集 {len(runs)} 个关键词")
+    while pending:
+        finished, _ = await asyncio.wait(pending.keys(), return_when=asyncio.FIRST_COMPLETED)
+        for task in finished:
+            run = pending.pop(task)
+            results[run.keyword] = run.to_dict()
+        await ctx.progress(len(runs) - len(pending), len(runs), f"已完成 {len(runs) - len(pending)}/{len(runs)} 个关键词")
+
+    if results and all(run["status"] != "success" for run in results.values()):
+        raise RuntimeError(f"全部关键词采集失败: {', '.join(results)}")
+    return results
+
+# 全局实例
+job_service = JobService()
+job_service.register("collect", collect_job, reserve_collect, collection_coordinator.release)
@@ -0,0 +1,137 @@
+from typing import Dict
+import asyncio
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete
+from core.database import (
+    engine, AsyncSessionLocal, KeywordTrend, HotPost, WordCloudSnapshot,
+    SentimentAnalysis, ScrapingLog, KeywordTermCount, KeywordTrendRollup
+)
+from core.partitioning import maintain_partitions
+from services.rollup_service import rollup_service, ROLLUP_DAILY_RETENTION_DAYS
+from services.archive_service import archive_service
+from services.dedup_service import dedup_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 分批删除的每批行数，以及批次之间让出的时间（秒）
+RETENTION_CHUNK_SIZE = int(os.getenv("RETENTION_CHUNK_SIZE", "1000"))
+RETENTION_CHUNK_PAUSE = float(os.getenv("RETENTION_CHUNK_PAUSE", "0.05"))
+
+# 需要清理的表及其时间列
+RETENTION_TABLES = [
+    (KeywordTrend, KeywordTrend.date),
+    (HotPost, HotPost.collected_at),
+    (WordCloudSnapshot, WordCloudSnapshot.date),
+    (SentimentAnalysis, SentimentAnalysis.date),
+    (ScrapingLog, ScrapingLog.started_at),
+    (KeywordTermCount, KeywordTermCount.bucket),
+]
+
+class RetentionService:
+    """过期数据清理
+
+    原始声量先压实到日/周汇总，热帖、声量和情绪分析先导出到 Parquet 归档；PostgreSQL 分区表整块分离并删除
+    过期分区；剩余的过期行（默认分区、非分区表、SQLite）按主键分批删除，每批单独提交并让出事件循环，
+    避免长事务锁表和阻塞写入。删除热帖后为失去代表帖子的近重复簇提升新代表。
+    """
+
+    def __init__(self, chunk_size: int = RETENTION_CHUNK_SIZE, chunk_pause: float = RETENTION_CHUNK_PAUSE):
+        self.chunk_size = chunk_size
+        self.chunk_pause = chunk_pause
+
+    async def maintain_partitions(self, cutoff: datetime = None) -> Dict:
+        """预建未来分区，给定 cutoff 时同时删除过期分区（非 PostgreSQL 时为空操作）"""
+        if engine.dialect.name != "postgresql":
+            return {}
+        async with engine.begin() as conn:
+            return await conn.run_sync(maintain_partitions, cutoff)
+
+    async def delete_in_chunks(self, table, date_column, cutoff: datetime, *criteria) -> int:
+        """按主键分批删除早于 cutoff（且满足附加条件）的行，返回删除总数"""
+        total_deleted = 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    delete(table).where(
+                        table.id.in_(
+                            select(table.id).where(date_column < cutoff, *criteria).limit(self.chunk_size)
+                        )
+                    )
+                )
+                await db.commit()
+
+            deleted_count = result.rowcount or 0
+            total_deleted += deleted_count
+            if deleted_count < self.chunk_size:
+                return total_deleted
+
+            # 批次之间让出，给采集写入和 API 读取留出窗口
+            await asyncio.sleep(self.chunk_pause)
+
+    async def apply_retention(self, retention_days: int) -> Dict[str, int]:
+        """清理超过保留天数的数据，返回各表删除的行数"""
+        cutoff_date = datetime.utcnow() - timedelta(days=retention_days)
+
+        # 删除原始声量数据前先压实到日/周汇总，失败时本次不删除任何过期分区和原始声量
+        compacted = False
+        try:
+            async with AsyncSessionLocal() as db:
+                days = await rollup_service.compact(cutoff_date, db)
+                await db.commit()
+            compacted = True
+            logger.info(f"已将 {days} 个关键词日的原始声量压实到汇总表")
+        except Exception as e:
+            logger.error(f"压实声量汇总失败，本次跳过原始声量清理: {str(e)}")
+
+        # 删除前先归档到 Parquet，归档失败的表本次不删除
+        archive_failed = set()
+        if archive_service.enabled:
+            exported = await archive_service.export_before(cutoff_date)
+            archive_failed = {table_name for table_name, count in exported.items() if count is None}
+
+        # 分区整块删除对所有分区表生效，需压实和归档都成功
+        drop_partitions = compacted and not archive_failed
+        try:
+            partitions = await self.maintain_partitions(cutoff_date if drop_partitions else None)
+            for table_name, summary in partitions.items():
+                logger.info(f"分区维护 {table_name}: 新建 {summary['created']} 个, 删除 {summary['dropped']} 个")
+        except Exception as e:
+            logger.error(f"分区维护失败: {str(e)}")
+
+        deleted = {}
+        for table, date_column in RETENTION_TABLES:
+            if table is KeywordTrend and not compacted:
+                continue
+            if table.__tablename__ in archive_failed:
+                logger.warning(f"{table.__tablename__} 表归档失败，本次跳过清理")
+                continue
+            try:
+                deleted[table.__tablename__] = await self.delete_in_chunks(table, date_column, cutoff_date)
+                logger.info(f"清理 {table.__tablename__} 表: 删除 {deleted[table.__tablename__]} 条记录")
+            except Exception as e:
+                logger.error(f"清理 {table.__tablename__} 表失败: {str(e)}")
+
+        # 被删除的代表帖子（含整块删除的分区）留下的重复帖子重新归簇，否则会一直被隐藏
+        try:
+            async with AsyncSessionLocal() as db:
+                await dedup_service.repair_clusters(db)
+                await db.commit()
+        except Exception as e:
+            logger.error(f"修复近重复簇失败: {str(e)}")
+
+        # 日汇总按自身保留期清理，周汇总永久保留
+        try:
+            deleted[KeywordTrendRollup.__tablename__] = await self.delete_in_chunks(
+                KeywordTrendRollup,
+                KeywordTrendRollup.bucket,
+                datetime.utcnow() - timedelta(days=ROLLUP_DAILY_RETENTION_DAYS),
+                KeywordTrendRollup.granularity == "day"
+            )
+        except Exception as e:
+            logger.error(f"清理日汇总失败: {str(e)}")
+        return deleted
+
+# 全局实例
+retention_service = RetentionService()
@@ -0,0 +1,107 @@
+from typing import Dict, Iterable, Tuple
+import os
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, and_
+from core.database import KeywordTrend, KeywordTrendRollup, upsert
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 汇总层级；原始数据（按采集时间，最细到小时）由用户配置的 data_retention_days 控制保留期
+ROLLUP_GRANULARITIES = ("day", "week")
+
+# 日汇总保留天数，周汇总永久保留
+ROLLUP_DAILY_RETENTION_DAYS = int(os.getenv("ROLLUP_DAILY_RETENTION_DAYS", "365"))
+
+# 每条 upsert 语句写入的汇总行数，避免超出 SQLite 的参数个数上限
+ROLLUP_UPSERT_BATCH_SIZE = 500
+
+def bucket_start(at: datetime, granularity: str) -> datetime:
+    """返回时间所在日/周（周一）的起始时间"""
+    day = at.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+class TrendRollupService:
+    """关键词声量分层汇总
+
+    写入 KeywordTrend 时同步累加日/周汇总；清理原始数据前先用原始数据校正即将删除
+    那几天的汇总（取二者较大值，兼容汇总表上线前的历史数据），再由日汇总重算所在周。
+    两种写入都以 upsert 在数据库端完成，并发写入同一汇总行时不会丢失累加或撞唯一约束。
+    """
+
+    async def record(self, keyword: str, at: datetime, count: int, db: AsyncSession):
+        """累加一次声量到日/周汇总（调用方负责提交事务）"""
+        for granularity in ROLLUP_GRANULARITIES:
+            await self._merge(db, granularity, {(keyword, bucket_start(at, granularity)): count}, additive=True)
+
+    async def _merge(self, db: AsyncSession, granularity: str, values: Dict[Tuple[str, datetime], int], additive: bool):
+        """写入汇总值：additive 时累加，否则取已有值与新值的较大者"""
+        rows = [
+            {"granularity": granularity, "keyword": keyword, "bucket": bucket, "count": count, "updated_at": datetime.utcnow()}
+            for (keyword, bucket), count in values.items()
+        ]
+        for start in range(0, len(rows), ROLLUP_UPSERT_BATCH_SIZE):
+            statement = upsert(db, KeywordTrendRollup).values(rows[start:start + ROLLUP_UPSERT_BATCH_SIZE])
+            if additive:
+                count = KeywordTrendRollup.count + statement.excluded.count
+            elif db.bind.dialect.name == "postgresql":
+                count = func.greatest(KeywordTrendRollup.count, statement.excluded.count)
+            else:
+                # SQLite 的多参数 max() 是标量函数
+                count = func.max(KeywordTrendRollup.count, statement.excluded.count)
+            await db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["granularity", "keyword", "bucket"],
+                    set_={"count": count, "updated_at": statement.excluded.updated_at}
+                )
+            )
+
+    async def compact(self, cutoff: datetime, db: AsyncSession) -> int:
+        """在删除 cutoff 之前的原始数据前，把它们压实到日/周汇总，返回涉及的日汇总数"""
+        # 流式读取，内存只与关键词数×天数相关
+        result = await db.stream(
+            select(KeywordTrend.keyword, KeywordTrend.date, KeywordTrend.count)
+            .where(KeywordTrend.date < cutoff)
+        )
+        daily: Dict[Tuple[str, datetime], int] = {}
+        async for keyword, at, count in result:
+            key = (keyword, bucket_start(at, "day"))
+            daily[key] = daily.get(key, 0) + (count or 0)
+
+        if not daily:
+            return 0
+        await self._merge(db, "day", daily, additive=False)
+
+        # 由日汇总重算受影响的周
+        weeks = {(keyword, bucket_start(day, "week")) for keyword, day in daily}
+        await self._merge(db, "week", await self._sum_days_by_week(db, weeks), additive=False)
+        return len(daily)
+
+    async def _sum_days_by_week(self, db: AsyncSession, weeks: Iterable[Tuple[str, datetime]]) -> Dict[Tuple[str, datetime], int]:
+        weeks = set(weeks)
+        keywords = {keyword for keyword, _ in weeks}
+        first = min(week for _, week in weeks)
+        last = max(week for _, week in weeks) + timedelta(days=7)
+        result = await db.execute(
+            select(KeywordTrendRollup.keyword, KeywordTrendRollup.bucket, KeywordTrendRollup.count)
+            .where(
+                and_(
+                    KeywordTrendRollup.granularity == "day",
+                    KeywordTrendRollup.keyword.in_(keywords),
+                    KeywordTrendRollup.bucket >= first,
+                    KeywordTrendRollup.bucket < last
+                )
+            )
+        )
+        totals: Dict[Tuple[str, datetime], int] = {}
+        for keyword, day, count in result:
+            key = (keyword, bucket_start(day, "week"))
+            if key in weeks:
+                totals[key] = totals.get(key, 0) + (count or 0)
+        return totals
+
+# 全局实例
+rollup_service = TrendRollupService()
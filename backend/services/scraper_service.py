@@ -2,12 +2,21 @@ from typing import Any, List, Dict, Optional
 import asyncio
 import json
 import os
+import time
 import pandas as pd
 from datetime import datetime
 from playwright.async_api import async_playwright
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from core.database import HotPost, KeywordTrend, ScrapingLog
+from core.cache import response_cache
+from core.metrics import SCRAPER_STAGE_SECONDS, SCRAPER_NOTES, SCRAPER_KEYWORDS
+from services.dedup_service import dedup_service
+from services.spike_service import spike_service
+from services.rollup_service import rollup_service
+from services.stats_service import stats_service
+from services.search_service import search_service
+from services.emerging_terms_service import emerging_terms_service
 import logging
 
 logger = logging.getLogger(__name__)
@@ -122,9 +131,11 @@ class XiaohongshuScraperService:
             
         search_url = f"https://www.xiaohongshu.com/search_result?keyword={keywords}"
         try:
-            await self.main_page.goto(search_url, timeout=60000)
-            await asyncio.sleep(5)
+            with SCRAPER_STAGE_SECONDS.time(stage="search_navigate"):
+                await self.main_page.goto(search_url, timeout=60000)
+                await asyncio.sleep(5)
             
+            extract_started = time.perf_counter()
             post_cards = await self.main_page.query_selector_all('section.note-item')
             
             if not post_cards:
@@ -163,6 +174,7 @@ class XiaohongshuScraperService:
                     logger.error(f"处理帖子卡片时出错: {str(e)}")
                     continue
             
+            SCRAPER_STAGE_SECONDS.observe(time.perf_counter() - extract_started, stage="search_extract")
             return posts
             
         except Exception as e:
@@ -180,9 +192,11 @@ class XiaohongshuScraperService:
             
         try:
             processed_url = self.process_url(url)
-            await self.main_page.goto(processed_url, timeout=60000)
-            await asyncio.sleep(10)
+            with SCRAPER_STAGE_SECONDS.time(stage="note_navigate"):
+                await self.main_page.goto(processed_url, timeout=60000)
+                await asyncio.sleep(10)
             
+            extract_started = time.perf_counter()
             # 检查是否加载了错误页面
             error_page = await self.main_page.evaluate('''
                 () => {
@@ -239,6 +253,7 @@ class XiaohongshuScraperService:
             post_content["likes_count"] = await self._extract_interaction_count("点赞")
             post_content["comments_count"] = await self._extract_interaction_count("评论")
             
+            SCRAPER_STAGE_SECONDS.observe(time.perf_counter() - extract_started, stage="note_extract")
             return post_content
             
         except Exception as e:
@@ -308,6 +323,8 @@ class XiaohongshuScraperService:
                 db.add(trend)
                 
                 # 处理每个帖子
+                duplicate_posts = 0
+                new_texts = []
                 for post_data in posts:
                     try:
                         # 获取详细内容
@@ -338,14 +355,31 @@ class XiaohongshuScraperService:
                             select(HotPost).where(HotPost.post_id == hot_post.post_id)
                         )
                         if not existing.scalar_one_or_none():
-                            db.add(hot_post)
+                            # 近重复帖子归入已有簇，不单独计入声量
+                            if await dedup_service.register_post(hot_post, db) is not None:
+                                duplicate_posts += 1
+                                SCRAPER_NOTES.inc(result="skipped", reason="duplicate")
+                            else:
+                                new_texts.extend([hot_post.title, hot_post.content])
+                                SCRAPER_NOTES.inc(result="fetched")
+                            await stats_service.on_post_added(
+                                keyword, hot_post.likes_count, hot_post.comments_count, db
+                            )
+                            await search_service.index_post(hot_post, db)
+                        else:
+                            SCRAPER_NOTES.inc(result="skipped", reason="existing")
                         
                         results["total_posts"] += 1
                         
                     except Exception as e:
                         logger.error(f"处理帖子时出错: {str(e)}")
                         results["error_count"] += 1
+                        SCRAPER_NOTES.inc(result="skipped", reason="error")
                 
+                trend.count = len(posts) - duplicate_posts
+                spike = await spike_service.observe(keyword, trend.count, db, trend.date)
+                await rollup_service.record(keyword, trend.date, trend.count, db)
+                await emerging_terms_service.update_term_counts(keyword, new_texts, db)
                 results["success_count"] += 1
                 results["keywords_processed"].append(keyword)
                 
@@ -356,10 +390,16 @@ class XiaohongshuScraperService:
                 log.message = f"成功采集 {len(posts)} 条数据"
                 
                 await db.commit()
+                await response_cache.invalidate(keyword)
+                SCRAPER_KEYWORDS.inc(status="success")
+                
+                if spike:
+                    await spike_service.notify(spike)
                 
             except Exception as e:
                 logger.error(f"采集关键词 {keyword} 时出错: {str(e)}")
                 results["error_count"] += 1
+                SCRAPER_KEYWORDS.inc(status="failed")
                 
                 # 更新日志
                 if 'log' in locals():
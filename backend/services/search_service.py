@@ -0,0 +1,159 @@
+from typing import Any, Dict, List, Optional
+import html
+import re
+from datetime import datetime
+import jieba
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, text, bindparam, DateTime
+from core.database import HotPost
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 分词后丢弃的符号
+TOKEN_PATTERN = re.compile(r"\w", re.UNICODE)
+
+class PostSearchService:
+    """热帖全文检索
+
+    标题和正文用 jieba 搜索引擎模式预分词，以空格拼接后写入全文索引：SQLite 使用
+    FTS5 虚拟表 hot_posts_fts（rowid 即热帖ID，BM25 排序），PostgreSQL 使用
+    hot_post_search 表的 tsvector 列（simple 配置 + GIN 索引，ts_rank 排序）。
+    高亮和摘要在原文上按查询词生成，与数据库无关。
+    """
+
+    def tokenize(self, text_value: Optional[str], for_query: bool = False) -> List[str]:
+        """分词并过滤纯符号；索引使用搜索引擎模式以便子词也能命中"""
+        if not text_value:
+            return []
+        cut = jieba.lcut(text_value) if for_query else jieba.lcut_for_search(text_value)
+        return [token.lower() for token in (t.strip() for t in cut) if token and TOKEN_PATTERN.search(token)]
+
+    async def index_post(self, hot_post: HotPost, db: AsyncSession):
+        """写入或更新一条热帖的全文索引（调用方负责提交事务）"""
+        if hot_post.id is None:
+            await db.flush()
+        params = {
+            "id": hot_post.id,
+            "title": " ".join(self.tokenize(hot_post.title)),
+            "content": " ".join(self.tokenize(hot_post.content))
+        }
+        if db.bind.dialect.name == "postgresql":
+            await db.execute(text(
+                "INSERT INTO hot_post_search (post_id, search_vector) VALUES (:id, "
+                "setweight(to_tsvector('simple', :title), 'A') || setweight(to_tsvector('simple', :content), 'B')) "
+                "ON CONFLICT (post_id) DO UPDATE SET search_vector = EXCLUDED.search_vector"
+            ), params)
+        else:
+            await db.execute(text(
+                "INSERT OR REPLACE INTO hot_posts_fts (rowid, title, content) VALUES (:id, :title, :content)"
+            ), params)
+
+    async def backfill(self, db: AsyncSession, batch_size: int = 500) -> int:
+        """为尚未建立索引的热帖补建索引，返回补建条数"""
+        if db.bind.dialect.name == "postgresql":
+            missing_sql = "SELECT h.id FROM hot_posts h LEFT JOIN hot_post_search s ON s.post_id = h.id WHERE s.post_id IS NULL"
+        else:
+            missing_sql = "SELECT h.id FROM hot_posts h WHERE h.id NOT IN (SELECT rowid FROM hot_posts_fts)"
+
+        total = 0
+        while True:
+            result = await db.execute(text(f"{missing_sql} ORDER BY h.id LIMIT :limit"), {"limit": batch_size})
+            post_ids = result.scalars().all()
+            if not post_ids:
+                return total
+            posts = await db.execute(select(HotPost).where(HotPost.id.in_(post_ids)))
+            for post in posts.scalars().all():
+                await self.index_post(post, db)
+            await db.commit()
+            total += len(post_ids)
+
+    def _highlight(self, value: Optional[str], pattern: re.Pattern) -> str:
+        return pattern.sub(r"<mark>\g<0></mark>", html.escape(value or ""))
+
+    def _snippet(self, value: Optional[str], raw_pattern: re.Pattern, pattern: re.Pattern, width: int = 80) -> str:
+        """截取第一个命中位置附近的一段正文并高亮"""
+        value = value or ""
+        match = raw_pattern.search(value)
+        start = max(0, match.start() - width // 2) if match else 0
+        snippet = value[start:start + width]
+        return ("…" if start > 0 else "") + self._highlight(snippet, pattern) + ("…" if start + width < len(value) else "")
+
+    async def search(
+        self,
+        query: str,
+        db: AsyncSession,
+        keyword: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """全文检索热帖，按相关度排序"""
+        tokens = self.tokenize(query, for_query=True)
+        if not tokens:
+            return []
+
+        filters = []
+        params: Dict[str, Any] = {"limit": limit, "offset": offset}
+        if keyword:
+            filters.append("h.keyword = :keyword")
+            params["keyword"] = keyword
+        if start_time:
+            filters.append("h.collected_at >= :start_time")
+            params["start_time"] = start_time
+        if end_time:
+            filters.append("h.collected_at <= :end_time")
+            params["end_time"] = end_time
+        extra = "".join(f" AND {condition}" for condition in filters)
+
+        columns = "h.id, h.title, h.content, h.author, h.url, h.keyword, h.hot_score, h.collected_at"
+        if db.bind.dialect.name == "postgresql":
+            params["query"] = " ".join(tokens)
+            sql = (
+                f"SELECT {columns}, ts_rank(s.search_vector, q) AS score "
+                f"FROM hot_post_search s JOIN hot_posts h ON h.id = s.post_id, plainto_tsquery('simple', :query) q "
+                f"WHERE s.search_vector @@ q{extra} "
+                f"ORDER BY score DESC LIMIT :limit OFFSET :offset"
+            )
+        else:
+            # FTS5 查询：每个词加引号，空格连接即为 AND
+            params["query"] = " ".join('"' + token.replace('"', '""') + '"' for token in tokens)
+            sql = (
+                f"SELECT {columns}, -bm25(hot_posts_fts, 2.0, 1.0) AS score "
+                f"FROM hot_posts_fts JOIN hot_posts h ON h.id = hot_posts_fts.rowid "
+                f"WHERE hot_posts_fts MATCH :query{extra} "
+                f"ORDER BY score DESC LIMIT :limit OFFSET :offset"
+            )
+
+        statement = text(sql).bindparams(
+            *[bindparam(name, type_=DateTime) for name in ("start_time", "end_time") if name in params]
+        )
+        result = await db.execute(statement, params)
+
+        # 长词优先匹配；高亮作用于转义后的文本，定位摘要时用原文
+        terms = sorted(set(tokens), key=len, reverse=True)
+        pattern = re.compile("|".join(re.escape(html.escape(term)) for term in terms), re.IGNORECASE)
+        raw_pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE)
+
+        posts = []
+        for row in result.fetchall():
+            collected_at = row.collected_at
+            if isinstance(collected_at, str):
+                collected_at = datetime.fromisoformat(collected_at)
+            posts.append({
+                "id": row.id,
+                "title": row.title,
+                "title_highlight": self._highlight(row.title, pattern),
+                "snippet": self._snippet(row.content, raw_pattern, pattern),
+                "author": row.author,
+                "url": row.url,
+                "keyword": row.keyword,
+                "hot_score": round(row.hot_score or 0, 2),
+                "score": round(float(row.score or 0), 4),
+                "collected_at": collected_at.isoformat() if collected_at else None
+            })
+        return posts
+
+# 全局实例
+search_service = PostSearchService()
@@ -0,0 +1,89 @@
+from typing import Dict, Optional
+from datetime import datetime
+import asyncio
+import os
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.database import AsyncSessionLocal, SentimentAnalysis
+from core.cache import response_cache
+from services.analysis_service import analysis_service, SENTIMENT_COLUMNS
+from services.websocket_manager import manager
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 最近一次情绪分析超过该时长（小时）即视为过期，默认与定时分析任务的周期一致
+SENTIMENT_MAX_AGE_HOURS = float(os.getenv("SENTIMENT_MAX_AGE_HOURS", "6"))
+
+class SentimentRefreshService:
+    """情绪分析后台刷新（stale-while-revalidate）
+
+    查询接口先返回最近一次的结果并标记是否过期，过期时在后台触发重算；同一关键词同时只有一个重算任务，
+    重算完成后通过 WebSocket 推送 sentiment_updated 消息，客户端据此重新拉取。
+    """
+
+    def __init__(self):
+        self.tasks: Dict[str, asyncio.Task] = {}
+
+    def is_refreshing(self, keyword: str) -> bool:
+        return keyword in self.tasks
+
+    def age_seconds(self, last_updated: Optional[datetime]) -> Optional[int]:
+        return int((datetime.utcnow() - last_updated).total_seconds()) if last_updated else None
+
+    def is_stale(self, last_updated: Optional[datetime]) -> bool:
+        age_seconds = self.age_seconds(last_updated)
+        return age_seconds is None or age_seconds > SENTIMENT_MAX_AGE_HOURS * 3600
+
+    async def check(self, keyword: str, db: AsyncSession, **_):
+        """最近一次结果缺失或过期时触发后台重算
+
+        在 ETag 比较之前执行（见 cached_response 的 before），客户端即使一直拿到 304 也会触发刷新。
+        """
+        last_updated = await db.scalar(
+            select(func.max(SentimentAnalysis.date)).where(SentimentAnalysis.keyword == keyword)
+        )
+        if self.is_stale(last_updated):
+            self.schedule(keyword)
+
+    def schedule(self, keyword: str):
+        """触发关键词的后台重算，已有任务在运行时不重复触发"""
+        if keyword in self.tasks:
+            return
+        task = asyncio.create_task(self._refresh(keyword))
+        self.tasks[keyword] = task
+        task.add_done_callback(lambda _: self.tasks.pop(keyword, None))
+
+    async def _refresh(self, keyword: str):
+        try:
+            async with AsyncSessionLocal() as db:
+                updated = await analysis_service.update_sentiment_analysis(keyword, db)
+                if not updated:
+                    logger.info(f"关键词 {keyword} 暂无可分析的帖子，跳过情绪刷新")
+                    # 刷新期间生成的响应（如看板）可能已被缓存，没有新结果时同样使其失效
+                    await response_cache.invalidate(keyword)
+                    return
+                result = await db.execute(
+                    select(*SENTIMENT_COLUMNS)
+                    .where(SentimentAnalysis.keyword == keyword)
+                    .order_by(SentimentAnalysis.date.desc())
+                    .limit(1)
+                )
+                latest = result.first()
+
+            await manager.broadcast({
+                "type": "sentiment_updated",
+                "keyword": keyword,
+                "data": {
+                    "positive": latest.positive_score,
+                    "negative": latest.negative_score,
+                    "neutral": latest.neutral_score,
+                    "total_posts": latest.total_posts,
+                    "date": latest.date.isoformat()
+                } if latest else None
+            })
+        except Exception as e:
+            logger.error(f"后台刷新关键词 {keyword} 情绪分析失败: {str(e)}")
+
+# 全局实例
+sentiment_refresh_service = SentimentRefreshService()
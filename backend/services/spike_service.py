@@ -0,0 +1,88 @@
+from typing import Any, Dict, Optional
+import math
+import os
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from core.database import KeywordSpikeState
+from services.websocket_manager import manager
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 突增检测参数
+SPIKE_EWMA_ALPHA = float(os.getenv("SPIKE_EWMA_ALPHA", "0.2"))
+SPIKE_Z_THRESHOLD = float(os.getenv("SPIKE_Z_THRESHOLD", "3.0"))
+SPIKE_MIN_OBSERVATIONS = int(os.getenv("SPIKE_MIN_OBSERVATIONS", "5"))
+SPIKE_COOLDOWN_MINUTES = int(os.getenv("SPIKE_COOLDOWN_MINUTES", "60"))
+
+class SpikeDetectionService:
+    """关键词声量突增检测
+
+    每个关键词只保存指数加权均值和方差（EWMA），每写入一条 KeywordTrend 记录
+    增量更新一次，不回扫历史。新值相对更新前基线的 z 分数超过阈值即判定为突增。
+    状态存放在 keyword_spike_states 表中，重启后继续累积。
+    """
+
+    def __init__(
+        self,
+        alpha: float = SPIKE_EWMA_ALPHA,
+        z_threshold: float = SPIKE_Z_THRESHOLD,
+        min_observations: int = SPIKE_MIN_OBSERVATIONS,
+        cooldown_minutes: int = SPIKE_COOLDOWN_MINUTES
+    ):
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.min_observations = min_observations
+        self.cooldown = timedelta(minutes=cooldown_minutes)
+
+    async def observe(self, keyword: str, value: int, db: AsyncSession, observed_at: datetime = None) -> Optional[Dict[str, Any]]:
+        """记录一次声量观测并更新状态，检测到突增时返回检测结果（调用方负责提交事务）"""
+        observed_at = observed_at or datetime.utcnow()
+        result = await db.execute(
+            select(KeywordSpikeState).where(KeywordSpikeState.keyword == keyword)
+        )
+        state = result.scalar_one_or_none()
+        if state is None:
+            state = KeywordSpikeState(keyword=keyword, ewma_mean=float(value), ewma_var=0.0, observations=1, last_value=value)
+            db.add(state)
+            return None
+
+        # 用更新前的基线计算 z 分数，标准差至少取 1，避免平稳序列上的微小波动触发告警
+        baseline = state.ewma_mean
+        std = max(math.sqrt(state.ewma_var), 1.0)
+        z_score = (value - baseline) / std
+
+        detection = None
+        in_cooldown = state.last_alert_at is not None and observed_at - state.last_alert_at < self.cooldown
+        if state.observations >= self.min_observations and z_score >= self.z_threshold and not in_cooldown:
+            detection = {
+                "keyword": keyword,
+                "value": value,
+                "baseline": round(baseline, 2),
+                "std": round(std, 2),
+                "z_score": round(z_score, 2),
+                "detected_at": observed_at.isoformat()
+            }
+            state.last_alert_at = observed_at
+
+        # EWMA 增量更新
+        diff = value - state.ewma_mean
+        increment = self.alpha * diff
+        state.ewma_mean = state.ewma_mean + increment
+        state.ewma_var = (1 - self.alpha) * (state.ewma_var + diff * increment)
+        state.observations += 1
+        state.last_value = value
+
+        return detection
+
+    async def notify(self, detection: Dict[str, Any]):
+        """通过 WebSocket 推送突增告警"""
+        logger.info(f"检测到关键词声量突增: {detection}")
+        await manager.broadcast({
+            "type": "keyword_spike",
+            "data": detection
+        })
+
+# 全局实例
+spike_service = SpikeDetectionService()
@@ -0,0 +1,231 @@
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, delete, func, and_
+from core.database import AsyncSessionLocal, KeywordStats, HotPost, SentimentAnalysis, upsert
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 全局汇总行的关键词
+GLOBAL_STATS_KEY = "__all__"
+
+class StatsService:
+    """统计数据增量维护
+
+    写入热帖和情绪分析结果时，在同一事务内原子累加对应关键词行和全局行，
+    /api/data/stats 只需按主键读取一行。清理任务删除数据后由 rebuild 全量重算。
+    """
+
+    @staticmethod
+    def _empty_values(keyword: str) -> Dict[str, Any]:
+        return {
+            "keyword": keyword,
+            "monitored_keywords": 0,
+            "hot_posts": 0,
+            "total_interactions": 0,
+            "sentiment_sum": 0.0,
+            "sentiment_count": 0,
+            "updated_at": datetime.utcnow()
+        }
+
+    async def _get_or_create(self, keyword: str, db: AsyncSession) -> KeywordStats:
+        # 并发的两次采集可能同时创建同一关键词的行，插入冲突时沿用已有行
+        await db.execute(
+            upsert(db, KeywordStats)
+            .values(self._empty_values(keyword))
+            .on_conflict_do_nothing(index_elements=["keyword"])
+        )
+        result = await db.execute(select(KeywordStats).where(KeywordStats.keyword == keyword))
+        return result.scalar_one()
+
+    async def on_post_added(self, keyword: str, likes: int, comments: int, db: AsyncSession):
+        """新增热帖后累加统计（调用方负责提交事务）"""
+        stats = await self._get_or_create(keyword, db)
+        await self._get_or_create(GLOBAL_STATS_KEY, db)
+        is_new_keyword = not stats.hot_posts
+        interactions = (likes or 0) + (comments or 0)
+
+        await db.execute(
+            update(KeywordStats)
+            .where(KeywordStats.keyword.in_([keyword, GLOBAL_STATS_KEY]))
+            .values(
+                hot_posts=KeywordStats.hot_posts + 1,
+                total_interactions=KeywordStats.total_interactions + interactions,
+                updated_at=datetime.utcnow()
+            )
+            .execution_options(synchronize_session="fetch")
+        )
+        if is_new_keyword:
+            await db.execute(
+                update(KeywordStats)
+                .where(KeywordStats.keyword == GLOBAL_STATS_KEY)
+                .values(monitored_keywords=KeywordStats.monitored_keywords + 1)
+                .execution_options(synchronize_session="fetch")
+            )
+
+    async def on_sentiment_added(self, keyword: str, positive_score: float, at: datetime, db: AsyncSession):
+        """写入情绪分析结果后累加统计（调用方负责提交事务）"""
+        await self._get_or_create(keyword, db)
+        await self._get_or_create(GLOBAL_STATS_KEY, db)
+
+        await db.execute(
+            update(KeywordStats)
+            .where(KeywordStats.keyword.in_([keyword, GLOBAL_STATS_KEY]))
+            .values(
+                sentiment_sum=KeywordStats.sentiment_sum + positive_score,
+                sentiment_count=KeywordStats.sentiment_count + 1,
+                updated_at=datetime.utcnow()
+            )
+            .execution_options(synchronize_session="fetch")
+        )
+        await db.execute(
+            update(KeywordStats)
+            .where(KeywordStats.keyword == keyword)
+            .values(latest_positive_score=positive_score, latest_sentiment_at=at)
+            .execution_options(synchronize_session="fetch")
+        )
+
+    async def get_stats(self, keyword: Optional[str], db: AsyncSession) -> Dict[str, Any]:
+        """读取统计数据；全局行不存在时（首次部署）先全量重算"""
+        result = await db.execute(
+            select(KeywordStats).where(KeywordStats.keyword == (keyword or GLOBAL_STATS_KEY))
+        )
+        stats = result.scalar_one_or_none()
+
+        if stats is None and not keyword:
+            # 传入的可能是只读会话，重算在主库上进行
+            async with AsyncSessionLocal() as write_db:
+                await self.rebuild(write_db)
+                return await self.get_stats(keyword, write_db)
+
+        return self._format(stats, keyword)
+
+    def _format(self, stats: Optional[KeywordStats], keyword: Optional[str]) -> Dict[str, Any]:
+        if keyword:
+            return {
+                "monitored_keywords": 1,
+                "hot_posts": stats.hot_posts if stats else 0,
+                "total_interactions": stats.total_interactions if stats else 0,
+                "sentiment_index": round(stats.latest_positive_score * 100, 1)
+                    if stats and stats.latest_positive_score is not None else 50.0
+            }
+
+        return {
+            "monitored_keywords": stats.monitored_keywords,
+            "hot_posts": stats.hot_posts,
+            "total_interactions": stats.total_interactions,
+            "sentiment_index": round(stats.sentiment_sum / stats.sentiment_count * 100, 1)
+                if stats.sentiment_count else 50.0
+        }
+
+    async def get_stats_many(self, keywords: List[str], db: AsyncSession) -> Dict[str, Any]:
+        """一次查询读取全局与多个关键词的统计"""
+        result = await db.execute(
+            select(KeywordStats).where(KeywordStats.keyword.in_([GLOBAL_STATS_KEY, *keywords]))
+        )
+        rows = {stats.keyword: stats for stats in result.scalars().all()}
+        overall = self._format(rows[GLOBAL_STATS_KEY], None) if GLOBAL_STATS_KEY in rows \
+            else await self.get_stats(None, db)
+        return {
+            "overall": overall,
+            "keywords": {keyword: self._format(rows.get(keyword), keyword) for keyword in keywords}
+        }
+
+    async def rebuild(self, db: AsyncSession) -> int:
+        """从热帖和情绪分析表全量重算统计，返回关键词行数
+
+        先锁住全局行（所有累加都会更新它）和现有统计行，再在同一事务内读取汇总并逐关键词 upsert：
+        并发采集的累加要么在重算之前提交、被汇总计入，要么等重算提交后再在新值上累加，不会丢失。
+        """
+        await db.execute(
+            upsert(db, KeywordStats)
+            .values(self._empty_values(GLOBAL_STATS_KEY))
+            .on_conflict_do_update(index_elements=["keyword"], set_={"updated_at": datetime.utcnow()})
+        )
+        await db.execute(select(KeywordStats.id).with_for_update())
+
+        posts_result = await db.execute(
+            select(
+                HotPost.keyword,
+                func.count(HotPost.id),
+                func.sum(HotPost.likes_count + HotPost.comments_count)
+            )
+            .group_by(HotPost.keyword)
+        )
+        sentiment_result = await db.execute(
+            select(
+                SentimentAnalysis.keyword,
+                func.sum(SentimentAnalysis.positive_score),
+                func.count(SentimentAnalysis.id),
+                func.max(SentimentAnalysis.date)
+            )
+            .group_by(SentimentAnalysis.keyword)
+        )
+        latest_dates = {}
+        rows: Dict[str, Dict[str, Any]] = {}
+        global_stats = self._empty_values(GLOBAL_STATS_KEY)
+
+        def row_for(keyword: str) -> Dict[str, Any]:
+            if keyword not in rows:
+                rows[keyword] = {
+                    **self._empty_values(keyword),
+                    "latest_positive_score": None,
+                    "latest_sentiment_at": None
+                }
+            return rows[keyword]
+
+        for keyword, count, interactions in posts_result.fetchall():
+            if keyword is None:
+                continue
+            stats = row_for(keyword)
+            stats["hot_posts"] = count
+            stats["total_interactions"] = interactions or 0
+            global_stats["hot_posts"] += count
+            global_stats["total_interactions"] += interactions or 0
+            global_stats["monitored_keywords"] += 1
+
+        for keyword, score_sum, count, latest in sentiment_result.fetchall():
+            if keyword is None:
+                continue
+            stats = row_for(keyword)
+            stats["sentiment_sum"] = score_sum or 0.0
+            stats["sentiment_count"] = count
+            global_stats["sentiment_sum"] += score_sum or 0.0
+            global_stats["sentiment_count"] += count
+            latest_dates[keyword] = latest
+
+        # 各关键词最近一次情绪分析结果
+        if latest_dates:
+            latest_result = await db.execute(
+                select(SentimentAnalysis.keyword, SentimentAnalysis.positive_score, SentimentAnalysis.date)
+                .where(
+                    and_(
+                        SentimentAnalysis.keyword.in_(list(latest_dates)),
+                        SentimentAnalysis.date.in_([d for d in latest_dates.values() if d is not None])
+                    )
+                )
+            )
+            for keyword, score, date in latest_result.fetchall():
+                if latest_dates.get(keyword) == date:
+                    rows[keyword]["latest_positive_score"] = score
+                    rows[keyword]["latest_sentiment_at"] = date
+
+        for values in list(rows.values()) + [global_stats]:
+            statement = upsert(db, KeywordStats).values(values)
+            await db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["keyword"],
+                    set_={name: statement.excluded[name] for name in values if name != "keyword"}
+                )
+            )
+        # 已没有任何热帖和情绪数据的关键词
+        await db.execute(
+            delete(KeywordStats).where(KeywordStats.keyword.notin_([*rows, GLOBAL_STATS_KEY]))
+        )
+        await db.commit()
+        logger.info(f"统计数据已重算，共 {len(rows)} 个关键词")
+        return len(rows)
+
+# 全局实例
+stats_service = StatsService()
@@ -1,6 +1,7 @@
 from fastapi import WebSocket
 from typing import Dict, List
-import json
+from core.serialization import dumps_text
+from core.metrics import WEBSOCKET_SEND_SECONDS, WEBSOCKET_QUEUE_DEPTH, WEBSOCKET_CONNECTIONS
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,6 +13,7 @@ class ConnectionManager:
     async def connect(self, websocket: WebSocket, client_id: str):
         await websocket.accept()
         self.active_connections[client_id] = websocket
+        WEBSOCKET_CONNECTIONS.set(len(self.active_connections))
         logger.info(f"WebSocket connection established: {client_id}")
         
         # 发送连接确认消息
@@ -24,13 +26,17 @@ class ConnectionManager:
     def disconnect(self, client_id: str):
         if client_id in self.active_connections:
             del self.active_connections[client_id]
+            WEBSOCKET_CONNECTIONS.set(len(self.active_connections))
             logger.info(f"WebSocket connection closed: {client_id}")
 
     async def send_personal_message(self, message: dict, client_id: str):
         if client_id in self.active_connections:
             try:
                 websocket = self.active_connections[client_id]
-                await websocket.send_text(json.dumps(message, ensure_ascii=False))
+                # 先序列化：序列化失败时不计入待发送消息数
+                message_text = dumps_text(message)
+                WEBSOCKET_QUEUE_DEPTH.inc()
+                await self._send(websocket, message_text, message)
             except Exception as e:
                 logger.error(f"Error sending message to {client_id}: {str(e)}")
                 # 连接可能已断开，移除它
@@ -42,11 +48,14 @@ class ConnectionManager:
             return
         
         disconnected_clients = []
-        message_text = json.dumps(message, ensure_ascii=False)
+        message_text = dumps_text(message)
+        # 广播逐个发送，排在后面的客户端计入待发送消息数
+        recipients = list(self.active_connections.items())
+        WEBSOCKET_QUEUE_DEPTH.inc(len(recipients))
         
-        for client_id, websocket in self.active_connections.items():
+        for client_id, websocket in recipients:
             try:
-                await websocket.send_text(message_text)
+                await self._send(websocket, message_text, message)
             except Exception as e:
                 logger.error(f"Error broadcasting to {client_id}: {str(e)}")
                 disconnected_clients.append(client_id)
@@ -55,6 +64,15 @@ class ConnectionManager:
         for client_id in disconnected_clients:
             self.disconnect(client_id)
 
+    async def _send(self, websocket: WebSocket, text: str, message):
+        """发送一条文本帧并记录耗时，发送完成（或失败）后从待发送计数中减去"""
+        message_type = message.get("type", "") if isinstance(message, dict) else "text"
+        try:
+            with WEBSOCKET_SEND_SECONDS.time(message_type=message_type):
+                await websocket.send_text(text)
+        finally:
+            WEBSOCKET_QUEUE_DEPTH.dec()
+
     async def send_to_group(self, message: dict, group: List[str]):
         """发送消息给指定的客户端组"""
         for client_id in group:
@@ -0,0 +1,34 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+
+# 应用模块在导入时按环境变量创建引擎和缓存，须在导入之前指向临时库
+TEST_DB_DIR = tempfile.mkdtemp(prefix="xhs-monitor-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(TEST_DB_DIR, 'test.db')}"
+os.environ["CACHE_BACKEND"] = "memory"
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """会话级事件循环，应用的引擎和缓存在各测试间共用"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+@pytest_asyncio.fixture(scope="session")
+async def app():
+    """迁移临时库后返回应用（不运行 lifespan，调度器和后台任务不启动）"""
+    from core.database import init_db
+    from main import app as fastapi_app
+    await init_db()
+    return fastapi_app
+
+@pytest_asyncio.fixture
+async def client(app):
+    from core.cache import response_cache
+    await response_cache.backend.clear()
+    async with AsyncClient(app=app, base_url="http://test") as http_client:
+        yield http_client
@@ -0,0 +1,58 @@
+"""进程内缓存后端：存取、TTL 过期、LRU 淘汰与代数递增"""
+import pytest
+
+from core.cache import CacheBackend, MemoryCacheBackend
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def backend(clock):
+    return MemoryCacheBackend(max_entries=2, clock=clock)
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        CacheBackend()
+
+async def test_get_returns_stored_bytes(backend):
+    assert await backend.get("missing") is None
+    await backend.set("key", b'{"a":1}', ttl=10)
+    assert await backend.get("key") == b'{"a":1}'
+
+async def test_entries_expire_after_ttl(backend, clock):
+    await backend.set("key", b"value", ttl=10)
+    clock.now += 9.9
+    assert await backend.get("key") == b"value"
+    clock.now += 0.1
+    assert await backend.get("key") is None
+    assert "key" not in backend.entries
+
+async def test_least_recently_used_entry_is_evicted(backend):
+    await backend.set("a", b"1", ttl=10)
+    await backend.set("b", b"2", ttl=10)
+    await backend.get("a")
+    await backend.set("c", b"3", ttl=10)
+    assert await backend.get("b") is None
+    assert await backend.get("a") == b"1"
+    assert await backend.get("c") == b"3"
+
+async def test_generations_start_at_zero_and_increment(backend):
+    assert await backend.get_generations(["k1", "k2"]) == [0, 0]
+    await backend.bump_generations(["k1"])
+    await backend.bump_generations(["k1", "k2"])
+    assert await backend.get_generations(["k2", "k1"]) == [1, 2]
+
+async def test_clear_drops_values_and_generations(backend):
+    await backend.set("key", b"value", ttl=10)
+    await backend.bump_generations(["k1"])
+    await backend.clear()
+    assert await backend.get("key") is None
+    assert await backend.get_generations(["k1"]) == [0]
@@ -0,0 +1,56 @@
+"""采集任务在创建时预留采集队列名额"""
+import asyncio
+
+import pytest
+from sqlalchemy import select, func
+
+from core.database import AsyncSessionLocal, Job
+from services.collection_coordinator import collection_coordinator
+from services.job_service import job_service
+
+@pytest.fixture
+def coordinator(monkeypatch):
+    """采集不操作浏览器，一直排队到测试结束；队列只容纳一个关键词"""
+    gate = asyncio.Event()
+
+    async def fake_execute(run):
+        try:
+            await gate.wait()
+            run.status = "success"
+            run.result = {"success_count": 1}
+        except asyncio.CancelledError:
+            run.status = "cancelled"
+            raise
+        finally:
+            collection_coordinator.inflight.pop(run.keyword, None)
+
+    monkeypatch.setattr(collection_coordinator, "_execute", fake_execute)
+    monkeypatch.setattr(collection_coordinator, "max_queue", 1)
+    yield collection_coordinator
+    gate.set()
+
+async def _job_count() -> int:
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(func.count()).select_from(Job))).scalar()
+
+async def test_full_queue_returns_429_without_creating_job(client, coordinator):
+    jobs_before = await _job_count()
+
+    response = await client.post("/api/scraper/search", json={"keywords": ["甲", "乙"]})
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) > 0
+    assert await _job_count() == jobs_before
+    assert "甲" not in coordinator.inflight
+
+async def test_accepted_job_holds_its_runs(client, coordinator):
+    response = await client.post("/api/scraper/search", json={"keywords": ["丙"]})
+    assert response.status_code == 200
+    job_id = response.json()["data"]["job_id"]
+    # 名额在返回之前已经占用，后续请求看到的是占用后的队列
+    assert "丙" in coordinator.inflight
+    assert (await client.post("/api/scraper/search", json={"keywords": ["丁"]})).status_code == 429
+
+    job = await job_service.cancel(job_id)
+    assert job["status"] == "cancelled"
+    await asyncio.sleep(0)
+    assert "丙" not in coordinator.inflight
@@ -0,0 +1,63 @@
+"""看板聚合接口：面板选择、单面板失败和缓存失效"""
+from core.cache import response_cache
+from services.dashboard_service import dashboard_service
+
+async def test_fields_select_panels(client):
+    response = await client.get("/api/data/dashboard", params={"keywords": ["护肤", "美妆"], "fields": ["stats", "trends"]})
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["keywords"] == ["护肤", "美妆"]
+    assert set(data) == {"keywords", "stats", "trends", "errors"}
+    assert data["errors"] == {}
+    assert set(data["stats"]["keywords"]) == {"护肤", "美妆"}
+    assert "overall" in data["stats"]
+
+async def test_unknown_field_is_rejected(client):
+    response = await client.get("/api/data/dashboard", params={"keywords": ["护肤"], "fields": ["stats", "nope"]})
+    assert response.status_code == 400
+
+async def test_failing_panel_is_reported_without_failing_others(client, monkeypatch):
+    async def failing_trends(**_):
+        raise RuntimeError("trend query failed")
+
+    monkeypatch.setattr(dashboard_service, "_trends", failing_trends)
+    response = await client.get("/api/data/dashboard", params={"keywords": ["护肤"], "fields": ["stats", "trends"]})
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["trends"] is None
+    assert data["errors"] == {"trends": "trend query failed"}
+    assert data["stats"]["keywords"]["护肤"]["hot_posts"] == 0
+
+async def test_other_keyword_write_invalidates_stats_panel(client):
+    # 统计面板的 overall 汇总所有关键词，其他关键词写入后也要失效
+    params = {"keywords": ["护肤", "美妆"], "fields": ["stats"]}
+    etag = (await client.get("/api/data/dashboard", params=params)).headers["etag"]
+    assert (await client.get("/api/data/dashboard", params=params, headers={"If-None-Match": etag})).status_code == 304
+
+    await response_cache.invalidate("穿搭")
+
+    response = await client.get("/api/data/dashboard", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+async def test_other_keyword_write_keeps_per_keyword_panels(client):
+    params = {"keywords": ["护肤", "美妆"], "fields": ["trends", "hot_posts"]}
+    etag = (await client.get("/api/data/dashboard", params=params)).headers["etag"]
+
+    await response_cache.invalidate("穿搭")
+
+    response = await client.get("/api/data/dashboard", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+async def test_invalidate_config_changes_dashboard_etag(client):
+    params = {"keywords": ["护肤"], "fields": ["stats"]}
+    first = await client.get("/api/data/dashboard", params=params)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert (await client.get("/api/data/dashboard", params=params, headers={"If-None-Match": etag})).status_code == 304
+
+    await response_cache.invalidate_config()
+
+    response = await client.get("/api/data/dashboard", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
@@ -0,0 +1,84 @@
+"""近重复检测：分段索引查找、回滚丢弃指纹和清理后重新归簇"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from core.database import AsyncSessionLocal, HotPost
+from services import archive_service
+from services.dedup_service import dedup_service
+from services.retention_service import retention_service
+
+def _flip(fingerprint: int, *bands: int) -> int:
+    """在指定分段各翻转一位"""
+    for band in bands:
+        fingerprint ^= 1 << (band * dedup_service.BAND_BITS)
+    return fingerprint
+
+def test_band_lookup_finds_near_duplicates_only():
+    base = 0x0123456789ABCDEF
+    post_id = 10 ** 9
+    dedup_service.add(post_id, base, "去重分段")
+
+    # 三个分段各差一位，只剩一个分段完全相同，仍在距离阈值内
+    assert dedup_service.find_duplicate(_flip(base, 0, 1, 2), "去重分段") == post_id
+    # 四个分段都不同，距离为 4，超过阈值
+    assert dedup_service.find_duplicate(_flip(base, 0, 1, 2, 3), "去重分段") is None
+    # 三个分段相同（候选命中）但第四个分段相差 8 位，比对后排除
+    assert dedup_service.find_duplicate(base ^ (0xFF << (3 * dedup_service.BAND_BITS)), "去重分段") is None
+    # 其他关键词的帖子不参与判定
+    assert dedup_service.find_duplicate(base, "去重其他") is None
+
+def _post(post_id: str, keyword: str, **fields) -> HotPost:
+    return HotPost(
+        post_id=post_id,
+        keyword=keyword,
+        title=fields.pop("title", "夏季防晒霜测评"),
+        content=fields.pop("content", "这款防晒霜质地清爽不油腻，适合夏天通勤使用"),
+        **fields
+    )
+
+async def test_rolled_back_post_is_not_registered(app):
+    async with AsyncSessionLocal() as db:
+        first = _post("dedup-rollback-1", "去重回滚")
+        assert await dedup_service.register_post(first, db) is None
+        rolled_back_id = first.id
+        await db.rollback()
+    assert rolled_back_id not in dedup_service.fingerprints
+
+    # 回滚的帖子不会成为后续帖子的代表
+    async with AsyncSessionLocal() as db:
+        second = _post("dedup-rollback-2", "去重回滚")
+        assert await dedup_service.register_post(second, db) is None
+        await db.commit()
+        second_id = second.id
+
+    async with AsyncSessionLocal() as db:
+        third = _post("dedup-rollback-3", "去重回滚")
+        assert await dedup_service.register_post(third, db) == second_id
+        await db.commit()
+
+async def test_retention_promotes_new_canonical(app, monkeypatch):
+    # 归档不在本测试范围内
+    monkeypatch.setattr(archive_service, "ARCHIVE_ENABLED", False)
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as db:
+        canonical = _post("dedup-repair-1", "去重修复", collected_at=now - timedelta(days=60), duplicate_count=2)
+        db.add(canonical)
+        await db.flush()
+        first = _post("dedup-repair-2", "去重修复", collected_at=now - timedelta(hours=2), duplicate_of=canonical.id)
+        second = _post("dedup-repair-3", "去重修复", collected_at=now - timedelta(hours=1), duplicate_of=canonical.id)
+        db.add_all([first, second])
+        await db.commit()
+        canonical_id, first_id, second_id = canonical.id, first.id, second.id
+
+    await retention_service.apply_retention(30)
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(HotPost.id, HotPost.duplicate_of, HotPost.duplicate_count).where(HotPost.keyword == "去重修复")
+        )
+        posts = {post_id: (duplicate_of, duplicate_count) for post_id, duplicate_of, duplicate_count in result}
+    assert canonical_id not in posts
+    # 最早的剩余帖子提升为代表，其余帖子改挂到它下面
+    assert posts[first_id] == (None, 1)
+    assert posts[second_id][0] == first_id
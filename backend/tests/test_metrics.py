@@ -0,0 +1,63 @@
+"""/metrics 指标输出"""
+import re
+
+import pytest
+
+from core.metrics import Metric, WEBSOCKET_QUEUE_DEPTH
+from services import websocket_manager
+from services.websocket_manager import ConnectionManager
+
+def _health_buckets(text: str) -> dict:
+    """/health 请求耗时直方图各桶的累计计数"""
+    pattern = re.compile(
+        r'^http_request_duration_seconds_bucket\{method="GET",route="/health",status="200",le="([^"]+)"\} (\d+)$',
+        re.MULTILINE
+    )
+    return {le: int(count) for le, count in pattern.findall(text)}
+
+async def test_request_moves_histogram_buckets(client):
+    before = _health_buckets((await client.get("/metrics")).text)
+
+    assert (await client.get("/health")).status_code == 200
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+    after = _health_buckets(response.text)
+    assert after["+Inf"] == before.get("+Inf", 0) + 1
+    # 累计桶单调不减，且至少有一个有限桶计入了这次请求
+    counts = list(after.values())
+    assert counts == sorted(counts)
+    assert any(after[le] > before.get(le, 0) for le in after if le != "+Inf")
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text: str):
+        self.sent.append(text)
+
+async def test_queue_depth_unchanged_when_serialization_fails(monkeypatch):
+    manager = ConnectionManager()
+    websocket = FakeWebSocket()
+    manager.active_connections["client"] = websocket
+    depth = WEBSOCKET_QUEUE_DEPTH.get()
+
+    def failing_dumps(message):
+        raise TypeError("not serializable")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(websocket_manager, "dumps_text", failing_dumps)
+        await manager.send_personal_message({"type": "bad"}, "client")
+    assert WEBSOCKET_QUEUE_DEPTH.get() == depth
+    assert websocket.sent == []
+
+    manager.active_connections["client"] = websocket
+    await manager.send_personal_message({"type": "ok"}, "client")
+    assert WEBSOCKET_QUEUE_DEPTH.get() == depth
+    assert len(websocket.sent) == 1
+
+def test_metric_is_abstract():
+    with pytest.raises(TypeError):
+        Metric("untyped_metric", "没有实现 samples 的指标")
@@ -0,0 +1,37 @@
+"""请求采样剖析：header 模式和结果接口都需要剖析令牌"""
+import pytest
+
+from core import profiling
+
+@pytest.fixture
+def header_mode(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "PROFILING_MODE", "header")
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "secret")
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+
+async def test_header_without_valid_token_is_not_profiled(client, header_mode):
+    for headers in ({"X-Profile": "1"}, {"X-Profile": "1", "X-Profile-Token": "wrong"}):
+        response = await client.get("/health", headers=headers)
+        assert response.status_code == 200
+        assert "x-profile-id" not in response.headers
+    assert profiling.list_profiles() == []
+
+async def test_token_unlocks_profiling_and_downloads(client, header_mode):
+    token = {"X-Profile-Token": "secret"}
+    response = await client.get("/health", headers={"X-Profile": "1", **token})
+    profile_id = response.headers["x-profile-id"]
+
+    assert (await client.get("/api/monitor/profiles")).status_code == 403
+    assert (await client.get(f"/api/monitor/profiles/{profile_id}")).status_code == 403
+    assert (await client.get(f"/api/monitor/profiles/{profile_id}", headers={"X-Profile-Token": "wrong"})).status_code == 403
+
+    listed = await client.get("/api/monitor/profiles", headers=token)
+    assert listed.status_code == 200
+    assert [profile["id"] for profile in listed.json()["data"]["profiles"]] == [profile_id]
+    assert (await client.get(f"/api/monitor/profiles/{profile_id}", headers=token)).status_code == 200
+
+async def test_unset_token_disables_header_mode_and_routes(client, header_mode, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "")
+    response = await client.get("/health", headers={"X-Profile": "1", "X-Profile-Token": ""})
+    assert "x-profile-id" not in response.headers
+    assert (await client.get("/api/monitor/profiles", headers={"X-Profile-Token": ""})).status_code == 403
@@ -0,0 +1,25 @@
+"""热点查询的 EXPLAIN QUERY PLAN 检查：在迁移后的临时 SQLite 库上确认每条查询命中索引，
+带 ORDER BY 的查询按索引顺序读取而不做临时排序"""
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.database import run_migrations
+from benchmarks.explain_queries import hot_queries, query_plan, plan_problems
+
+@pytest_asyncio.fixture
+async def conn(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'plans.db'}")
+    async with engine.connect() as connection:
+        await connection.run_sync(run_migrations)
+        yield connection
+    await engine.dispose()
+
+@pytest.mark.parametrize("name", list(hot_queries()))
+async def test_hot_query_uses_index(conn, name):
+    plan = await query_plan(conn, hot_queries()[name])
+    assert not plan_problems(plan), f"{name}: {plan}"
+
+def test_temp_sort_is_reported():
+    plan = ["SEARCH hot_posts USING INDEX ix_hot_posts_duplicate_of (duplicate_of=?)", "USE TEMP B-TREE FOR ORDER BY"]
+    assert plan_problems(plan) == ["USE TEMP B-TREE FOR ORDER BY"]
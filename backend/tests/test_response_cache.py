@@ -0,0 +1,64 @@
+"""ETag 条件请求与按数据版本失效"""
+from core.cache import response_cache
+
+async def test_response_carries_etag(client):
+    response = await client.get("/api/data/stats", params={"keyword": "护肤"})
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('W/"')
+    assert response.headers["cache-control"] == "no-cache"
+    assert response.json()["success"] is True
+
+async def test_matching_if_none_match_returns_304(client):
+    etag = (await client.get("/api/data/stats", params={"keyword": "护肤"})).headers["etag"]
+    hits_before = response_cache.hits
+
+    response = await client.get("/api/data/stats", params={"keyword": "护肤"}, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+    # 304 不读取缓存也不执行查询
+    assert response_cache.hits == hits_before
+
+async def test_repeat_request_is_served_from_cache(client):
+    first = await client.get("/api/data/stats", params={"keyword": "护肤"})
+    hits_before = response_cache.hits
+    second = await client.get("/api/data/stats", params={"keyword": "护肤"})
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert response_cache.hits == hits_before + 1
+
+async def test_invalidate_keyword_changes_etag(client):
+    etag = (await client.get("/api/data/stats", params={"keyword": "护肤"})).headers["etag"]
+    other_etag = (await client.get("/api/data/stats", params={"keyword": "美妆"})).headers["etag"]
+
+    await response_cache.invalidate("护肤")
+
+    response = await client.get("/api/data/stats", params={"keyword": "护肤"}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    # 其他关键词的版本不受影响
+    response = await client.get("/api/data/stats", params={"keyword": "美妆"}, headers={"If-None-Match": other_etag})
+    assert response.status_code == 304
+
+async def test_invalidate_keyword_changes_global_etag(client):
+    etag = (await client.get("/api/data/stats")).headers["etag"]
+    await response_cache.invalidate("护肤")
+    response = await client.get("/api/data/stats", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+async def test_invalidate_config_leaves_data_etags(client):
+    etag = (await client.get("/api/data/stats", params={"keyword": "护肤"})).headers["etag"]
+    await response_cache.invalidate_config()
+    response = await client.get("/api/data/stats", params={"keyword": "护肤"}, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+async def test_search_and_emerging_terms_carry_etag(client):
+    for path, params in [
+        ("/api/data/search", {"q": "面霜", "keyword": "护肤"}),
+        ("/api/data/emerging-terms", {"keyword": "护肤"}),
+    ]:
+        etag = (await client.get(path, params=params)).headers["etag"]
+        assert (await client.get(path, params=params, headers={"If-None-Match": etag})).status_code == 304
+
+        await response_cache.invalidate("护肤")
+        assert (await client.get(path, params=params, headers={"If-None-Match": etag})).status_code == 200
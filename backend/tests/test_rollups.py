@@ -0,0 +1,79 @@
+"""关键词声量分层汇总：upsert 累加、压实和趋势查询的层级选择"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from core.database import AsyncSessionLocal, KeywordTrend, KeywordTrendRollup
+from services.analysis_service import analysis_service
+from services.rollup_service import bucket_start, rollup_service
+
+async def _rollups(keyword: str) -> dict:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(KeywordTrendRollup.granularity, KeywordTrendRollup.bucket, KeywordTrendRollup.count)
+            .where(KeywordTrendRollup.keyword == keyword)
+        )
+        return {(granularity, bucket): count for granularity, bucket, count in result}
+
+async def test_record_accumulates_same_bucket(app):
+    at = datetime(2024, 3, 6, 10, 30)
+    async with AsyncSessionLocal() as db:
+        await rollup_service.record("汇总累加", at, 3, db)
+        await rollup_service.record("汇总累加", at + timedelta(hours=5), 4, db)
+        await db.commit()
+
+    assert await _rollups("汇总累加") == {
+        ("day", bucket_start(at, "day")): 7,
+        ("week", bucket_start(at, "week")): 7,
+    }
+
+async def test_compact_keeps_larger_value_and_recomputes_weeks(app):
+    monday = datetime(2024, 3, 4)
+    async with AsyncSessionLocal() as db:
+        # 周一的汇总已大于原始数据（原始数据部分已清理），周二只有原始数据（汇总表上线前）
+        await rollup_service.record("汇总压实", monday + timedelta(hours=1), 10, db)
+        db.add_all([
+            KeywordTrend(keyword="汇总压实", date=monday + timedelta(hours=2), count=4),
+            KeywordTrend(keyword="汇总压实", date=monday + timedelta(days=1, hours=3), count=5),
+            KeywordTrend(keyword="汇总压实", date=monday + timedelta(days=1, hours=8), count=1),
+        ])
+        await db.flush()
+        assert await rollup_service.compact(monday + timedelta(days=2), db) == 2
+        await db.commit()
+
+    assert await _rollups("汇总压实") == {
+        ("day", monday): 10,
+        ("day", monday + timedelta(days=1)): 6,
+        ("week", monday): 16,
+    }
+
+    # 重复压实结果不变
+    async with AsyncSessionLocal() as db:
+        await rollup_service.compact(monday + timedelta(days=2), db)
+        await db.commit()
+    assert (await _rollups("汇总压实"))[("week", monday)] == 16
+
+async def test_trend_reads_rollups_for_day_and_week_and_raw_for_hour(app):
+    now = datetime.utcnow()
+    day = bucket_start(now, "day")
+    week = bucket_start(now, "week")
+    async with AsyncSessionLocal() as db:
+        # 汇总与原始数据故意不一致，以区分查询读取的层级
+        db.add_all([
+            KeywordTrendRollup(granularity="day", keyword="汇总层级", bucket=day, count=40),
+            KeywordTrendRollup(granularity="week", keyword="汇总层级", bucket=week, count=90),
+            KeywordTrend(keyword="汇总层级", date=now.replace(minute=0, second=0, microsecond=0), count=2),
+        ])
+        await db.commit()
+
+    async with AsyncSessionLocal() as db:
+        daily = await analysis_service.calculate_trend_data("汇总层级", days=7, db=db, granularity="day")
+        weekly = await analysis_service.calculate_trend_data("汇总层级", days=14, db=db, granularity="week")
+        hourly = await analysis_service.calculate_trend_data("汇总层级", days=1, db=db, granularity="hour")
+
+    assert daily[-1]["value"] == 40
+    assert sum(point["value"] for point in daily) == 40
+    assert weekly[-1]["value"] == 90
+    assert sum(point["value"] for point in weekly) == 90
+    assert hourly[-1]["value"] == 2
+    assert sum(point["value"] for point in hourly) == 2
@@ -0,0 +1,65 @@
+"""情绪分析接口的 stale-while-revalidate"""
+from datetime import datetime, timedelta
+
+from core.cache import response_cache
+from core.database import AsyncSessionLocal, SentimentAnalysis
+from services.sentiment_refresh_service import sentiment_refresh_service, SENTIMENT_MAX_AGE_HOURS
+
+async def _add_sentiment(keyword: str, age: timedelta):
+    async with AsyncSessionLocal() as db:
+        db.add(SentimentAnalysis(
+            keyword=keyword, date=datetime.utcnow() - age,
+            positive_score=0.5, negative_score=0.2, neutral_score=0.3, total_posts=10
+        ))
+        await db.commit()
+
+async def test_stale_result_schedules_refresh_even_on_304(client, monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(sentiment_refresh_service, "schedule", scheduled.append)
+    await _add_sentiment("旧数据", timedelta(hours=SENTIMENT_MAX_AGE_HOURS + 1))
+
+    first = await client.get("/api/data/sentiment/旧数据")
+    assert first.status_code == 200
+    assert first.json()["data"]["stale"] is True
+    etag = first.headers["etag"]
+
+    # 过期判断在 ETag 比较之前，304 同样触发刷新
+    second = await client.get("/api/data/sentiment/旧数据", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert scheduled == ["旧数据", "旧数据"]
+
+    # 响应体不缓存，age_seconds 每次重新计算
+    third = await client.get("/api/data/sentiment/旧数据")
+    assert third.status_code == 200
+    assert third.json()["data"]["age_seconds"] >= first.json()["data"]["age_seconds"]
+
+async def test_refresh_result_changes_sentiment_etag(client, monkeypatch):
+    monkeypatch.setattr(sentiment_refresh_service, "schedule", lambda keyword: None)
+    await _add_sentiment("刷新", timedelta(hours=SENTIMENT_MAX_AGE_HOURS + 1))
+    etag = (await client.get("/api/data/sentiment/刷新")).headers["etag"]
+
+    await _add_sentiment("刷新", timedelta(0))
+    await response_cache.invalidate("刷新")
+
+    response = await client.get("/api/data/sentiment/刷新", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["data"]["stale"] is False
+
+async def test_fresh_result_does_not_schedule_refresh(client, monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(sentiment_refresh_service, "schedule", scheduled.append)
+    await _add_sentiment("新数据", timedelta(minutes=5))
+
+    response = await client.get("/api/data/sentiment/新数据")
+    assert response.status_code == 200
+    assert response.json()["data"]["stale"] is False
+    assert scheduled == []
+
+async def test_refresh_without_posts_invalidates_keyword_cache(client):
+    etag = (await client.get("/api/data/stats", params={"keyword": "无帖子"})).headers["etag"]
+
+    await sentiment_refresh_service._refresh("无帖子")
+
+    response = await client.get("/api/data/stats", params={"keyword": "无帖子"}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
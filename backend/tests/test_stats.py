@@ -0,0 +1,78 @@
+"""统计增量维护与全量重算结果一致"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from core.database import AsyncSessionLocal, HotPost, KeywordStats, SentimentAnalysis
+from services import archive_service
+from services.retention_service import retention_service
+from services.stats_service import stats_service, GLOBAL_STATS_KEY
+
+STATS_COLUMNS = (
+    "monitored_keywords", "hot_posts", "total_interactions",
+    "sentiment_sum", "sentiment_count", "latest_positive_score", "latest_sentiment_at"
+)
+
+async def _snapshot() -> dict:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(KeywordStats))
+        return {
+            stats.keyword: {name: getattr(stats, name) for name in STATS_COLUMNS}
+            for stats in result.scalars().all()
+        }
+
+async def _rebuild() -> dict:
+    async with AsyncSessionLocal() as db:
+        await stats_service.rebuild(db)
+    return await _snapshot()
+
+async def _add_post(post_id: str, keyword: str, likes: int, comments: int, collected_at: datetime):
+    async with AsyncSessionLocal() as db:
+        db.add(HotPost(
+            post_id=post_id, keyword=keyword, title=post_id,
+            likes_count=likes, comments_count=comments, collected_at=collected_at
+        ))
+        await stats_service.on_post_added(keyword, likes, comments, db)
+        await db.commit()
+
+async def _add_sentiment(keyword: str, positive_score: float, at: datetime):
+    async with AsyncSessionLocal() as db:
+        db.add(SentimentAnalysis(keyword=keyword, date=at, positive_score=positive_score))
+        await stats_service.on_sentiment_added(keyword, positive_score, at, db)
+        await db.commit()
+
+async def test_incremental_stats_match_rebuild(app, monkeypatch):
+    # 归档不在本测试范围内
+    monkeypatch.setattr(archive_service, "ARCHIVE_ENABLED", False)
+    now = datetime.utcnow()
+    old = now - timedelta(days=60)
+    # 其他测试直接写入的数据没有增量统计，先以重算结果为起点
+    await _rebuild()
+
+    # 情绪分析数值取二进制可精确表示的值，累加结果可直接比较
+    await _add_sentiment("统计旧词", 0.5, old)
+    await _add_post("stats-1", "统计旧词", 10, 2, old)
+    await _add_post("stats-2", "统计新词", 3, 1, old)
+    await _add_post("stats-3", "统计新词", 5, 0, now)
+    await _add_sentiment("统计新词", 0.25, now - timedelta(hours=1))
+    await _add_sentiment("统计新词", 0.75, now)
+
+    incremental = await _snapshot()
+    assert incremental["统计新词"]["hot_posts"] == 2
+    assert incremental["统计新词"]["latest_positive_score"] == 0.75
+    assert await _rebuild() == incremental
+
+    # 清理删除数据后由重算校正，之后的增量继续与重算一致
+    await retention_service.apply_retention(30)
+    rebuilt = await _rebuild()
+    assert "统计旧词" not in rebuilt
+    assert rebuilt["统计新词"]["hot_posts"] == 1
+    assert rebuilt["统计新词"]["total_interactions"] == 5
+    assert rebuilt[GLOBAL_STATS_KEY]["monitored_keywords"] == incremental[GLOBAL_STATS_KEY]["monitored_keywords"] - 1
+
+    await _add_post("stats-4", "统计新词", 1, 1, now)
+    await _add_post("stats-5", "统计再词", 2, 2, now)
+    await _add_sentiment("统计再词", 0.5, now)
+    incremental = await _snapshot()
+    assert incremental[GLOBAL_STATS_KEY]["monitored_keywords"] == rebuilt[GLOBAL_STATS_KEY]["monitored_keywords"] + 1
+    assert await _rebuild() == incremental
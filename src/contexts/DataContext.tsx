@@ -81,28 +81,14 @@ export const DataProvider: React.FC<DataProviderProps> = ({ children }) => {
       setLoading(true);
       setError(null);
 
-      const [
-        keywordsData,
-        trendsData,
-        hotPostsData,
-        wordCloudData,
-        sentimentData,
-        statsData
-      ] = await Promise.all([
-        apiService.getKeywords().catch(() => []),
-        apiService.getTrends().catch(() => []),
-        apiService.getHotPosts().catch(() => []),
-        apiService.getWordCloud().catch(() => []),
-        apiService.getSentiment().catch(() => []),
-        apiService.getStats().catch(() => mockData.stats)
-      ]);
-
-      setKeywords(keywordsData);
-      setTrends(trendsData);
-      setHotPosts(hotPostsData);
-      setWordCloud(wordCloudData);
-      setSentiment(sentimentData);
-      setStats(statsData);
+      const dashboard = await apiService.getDashboard();
+
+      setKeywords(dashboard.keywords);
+      setTrends(dashboard.trends);
+      setHotPosts(dashboard.hotPosts);
+      setWordCloud(dashboard.wordCloud);
+      setSentiment(dashboard.sentiment);
+      setStats(dashboard.stats);
       
     } catch (err) {
       console.error('Failed to load real data:', err);
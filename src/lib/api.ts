@@ -65,6 +65,17 @@ export interface StatsData {
   sentiment_growth: number;
 }
 
+export interface DashboardData {
+  keywords: string[];
+  trends: KeywordTrend[];
+  hotPosts: HotPost[];
+  wordCloud: WordCloudItem[];
+  sentiment: SentimentData[];
+  stats: StatsData;
+}
+
+export type DashboardField = 'stats' | 'trends' | 'hot_posts' | 'word_cloud' | 'sentiment';
+
 // API Functions
 export const apiService = {
   // Configuration
@@ -109,6 +120,49 @@ export const apiService = {
     return response.data.data;
   },
 
+  // Dashboard: all panels in one request
+  async getDashboard(keywords?: string[], fields?: DashboardField[]): Promise<DashboardData> {
+    const response = await api.get('/data/dashboard', {
+      params: { keywords, fields },
+      paramsSerializer: { indexes: null },
+    });
+    const data = response.data.data;
+
+    const trends: KeywordTrend[] = Object.entries(data.trends || {}).flatMap(
+      ([keyword, points]: [string, any]) =>
+        points.map((point: any) => ({ keyword, date: point.date, count: point.value }))
+    );
+    const hotPosts: HotPost[] = (Object.values(data.hot_posts || {}) as HotPost[][])
+      .flat()
+      .sort((a, b) => b.hot_score - a.hot_score);
+    const wordCloud: WordCloudItem[] = (data.word_cloud?.merged || []).map((item: any) => ({
+      keyword: item.word,
+      weight: item.size,
+    }));
+    const sentiment: SentimentData[] = Object.entries(data.sentiment || {}).map(
+      ([keyword, summary]: [string, any]) => ({
+        keyword,
+        positive_score: summary.overall.positive,
+        negative_score: summary.overall.negative,
+        neutral_score: summary.overall.neutral,
+        date: summary.trends[0]?.date || '',
+      })
+    );
+    const overall = data.stats?.overall;
+    const stats: StatsData = {
+      total_keywords: overall?.monitored_keywords ?? data.keywords.length,
+      total_posts: overall?.hot_posts ?? 0,
+      total_interactions: overall?.total_interactions ?? 0,
+      sentiment_score: overall?.sentiment_index ?? 0,
+      keyword_growth: 0,
+      posts_growth: 0,
+      interactions_growth: 0,
+      sentiment_growth: 0,
+    };
+
+    return { keywords: data.keywords, trends, hotPosts, wordCloud, sentiment, stats };
+  },
+
   // Scraping
   async startSearch(keywords: string[], limit = 20): Promise<void> {
     await api.post('/scraper/search', { keywords, limit });